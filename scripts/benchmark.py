@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+性能基准测试脚本
+
+用 generate_sample_data.py 生成指定规模的模拟数据，依次计时
+花名册处理、各商旅数据源处理、数据合并和HTML生成，结果保存为JSON。
+指定基准结果文件时与其比较，耗时增长超过阈值的阶段视为性能回退。
+"""
+
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+# 添加父目录到路径以导入utils和处理器
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils import scan_and_classify_files, peak_rss_mb, list_shards, iter_shard_records
+from process_roster import process_roster
+from process_alibaba import process_alibaba
+from process_ctrip import process_ctrip
+from process_zaitu import process_zaitu
+from merge_data import merge_data
+from generate_html import generate_html
+from generate_sample_data import generate_dataset
+
+
+TRAVEL_PROCESSORS = {
+    'alibaba': process_alibaba,
+    'ctrip': process_ctrip,
+    'zaitu': process_zaitu
+}
+
+DEFAULT_TEMPLATE = Path(__file__).parent.parent / 'templates' / 'travel-analysis.html'
+
+# 默认回退阈值：耗时增长超过 20%
+DEFAULT_THRESHOLD = 0.2
+
+# 耗时增长不足 0.5 秒的阶段不算回退（避免短阶段的计时抖动）
+MIN_REGRESSION_SECONDS = 0.5
+
+
+def count_shard_records(by_month_dir: Path, source: str) -> int:
+    """统计某个数据源已生成分片中的记录数"""
+    return sum(
+        sum(1 for _ in iter_shard_records(shard_file))
+        for shard_file in list_shards(by_month_dir)
+        if shard_file.name.startswith(f'{source}_')
+    )
+
+
+class StageTimer:
+    """
+    阶段计时器
+
+    依次运行各阶段并记录耗时、处理行数和峰值内存；
+    verbose 为False时屏蔽各阶段自身的输出。
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.stages: Dict[str, Dict] = {}
+
+    def run(self, name: str, func, *args, rows: int = 0, **kwargs):
+        """
+        运行一个阶段并计时
+
+        Args:
+            name: 阶段名称
+            func: 要运行的函数
+            rows: 该阶段输入的数据行数（用于计算吞吐量）
+
+        Returns:
+            函数的返回值
+        """
+        output = io.StringIO()
+        redirect = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(output)
+
+        start = time.perf_counter()
+        with redirect:
+            result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        stage = self.stages.setdefault(name, {'seconds': 0.0, 'rows': 0, 'calls': 0})
+        stage['seconds'] = round(stage['seconds'] + elapsed, 3)
+        stage['rows'] += rows
+        stage['calls'] += 1
+        if stage['rows'] and stage['seconds']:
+            stage['rowsPerSecond'] = round(stage['rows'] / stage['seconds'], 1)
+        stage['peakRssMB'] = peak_rss_mb()
+
+        print(f'  {name:<10} {elapsed:8.2f}s')
+        return result
+
+
+def benchmark_dataset(
+    raw_dir: Path,
+    processed_dir: Path,
+    output_html: Path,
+    template_path: Path,
+    rows: int,
+    employees: int,
+    stream: bool = False,
+    verbose: bool = False
+) -> Dict:
+    """
+    对一个数据集运行完整流程并计时
+
+    Args:
+        raw_dir: 模拟原始数据目录
+        processed_dir: 处理结果目录
+        output_html: 输出HTML路径
+        template_path: HTML模板路径
+        rows: 每个商旅文件的数据行数
+        employees: 每份花名册的员工数
+        stream: 是否使用流式读取
+        verbose: 是否显示各阶段的输出
+
+    Returns:
+        各阶段计时结果
+    """
+    if processed_dir.exists():
+        shutil.rmtree(processed_dir)
+
+    by_month_dir = processed_dir / 'by-month'
+    roster_index_path = processed_dir / 'roster_index.json'
+    data_path = processed_dir / 'travel-data.json'
+
+    scan_result = scan_and_classify_files(raw_dir)
+    timer = StageTimer(verbose)
+
+    for _, roster_info in sorted(scan_result.rosters.items()):
+        timer.run('roster', process_roster, roster_info.filepath, by_month_dir, roster_index_path, rows=employees)
+
+    for source, process_func in TRAVEL_PROCESSORS.items():
+        for file_info in getattr(scan_result, source):
+            kwargs = {'file_info': file_info}
+            if stream and source != 'zaitu':
+                kwargs['stream'] = True
+            timer.run(source, process_func, file_info.filepath, by_month_dir, roster_index_path, rows=rows, **kwargs)
+        if source in timer.stages:
+            timer.stages[source]['records'] = count_shard_records(by_month_dir, source)
+
+    total_records = sum(timer.stages.get(source, {}).get('records', 0) for source in TRAVEL_PROCESSORS)
+    timer.run('merge', merge_data, by_month_dir, data_path, roster_index_path, rows=total_records)
+    timer.run('html', generate_html, data_path, template_path, output_html, rows=total_records)
+
+    return {
+        'stages': timer.stages,
+        'totalSeconds': round(sum(stage['seconds'] for stage in timer.stages.values()), 3),
+        'travelDataMB': round(data_path.stat().st_size / 1024 / 1024, 2) if data_path.exists() else None,
+        'peakRssMB': peak_rss_mb()
+    }
+
+
+def compare_results(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    与基准结果比较，找出耗时增长超过阈值的阶段
+
+    Args:
+        results: 本次结果
+        baseline: 基准结果
+        threshold: 允许的耗时增长比例（0.2 表示 20%）
+
+    Returns:
+        性能回退说明列表（耗时增长不足 MIN_REGRESSION_SECONDS 的阶段不计入）
+    """
+    regressions = []
+    baseline_runs = {(run['rows'], run['employees'], run['months']): run for run in baseline.get('runs', [])}
+
+    for run in results['runs']:
+        base_run = baseline_runs.get((run['rows'], run['employees'], run['months']))
+        if not base_run:
+            continue
+        for name, stage in run['stages'].items():
+            base_stage = base_run['stages'].get(name)
+            if not base_stage or not base_stage['seconds']:
+                continue
+            change = stage['seconds'] / base_stage['seconds'] - 1
+            if change > threshold and stage['seconds'] - base_stage['seconds'] >= MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f'{run["rows"]}行 {name}: {base_stage["seconds"]:.2f}s -> {stage["seconds"]:.2f}s (+{change:.0%})'
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='差旅数据处理流程性能基准测试',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例用法:
+  python benchmark.py                                       # 每个文件1000行，1个月
+  python benchmark.py --rows 1000 10000 100000 --months 3   # 依次测试多个规模
+  python benchmark.py --baseline data/benchmark/base.json   # 与上次结果比较
+
+输出:
+  data/benchmark/<行数>-<员工数>-<月数>/raw/  模拟原始数据（相同参数时复用）
+  data/benchmark/results.json                  各阶段耗时、吞吐量和峰值内存
+        '''
+    )
+
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000], help='每个商旅文件的数据行数，可指定多个 (默认: 1000)')
+    parser.add_argument('--employees', type=int, default=500, help='员工数 (默认: 500)')
+    parser.add_argument('--months', type=int, default=1, help='月份数 (默认: 1)')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子 (默认: 42)')
+    parser.add_argument('-w', '--workdir', default='data/benchmark', help='工作目录 (默认: data/benchmark)')
+    parser.add_argument('-o', '--output', help='结果文件路径 (默认: <工作目录>/results.json)')
+    parser.add_argument('-t', '--template', default=str(DEFAULT_TEMPLATE), help='HTML模板路径')
+    parser.add_argument('--baseline', help='基准结果文件，耗时增长超过阈值时返回非零退出码')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='允许的耗时增长比例 (默认: 0.2)')
+    parser.add_argument('--regenerate', action='store_true', help='重新生成模拟数据')
+    parser.add_argument('--stream', action='store_true', help='阿里/携程使用流式读取')
+    parser.add_argument('-v', '--verbose', action='store_true', help='显示各阶段的输出')
+
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir)
+    output_path = Path(args.output) if args.output else workdir / 'results.json'
+
+    results = {
+        'createdAt': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'stream': args.stream,
+        'runs': []
+    }
+
+    for rows in args.rows:
+        dataset_dir = workdir / f'{rows}-{args.employees}-{args.months}'
+        raw_dir = dataset_dir / 'raw'
+
+        print('=' * 70)
+        print(f'数据集: 每个文件 {rows} 行, {args.employees} 名员工, {args.months} 个月')
+        print('=' * 70)
+
+        generate_seconds = None
+        if args.regenerate or not raw_dir.exists():
+            if raw_dir.exists():
+                shutil.rmtree(raw_dir)
+            start = time.perf_counter()
+            generate_dataset(raw_dir, rows, args.employees, args.months, seed=args.seed)
+            generate_seconds = round(time.perf_counter() - start, 3)
+            print(f'  生成数据   {generate_seconds:8.2f}s')
+
+        run = benchmark_dataset(
+            raw_dir,
+            dataset_dir / 'processed',
+            dataset_dir / 'travel-analysis.html',
+            Path(args.template),
+            rows,
+            args.employees,
+            stream=args.stream,
+            verbose=args.verbose
+        )
+        run.update({
+            'rows': rows,
+            'employees': args.employees,
+            'months': args.months,
+            'generateSeconds': generate_seconds
+        })
+        results['runs'].append(run)
+        print(f'  {"合计":<10} {run["totalSeconds"]:8.2f}s')
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f'\n结果已保存到: {output_path}')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n性能回退（耗时增长超过 {args.threshold:.0%}）:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print('\n与基准结果相比没有性能回退')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+部门信息关联脚本
+
+各处理脚本从Excel提取出的记录先以"未关联部门"的形式保存在
+data/processed/normalized/ 下，再由本脚本与花名册关联，
+填入 deptLevel1/deptLevel2 后写入 data/processed/by-month/。
+
+每条记录按出发/入住日期所在月份，从花名册时间线中取当时生效的部门
+（跨月的账单文件中，上月的出行使用上月的花名册）；记录没有日期时使用分片月份。
+
+花名册更新后只需重新运行本脚本（毫秒级），不必重新解析商旅Excel文件。
+
+分片为逐行JSON格式（见 utils/shard_io.py），记录逐条读取、关联、写出。
+"""
+
+import re
+import sys
+import itertools
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+
+# 添加父目录到路径以导入utils
+sys.path.insert(0, str(Path(__file__).parent))
+from utils import (
+    load_roster_timeline,
+    RosterTimeline,
+    FileReport,
+    MATCH_LABELS,
+    open_shard_writer,
+    read_shard_meta,
+    iter_shard_records,
+    list_shards,
+    legacy_shard_path,
+    SHARD_SUFFIX
+)
+from merge_data import get_employee_name, parse_date_from_record
+
+
+# 记录日期中的年月（如 2025-11-03 / 2025/11/3）
+MONTH_PATTERN = re.compile(r'(\d{4})[-/.](\d{1,2})')
+
+
+def normalized_dir_for(by_month_dir: Path) -> Path:
+    """
+    获取与按月分片目录对应的未关联记录目录
+
+    Args:
+        by_month_dir: 按月分片目录（如 data/processed/by-month）
+
+    Returns:
+        未关联记录目录（如 data/processed/normalized）
+    """
+    return by_month_dir.parent / 'normalized'
+
+
+def build_shard_meta(source_label: str, month: str, source_file: str) -> Dict:
+    """
+    组装分片信息（分片文件的第1行）
+
+    Args:
+        source_label: 数据源名称（如 阿里商旅）
+        month: 月份 (YYYY-MM)
+        source_file: 原始文件名
+
+    Returns:
+        分片信息
+    """
+    return {
+        'source': source_label,
+        'month': month,
+        'sourceFile': source_file,
+        'processedAt': datetime.now().isoformat()
+    }
+
+
+@lru_cache(maxsize=4096)
+def date_month(date: str) -> str:
+    """
+    日期所在月份（同一批记录的日期重复很多，结果缓存）
+
+    Args:
+        date: 日期字符串（如 2025-11-03）
+
+    Returns:
+        月份 (YYYY-MM)，无法识别时返回空字符串
+    """
+    match = MONTH_PATTERN.match(date)
+    if not match:
+        return ''
+    return f'{match.group(1)}-{int(match.group(2)):02d}'
+
+
+def record_month(record: Dict) -> str:
+    """
+    记录日期所在月份
+
+    Args:
+        record: 差旅记录
+
+    Returns:
+        月份 (YYYY-MM)，记录没有可识别的日期时返回空字符串
+    """
+    return date_month(parse_date_from_record(record))
+
+
+def enrich_record(record: Dict, timeline: RosterTimeline, month: Optional[str] = None) -> Tuple[Dict, str]:
+    """
+    按员工姓名和记录日期关联一条记录的部门信息
+
+    Args:
+        record: 未关联部门的记录
+        timeline: 花名册时间线
+        month: 分片月份，记录没有日期时使用
+
+    Returns:
+        (填入 deptLevel1/deptLevel2 的新记录（不修改输入）, 匹配规则)
+    """
+    dept_info, rule = timeline.match(get_employee_name(record), record_month(record) or month)
+    return dict(
+        record,
+        deptLevel1=dept_info.get('deptLevel1', ''),
+        deptLevel2=dept_info.get('deptLevel2', '')
+    ), rule
+
+
+def format_match_counts(match_counts: Dict[str, int]) -> str:
+    """格式化各匹配规则的记录数，如 精确 2800 / 规范化姓名 30 / 未匹配 12"""
+    return ' / '.join(f'{MATCH_LABELS[rule]} {count}' for rule, count in match_counts.items() if count)
+
+
+def warn_missing_roster(timeline: RosterTimeline, month: Optional[str]):
+    """没有花名册，或分片月份没有对应的花名册时打印警告"""
+    if not len(timeline):
+        print('警告: 未找到花名册数据')
+    elif timeline.months and month not in timeline.months:
+        print(f'警告: 未找到月份 {month} 的花名册数据，使用相邻月份的花名册')
+
+
+def remove_legacy_shard(path: Path):
+    """写入新格式分片后删除同名的旧版分片（避免合并时重复读取）"""
+    legacy_path = legacy_shard_path(path)
+    if legacy_path != path and legacy_path.exists():
+        legacy_path.unlink()
+
+
+def enrich_shard_data(
+    meta: Dict,
+    records: Iterable[Dict],
+    shard_name: str,
+    by_month_dir: Path,
+    timeline: RosterTimeline,
+    report: Optional[FileReport] = None
+) -> Path:
+    """
+    逐条关联部门信息并写入 by-month 分片
+
+    Args:
+        meta: 分片信息
+        records: 未关联部门的记录（可以是生成器，只遍历一次）
+        shard_name: 分片文件名（如 alibaba_2025-12.ndjson）
+        by_month_dir: 按月分片目录
+        timeline: 花名册时间线
+        report: 文件运行统计，记录输出记录数和各匹配规则的记录数
+
+    Returns:
+        写入的分片文件路径
+    """
+    month = meta.get('month')
+    match_counts = dict.fromkeys(MATCH_LABELS, 0)
+    matched_count = 0
+
+    output_file = by_month_dir / shard_name
+    with open_shard_writer(output_file, meta) as writer:
+        for record in records:
+            record, rule = enrich_record(record, timeline, month)
+            match_counts[rule] += 1
+            if record['deptLevel1']:
+                matched_count += 1
+            writer.write(record)
+    remove_legacy_shard(output_file)
+
+    if report is not None:
+        report.rows_out = writer.count
+        report.matches = match_counts
+
+    print(f'  保存到: {output_file}')
+
+    # 统计关联率
+    if writer.count:
+        match_rate = matched_count / writer.count * 100
+        print(f'  部门关联率: {matched_count}/{writer.count} ({match_rate:.1f}%)')
+        print(f'  姓名匹配: {format_match_counts(match_counts)}')
+
+    return output_file
+
+
+def _tee_records(records: Iterable[Dict], writer) -> Iterator[Dict]:
+    """逐条写入未关联部门的分片，同时把记录交给下一步"""
+    for record in records:
+        writer.write(record)
+        yield record
+
+
+def save_travel_shard(
+    source: str,
+    source_label: str,
+    month: str,
+    source_file: str,
+    records: Iterable[Dict],
+    by_month_dir: Path,
+    roster_index_path: Path,
+    report: Optional[FileReport] = None
+) -> Optional[Path]:
+    """
+    保存处理脚本提取的记录：边读取边写入未关联部门的记录，同时关联部门写入 by-month 分片
+
+    两个分片都是原子写入，提取过程中出错时（异常会继续抛出）原有分片保持不变。
+
+    Args:
+        source: 数据源标识（'alibaba', 'ctrip', 'zaitu'），用作文件名前缀
+        source_label: 数据源名称（如 阿里商旅）
+        month: 月份 (YYYY-MM)
+        source_file: 原始文件名
+        records: 未关联部门的记录（可以是边读取Excel边产生的生成器）
+        by_month_dir: 按月分片目录
+        roster_index_path: 花名册索引文件路径
+        report: 文件运行统计，为None时不统计
+
+    Returns:
+        写入的 by-month 分片文件路径，没有记录时不写入，返回None
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        if report is not None:
+            report.rows_out = 0
+        return None
+
+    shard_name = f'{source}_{month}{SHARD_SUFFIX}'
+    meta = build_shard_meta(source_label, month, source_file)
+
+    timeline = load_roster_timeline(roster_index_path)
+    warn_missing_roster(timeline, month)
+
+    normalized_file = normalized_dir_for(by_month_dir) / shard_name
+    with open_shard_writer(normalized_file, meta) as writer:
+        output_file = enrich_shard_data(
+            meta, _tee_records(itertools.chain([first], records), writer),
+            shard_name, by_month_dir, timeline, report
+        )
+    remove_legacy_shard(normalized_file)
+
+    return output_file
+
+
+def enrich_shard(
+    shard_name: str,
+    by_month_dir: Path,
+    roster_index_path: Path
+) -> Optional[Path]:
+    """
+    用当前花名册重新关联一个已保存的分片
+
+    Args:
+        shard_name: 分片文件名（如 alibaba_2025-12.ndjson）
+        by_month_dir: 按月分片目录
+        roster_index_path: 花名册索引文件路径
+
+    Returns:
+        写入的分片文件路径，没有对应的未关联记录时返回None
+    """
+    normalized_file = normalized_dir_for(by_month_dir) / shard_name
+    if not normalized_file.exists():
+        return None
+
+    meta = read_shard_meta(normalized_file)
+    timeline = load_roster_timeline(roster_index_path)
+    warn_missing_roster(timeline, meta.get('month'))
+
+    print(f'\n关联部门信息: {shard_name}')
+    return enrich_shard_data(
+        meta, iter_shard_records(normalized_file),
+        Path(shard_name).stem + SHARD_SUFFIX, by_month_dir, timeline
+    )
+
+
+def enrich_all(
+    by_month_dir: Path,
+    roster_index_path: Path,
+    months: Optional[List[str]] = None
+) -> List[Path]:
+    """
+    重新关联所有（或指定月份的）已保存分片
+
+    Args:
+        by_month_dir: 按月分片目录
+        roster_index_path: 花名册索引文件路径
+        months: 只处理这些月份，为None时处理全部
+
+    Returns:
+        写入的分片文件路径列表
+    """
+    written = []
+    normalized_dir = normalized_dir_for(by_month_dir)
+    if not normalized_dir.exists():
+        print(f'警告: 未关联记录目录不存在: {normalized_dir}')
+        return written
+
+    for normalized_file in list_shards(normalized_dir):
+        month = normalized_file.stem.rsplit('_', 1)[-1]
+        if months is not None and month not in months:
+            continue
+        output_file = enrich_shard(normalized_file.name, by_month_dir, roster_index_path)
+        if output_file:
+            written.append(output_file)
+
+    return written
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='用当前花名册重新关联部门信息（无需重新读取商旅Excel）')
+    parser.add_argument('-o', '--output', default='data/processed', help='输出目录')
+    parser.add_argument('-r', '--roster', help='花名册索引文件 (默认: <输出目录>/roster_index.json)')
+    parser.add_argument('-m', '--month', action='append', help='只处理指定月份 (YYYY-MM)，可重复指定')
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output)
+    roster_index_path = Path(args.roster) if args.roster else output_dir / 'roster_index.json'
+
+    written = enrich_all(output_dir / 'by-month', roster_index_path, args.month)
+    print(f'\n共更新 {len(written)} 个分片')
@@ -6,11 +6,14 @@ HTML生成脚本
 """
 
 import sys
-import json
 import argparse
 from pathlib import Path
 from datetime import datetime
 
+# 添加父目录到路径以导入utils
+sys.path.insert(0, str(Path(__file__).parent))
+from utils import profile_run, record_count, read_json, json_dumps, set_json_pretty, json_io_stats
+
 
 def generate_html(
     data_path: Path,
@@ -39,10 +42,9 @@ def generate_html(
         return False
 
     print(f'读取数据文件: {data_path}')
-    with open(data_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = read_json(data_path)
 
-    print(f'  记录数: {len(data.get("records", []))}')
+    print(f'  记录数: {record_count(data)}')
     print(f'  总金额: ¥{data.get("summary", {}).get("totalAmount", 0):,.2f}')
 
     # 读取模板
@@ -107,8 +109,8 @@ def generate_html(
     print(f'  echarts: {len(echarts_content):,} 字节 ({len(echarts_content) / 1024:.1f} KB)')
     print(f'  dayjs: {len(dayjs_content):,} 字节 ({len(dayjs_content) / 1024:.1f} KB)')
 
-    # 嵌入数据
-    data_json = json.dumps(data, ensure_ascii=False, indent=2)
+    # 嵌入数据（列式格式由 app.js 的 decodeTravelData 解码）
+    data_json = json_dumps(data)
 
     # 构建内嵌脚本（包含库）
     embedded_scripts = f'''    <script>
@@ -181,14 +183,27 @@ def main():
         default='output/travel-analysis.html',
         help='输出HTML文件路径 (默认: output/travel-analysis.html)'
     )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='嵌入的数据使用缩进格式（便于调试，默认为紧凑格式）'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='性能剖析，结果保存到输出目录的 profile/'
+    )
 
     args = parser.parse_args()
+    set_json_pretty(args.pretty)
 
     data_path = Path(args.data)
     template_path = Path(args.template)
     output_path = Path(args.output)
 
-    success = generate_html(data_path, template_path, output_path)
+    with profile_run(output_path.parent, 'generate_html', enabled=args.profile):
+        success = generate_html(data_path, template_path, output_path)
+    json_io_stats().print_summary()
 
     sys.exit(0 if success else 1)
 
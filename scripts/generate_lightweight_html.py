@@ -6,12 +6,15 @@
 """
 
 import sys
-import json
 import argparse
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+# 添加父目录到路径以导入utils
+sys.path.insert(0, str(Path(__file__).parent))
+from utils import profile_run, decode_travel_data, read_json, json_dumps, set_json_pretty, json_io_stats
+
 
 def sample_data(data: dict, max_records: int = 500) -> dict:
     """
@@ -76,8 +79,7 @@ def generate_lightweight_html(
         return False
 
     print(f'读取数据文件: {data_path}')
-    with open(data_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = decode_travel_data(read_json(data_path))
 
     total_records = len(data.get('records', []))
     print(f'  原始记录数: {total_records}')
@@ -134,7 +136,7 @@ def generate_lightweight_html(
     print(f'  dayjs: {len(dayjs_content):,} 字节 ({len(dayjs_content) / 1024:.1f} KB)')
 
     # 嵌入抽样数据
-    data_json = json.dumps(sampled_data, ensure_ascii=False, indent=2)
+    data_json = json_dumps(sampled_data)
 
     # 添加抽样提示到app.js
     sampled_notice = '''
@@ -266,14 +268,27 @@ def main():
         default=200,
         help='每种类型最多保留的记录数 (默认: 200)'
     )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='嵌入的数据使用缩进格式（便于调试，默认为紧凑格式）'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='性能剖析，结果保存到输出目录的 profile/'
+    )
 
     args = parser.parse_args()
+    set_json_pretty(args.pretty)
 
     data_path = Path(args.data)
     template_path = Path(args.template)
     output_path = Path(args.output)
 
-    success = generate_lightweight_html(data_path, template_path, output_path, args.max_records)
+    with profile_run(output_path.parent, 'generate_lightweight_html', enabled=args.profile):
+        success = generate_lightweight_html(data_path, template_path, output_path, args.max_records)
+    json_io_stats().print_summary()
 
     sys.exit(0 if success else 1)
 
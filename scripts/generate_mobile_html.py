@@ -6,12 +6,15 @@
 """
 
 import sys
-import json
 import argparse
 from pathlib import Path
 from datetime import datetime
 import shutil
 
+# 添加父目录到路径以导入utils
+sys.path.insert(0, str(Path(__file__).parent))
+from utils import profile_run, record_count, read_json, json_io_stats
+
 
 def generate_mobile_html(
     data_path: Path,
@@ -40,10 +43,9 @@ def generate_mobile_html(
         return False
 
     print(f'读取数据文件: {data_path}')
-    with open(data_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = read_json(data_path)
 
-    print(f'  记录数: {len(data.get("records", []))}')
+    print(f'  记录数: {record_count(data)}')
     print(f'  总金额: ¥{data.get("summary", {}).get("totalAmount", 0):,.2f}')
 
     # 读取模板
@@ -78,14 +80,14 @@ def generate_mobile_html(
 
     # 嵌入app.js（修改为异步加载数据）
     modified_app_js = app_js_content.replace(
-        'this.data = TRAVEL_DATA;',
+        'this.data = decodeTravelData(TRAVEL_DATA);',
         '''
         // 移动端：异步加载数据
         fetch('travel-data.json')
             .then(response => response.json())
             .then(data => {
-                this.data = data;
-                this.filteredData = [...data.records];
+                this.data = decodeTravelData(data);
+                this.filteredData = [...this.data.records];
                 this.initUI();
                 this.bindEvents();
                 this.applyFilters();
@@ -204,6 +206,11 @@ def main():
         default='output/mobile',
         help='输出目录 (默认: output/mobile)'
     )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='性能剖析，结果保存到输出目录的 profile/'
+    )
 
     args = parser.parse_args()
 
@@ -211,7 +218,9 @@ def main():
     template_path = Path(args.template)
     output_dir = Path(args.output)
 
-    success = generate_mobile_html(data_path, template_path, output_dir)
+    with profile_run(output_dir, 'generate_mobile_html', enabled=args.profile):
+        success = generate_mobile_html(data_path, template_path, output_dir)
+    json_io_stats().print_summary()
 
     sys.exit(0 if success else 1)
 
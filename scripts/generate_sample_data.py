@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+"""
+模拟数据生成脚本
+
+按各处理脚本期望的格式（表头偏移、工作表名称、列位置）生成仿真的
+花名册、阿里、携程、在途商旅文件，用于性能测试和回归比对。
+"""
+
+import random
+import argparse
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+from openpyxl import Workbook
+
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤'
+GIVEN_CHARS = '伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英华建国文玉兰海燕鹏飞宇浩然子轩雨欣晨阳思远嘉怡俊杰梦琪晓东志强丹丹'
+ENGLISH_NAMES = ['Alice', 'Bob', 'Cathy', 'David', 'Eric', 'Fiona', 'Grace', 'Henry', 'Ivy', 'Jack',
+                 'Kevin', 'Lily', 'Mike', 'Nina', 'Oscar', 'Peter', 'Queenie', 'Ryan', 'Sara', 'Tony']
+DEPARTMENTS = {
+    '教培业务中心': ['职业培训组', '互联网副业组', '课程研发组'],
+    '零售业务中心': ['出海销售组', '团购连锁组', '渠道组'],
+    '客户运营中心': ['基础管家组', '高级管家组'],
+    'AIO平台中心': ['AIO产品组', 'AIO研发组'],
+    '职能中心': ['财务组', '人力组', '行政组']
+}
+CITIES = ['北京', '上海', '深圳', '广州', '杭州', '成都', '重庆', '武汉', '西安', '南京', '郑州', '青岛', '长沙']
+AIRLINES = [('CA', '中国国航'), ('MU', '东方航空'), ('CZ', '南方航空'), ('HU', '海南航空'), ('3U', '四川航空')]
+CABINS = ['经济舱', '经济舱', '经济舱', '商务舱', '头等舱']
+CTRIP_CABIN_CODES = ['Y', 'B', 'M', 'H', 'C', 'F']
+SEATS = ['二等座', '二等座', '一等座', '商务座']
+CAR_TYPES = ['经济型', '舒适型', '商务型']
+CAR_PROVIDERS = ['滴滴出行', '曹操出行', '及时用车', 'T3出行']
+HOTELS = ['全季酒店', '汉庭酒店', '亚朵酒店', '秋果酒店', '维也纳酒店']
+ROOM_TYPES = ['高级大床房', '标准双床房', '商务大床房']
+
+# 各工作表按行数分配的权重
+ALIBABA_SHEET_WEIGHTS = {'flight': 0.2, 'train': 0.2, 'car': 0.5, 'hotel': 0.1}
+CTRIP_SHEET_WEIGHTS = {'flight': 0.5, 'hotel_member': 0.3, 'hotel_agreement': 0.2}
+ZAITU_SHEET_WEIGHTS = {'flight': 0.15, 'hotel': 0.15, 'train': 0.15, 'car': 0.55}
+
+# 无效行（小计/合计等）占比
+JUNK_ROW_RATIO = 0.01
+
+# .xls（BIFF8）格式每个工作表的最大行数
+XLS_MAX_ROWS = 65536
+
+
+def make_employees(count: int, rng: random.Random) -> List[Dict]:
+    """
+    生成员工列表
+
+    Args:
+        count: 员工数
+        rng: 随机数生成器
+
+    Returns:
+        员工列表（姓名唯一）
+    """
+    employees = []
+    seen = set()
+    while len(employees) < count:
+        name = rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN_CHARS) for _ in range(rng.choice([1, 2])))
+        if name in seen:
+            name = f'{name}{len(employees)}'
+        seen.add(name)
+
+        dept1 = rng.choice(list(DEPARTMENTS))
+        employees.append({
+            'name': name,
+            'englishName': f'{rng.choice(ENGLISH_NAMES)} {name[0]}',
+            'deptLevel1': dept1,
+            'deptLevel2': rng.choice(DEPARTMENTS[dept1]),
+            'position': rng.choice(['销售', '经理', '专员', '工程师', '总监'])
+        })
+    return employees
+
+
+def month_window(month: str, start_day: int) -> Tuple[date, date]:
+    """
+    计算商旅账单周期（上月start_day日 至 本月start_day-1日）
+
+    Args:
+        month: 月份 (YYYY-MM)
+        start_day: 账期起始日
+
+    Returns:
+        (开始日期, 结束日期)
+    """
+    year, mon = map(int, month.split('-'))
+    end = date(year, mon, start_day - 1)
+    prev_year, prev_mon = (year, mon - 1) if mon > 1 else (year - 1, 12)
+    return date(prev_year, prev_mon, start_day), end
+
+
+def month_sequence(start_month: str, months: int) -> List[str]:
+    """生成连续月份列表 (YYYY-MM)"""
+    year, mon = map(int, start_month.split('-'))
+    result = []
+    for _ in range(months):
+        result.append(f'{year}-{mon:02d}')
+        mon += 1
+        if mon > 12:
+            year, mon = year + 1, 1
+    return result
+
+
+def random_datetime(rng: random.Random, start: date, end: date) -> datetime:
+    """在日期范围内生成随机时间"""
+    days = (end - start).days
+    day = start + timedelta(days=rng.randint(0, days))
+    return datetime(day.year, day.month, day.day, rng.randint(6, 22), rng.choice([0, 10, 20, 30, 40, 50]))
+
+
+def split_rows(total: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """按权重把总行数分配到各工作表"""
+    counts = {key: int(total * weight) for key, weight in weights.items()}
+    first = next(iter(counts))
+    counts[first] += total - sum(counts.values())
+    return counts
+
+
+def pick_traveller(employees: List[Dict], rng: random.Random) -> str:
+    """随机选择出行人，少量为花名册以外的人员"""
+    if rng.random() < 0.05:
+        return rng.choice(SURNAMES) + '外部' + str(rng.randint(1, 99))
+    return rng.choice(employees)['name']
+
+
+class OrderNumbers:
+    """递增的订单号生成器"""
+
+    def __init__(self, start: int):
+        self.current = start
+
+    def next(self) -> str:
+        self.current += 1
+        return str(self.current)
+
+
+def write_roster(path: Path, employees: List[Dict], rng: random.Random):
+    """
+    生成花名册文件（工作表"原表"）
+
+    Args:
+        path: 输出路径
+        employees: 员工列表
+        rng: 随机数生成器
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('原表')
+    ws.append(['工号', '姓名', '英文名', '一级部门', '二级部门', '三级部门', '岗位', '在职状态', '入职日期'])
+
+    for i, emp in enumerate(employees):
+        status = '在职' if rng.random() > 0.05 else rng.choice(['离职', '试用期'])
+        ws.append([
+            f'E{i:06d}',
+            emp['name'],
+            emp['englishName'] if rng.random() > 0.2 else None,
+            emp['deptLevel1'],
+            emp['deptLevel2'],
+            None,
+            emp['position'],
+            status,
+            datetime(2020, 1, 1) + timedelta(days=rng.randint(0, 1800))
+        ])
+    wb.save(path)
+
+
+def alibaba_flight_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """阿里机票行（header=2后的列位置，共40列）"""
+    row = [None] * 40
+    code, airline = rng.choice(AIRLINES)
+    origin, destination = rng.sample(CITIES, 2)
+    row[0] = '国内机票'
+    row[1] = order
+    row[2] = when - timedelta(days=rng.randint(1, 10))
+    row[3] = traveller
+    row[5] = traveller
+    row[14] = datetime(when.year, when.month, when.day)
+    row[15] = when.strftime('%H:%M')
+    row[18] = origin
+    row[19] = destination
+    row[23] = airline
+    row[24] = f'{code}{rng.randint(1000, 9999)}'
+    row[25] = rng.choice('YBMHC')
+    row[26] = rng.choice(CABINS)
+    row[35] = round(rng.uniform(300, 3000), 2)
+    return row
+
+
+def alibaba_train_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """阿里火车行（共30列）"""
+    row = [None] * 30
+    origin, destination = rng.sample(CITIES, 2)
+    row[1] = order
+    row[2] = traveller
+    row[3] = traveller
+    row[10] = datetime(when.year, when.month, when.day)
+    row[11] = when.strftime('%H:%M')
+    row[12] = datetime(when.year, when.month, when.day)
+    row[13] = (when + timedelta(hours=rng.randint(1, 8))).strftime('%H:%M')
+    row[14] = origin
+    row[15] = destination
+    row[16] = f'{rng.choice("GDK")}{rng.randint(1, 999)}'
+    row[18] = rng.choice(SEATS)
+    row[24] = round(rng.uniform(50, 1000), 2)
+    return row
+
+
+def alibaba_car_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """阿里用车行（共46列）"""
+    row = [None] * 46
+    city = rng.choice(CITIES)
+    end = when + timedelta(minutes=rng.randint(10, 90))
+    row[1] = order
+    row[3] = traveller
+    row[6] = traveller if rng.random() > 0.1 else f'EMP{rng.randint(1000, 9999)}'
+    row[14] = when.strftime('%Y-%m-%d')
+    row[15] = when.strftime('%H:%M:%S')
+    row[16] = end.strftime('%Y-%m-%d')
+    row[17] = end.strftime('%H:%M:%S')
+    row[18] = city
+    row[19] = f'{city}科技园{rng.randint(1, 9)}号门'
+    row[21] = city
+    row[22] = f'{city}火车站'
+    row[25] = round(rng.uniform(1, 60), 2)
+    row[32] = round(rng.uniform(10, 300), 2)
+    row[41] = rng.choice(CAR_PROVIDERS)
+    row[42] = rng.choice(CAR_TYPES)
+    row[43] = rng.choice(CAR_TYPES) if rng.random() > 0.2 else None
+    return row
+
+
+def alibaba_hotel_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """阿里酒店行（当前处理脚本未提取，仅占位）"""
+    row = [None] * 30
+    row[1] = order
+    row[3] = traveller
+    row[10] = rng.choice(HOTELS)
+    row[20] = round(rng.uniform(200, 800), 2)
+    return row
+
+
+def write_header_block(ws, title: str, width: int, header: List[str], extra_rows: int):
+    """写入标题行和表头"""
+    ws.append([title] + [None] * (width - 1))
+    for _ in range(extra_rows):
+        ws.append([None] * width)
+    ws.append(header)
+
+
+def write_alibaba(
+    path: Path,
+    rows: int,
+    window: Tuple[date, date],
+    employees: List[Dict],
+    rng: random.Random,
+    orders: OrderNumbers
+):
+    """
+    生成阿里商旅文件
+
+    格式：第1-2行标题，第3行表头，第4行合计，第5行起数据
+
+    Args:
+        path: 输出路径
+        rows: 数据行数（分配到各工作表）
+        window: 账单周期
+        employees: 员工列表
+        rng: 随机数生成器
+        orders: 订单号生成器
+    """
+    sheets = {
+        'flight': ('本期国内机票交易明细', 40, alibaba_flight_row),
+        'train': ('本期国内商旅火车票交易明细', 30, alibaba_train_row),
+        'car': ('国内用车对账单', 46, alibaba_car_row),
+        'hotel': ('国内酒店对账单', 30, alibaba_hotel_row)
+    }
+    counts = split_rows(rows, ALIBABA_SHEET_WEIGHTS)
+
+    wb = Workbook(write_only=True)
+    for key, (sheet_name, width, make_row) in sheets.items():
+        ws = wb.create_sheet(sheet_name)
+        header = [f'字段{i}' for i in range(width)]
+        write_header_block(ws, f'阿里商旅{sheet_name}', width, header, extra_rows=1)
+        ws.append(['合计'] + [None] * (width - 1))
+
+        for _ in range(counts[key]):
+            if rng.random() < JUNK_ROW_RATIO:
+                junk = [None] * width
+                junk[3] = junk[5] = rng.choice(['小计', '合计'])
+                ws.append(junk)
+                continue
+            when = random_datetime(rng, *window)
+            ws.append(make_row(orders.next(), pick_traveller(employees, rng), when, rng))
+
+    # 与处理无关的汇总工作表
+    summary = wb.create_sheet('账单汇总')
+    summary.append(['项目', '金额'])
+    summary.append(['合计', round(rng.uniform(1e4, 1e6), 2)])
+    wb.save(path)
+
+
+def ctrip_flight_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """携程机票行（共20列）"""
+    row = [None] * 20
+    code, _ = rng.choice(AIRLINES)
+    origin, destination = rng.sample(CITIES, 2)
+    row[0] = order
+    row[5] = traveller
+    row[6] = (when - timedelta(days=rng.randint(1, 10))).strftime('%Y-%m-%d %H:%M:%S')
+    row[7] = when.strftime('%Y-%m-%d %H:%M:%S')
+    row[11] = f'{origin}-{destination}'
+    row[12] = f'{code}{rng.randint(1000, 9999)}'
+    row[13] = rng.choice(CTRIP_CABIN_CODES)
+    row[14] = round(rng.uniform(300, 3000), 2) * (-1 if rng.random() < 0.05 else 1)
+    return row
+
+
+def ctrip_hotel_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """携程酒店行（共22列）"""
+    row = [None] * 22
+    nights = rng.randint(1, 4)
+    check_in = datetime(when.year, when.month, when.day)
+    price = round(rng.uniform(200, 800), 2)
+    row[0] = order
+    row[4] = traveller
+    row[6] = (when - timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S')
+    row[7] = check_in
+    row[8] = check_in + timedelta(days=nights)
+    row[9] = rng.choice(CITIES)
+    row[10] = rng.choice(HOTELS)
+    row[12] = rng.choice(ROOM_TYPES)
+    row[14] = price
+    row[18] = round(price * nights, 2)
+    return row
+
+
+def write_ctrip(
+    path: Path,
+    rows: int,
+    window: Tuple[date, date],
+    employees: List[Dict],
+    rng: random.Random,
+    orders: OrderNumbers
+):
+    """
+    生成携程商旅文件
+
+    格式：第1-4行标题，第5行中文表头，第6行英文表头，第7行起数据
+
+    Args:
+        path: 输出路径
+        rows: 数据行数
+        window: 账单周期
+        employees: 员工列表
+        rng: 随机数生成器
+        orders: 订单号生成器
+    """
+    flight_header_cn = ['订单号'] + [f'字段{i}' for i in range(1, 20)]
+    flight_header_en = ['OrderID', 'A', 'B', 'C', 'D', 'PassengerName', 'OrderDate', 'TakeOffTime',
+                        'E', 'F', 'G', 'OrderDesc', 'Flight', 'Class', 'price'] + [f'X{i}' for i in range(15, 20)]
+    hotel_header_cn = ['订单号'] + [f'字段{i}' for i in range(1, 22)]
+    hotel_header_en = ['OrderID', 'A', 'B', 'C', 'clients', 'D', 'OrderDate', 'ETA', 'ETD', 'city',
+                       'HotelName', 'E', 'roomname', 'F', 'Price', 'G', 'H', 'I', 'Amount'] + [f'X{i}' for i in range(19, 22)]
+
+    sheets = {
+        'flight': ('预存机票', flight_header_cn, flight_header_en, ctrip_flight_row),
+        'hotel_member': ('预存会员酒店', hotel_header_cn, hotel_header_en, ctrip_hotel_row),
+        'hotel_agreement': ('预存协议酒店', hotel_header_cn, hotel_header_en, ctrip_hotel_row)
+    }
+    counts = split_rows(rows, CTRIP_SHEET_WEIGHTS)
+
+    wb = Workbook(write_only=True)
+    for key, (sheet_name, header_cn, header_en, make_row) in sheets.items():
+        ws = wb.create_sheet(sheet_name)
+        width = len(header_cn)
+        ws.append([f'携程商旅{sheet_name}'] + [None] * (width - 1))
+        for _ in range(3):
+            ws.append([None] * width)
+        ws.append(header_cn)
+        ws.append(header_en)
+
+        # 携程导出在数据中间重复出现表头行
+        repeat_at = counts[key] // 2
+        for i in range(counts[key]):
+            if i == repeat_at:
+                ws.append(header_cn)
+                ws.append(header_en)
+            when = random_datetime(rng, *window)
+            ws.append(make_row(orders.next(), pick_traveller(employees, rng), when, rng))
+
+    wb.create_sheet('预存增值').append(['订单号', '金额'])
+    wb.save(path)
+
+
+def zaitu_flight_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """在途机票行（共36列）"""
+    row = [None] * 36
+    code, airline = rng.choice(AIRLINES)
+    origin, destination = rng.sample(CITIES, 2)
+    price = round(rng.uniform(300, 3000), 2)
+    row[1] = order
+    row[5] = (when - timedelta(days=rng.randint(1, 10))).strftime('%Y-%m-%d %H:%M')
+    row[6] = traveller
+    row[7] = airline
+    row[8] = f'{code}{rng.randint(1000, 9999)}'
+    row[9] = rng.choice(CABINS)
+    row[13] = when.strftime('%Y-%m-%d %H:%M:%S')
+    row[15] = f'{origin}-{destination}'
+    row[17] = traveller
+    row[23] = price
+    row[31] = price
+    row[33] = round(price + 20, 2)
+    return row
+
+
+def zaitu_hotel_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """在途酒店行（共22列）"""
+    row = [None] * 22
+    nights = rng.randint(1, 4)
+    price = round(rng.uniform(200, 800), 2)
+    row[1] = order
+    row[6] = traveller
+    row[7] = rng.choice(CITIES)
+    row[8] = rng.choice(HOTELS)
+    row[9] = rng.choice(ROOM_TYPES)
+    row[10] = when.strftime('%Y-%m-%d 00:00')
+    row[11] = (when + timedelta(days=nights)).strftime('%Y-%m-%d 00:00')
+    row[13] = traveller
+    row[16] = round(price * nights, 2)
+    row[19] = round(price * nights + 10, 2)
+    return row
+
+
+def zaitu_train_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """在途火车行（共28列）"""
+    row = [None] * 28
+    origin, destination = rng.sample(CITIES, 2)
+    price = round(rng.uniform(50, 1000), 2)
+    row[1] = order
+    row[6] = traveller
+    row[7] = f'{rng.choice("GDK")}{rng.randint(1, 999)}'
+    row[8] = rng.choice(SEATS)
+    row[9] = origin
+    row[10] = destination
+    row[11] = when.strftime('%Y-%m-%d %H:%M')
+    row[19] = traveller
+    row[24] = price
+    row[26] = round(price + 5, 2)
+    return row
+
+
+def zaitu_car_row(order: str, traveller: str, when: datetime, rng: random.Random) -> List:
+    """在途用车行（共40列，部分字段按列名读取）"""
+    row = [None] * 40
+    city = rng.choice(CITIES)
+    end = when + timedelta(minutes=rng.randint(10, 90))
+    row[1] = order
+    row[5] = traveller
+    row[8] = when.strftime('%Y-%m-%d %H:%M')
+    row[9] = end.strftime('%Y-%m-%d %H:%M')
+    row[11] = rng.choice(CAR_TYPES)
+    row[13] = f'{city}/南山区/科技园{rng.randint(1, 9)}号门'
+    row[14] = f'{city}/福田区/会展中心'
+    row[19] = rng.choice(CAR_PROVIDERS)
+    row[29] = round(rng.uniform(1, 60), 2)
+    row[38] = round(rng.uniform(10, 300), 2)
+    return row
+
+
+def zaitu_car_header() -> List[str]:
+    """在途用车表头（列名需与 extract_zaitu_car_record 一致）"""
+    header = [f'字段{i}' for i in range(40)]
+    header[1] = '订单号'
+    header[5] = '乘车人'
+    header[8] = '上车时间'
+    header[9] = '下车时间'
+    header[11] = '用车类型'
+    header[13] = '出发地（城市/区县/具体地址）'
+    header[14] = '目的地（城市/区县/具体地址）'
+    header[19] = '服务方'
+    header[29] = '行驶公里数'
+    header[38] = '订单总金额'
+    return header
+
+
+def zaitu_sheets(
+    rows: int,
+    window: Tuple[date, date],
+    employees: List[Dict],
+    rng: random.Random,
+    orders: OrderNumbers
+):
+    """
+    生成在途商旅各工作表的内容
+
+    Returns:
+        生成器，依次产出 (工作表名, 行迭代器)
+    """
+    sheets = {
+        'flight': ('机票', [f'字段{i}' for i in range(36)], zaitu_flight_row),
+        'hotel': ('酒店', [f'字段{i}' for i in range(22)], zaitu_hotel_row),
+        'train': ('火车票', [f'字段{i}' for i in range(28)], zaitu_train_row),
+        'car': ('用车', zaitu_car_header(), zaitu_car_row)
+    }
+    counts = split_rows(rows, ZAITU_SHEET_WEIGHTS)
+
+    def sheet_rows(key, header, make_row):
+        yield header
+        for _ in range(counts[key]):
+            when = random_datetime(rng, *window)
+            yield make_row(orders.next(), pick_traveller(employees, rng), when, rng)
+
+    yield '汇总', iter([['类型', '金额'], ['合计', round(rng.uniform(1e4, 1e6), 2)]])
+    for key, (sheet_name, header, make_row) in sheets.items():
+        yield sheet_name, sheet_rows(key, header, make_row)
+
+
+def write_zaitu(
+    path: Path,
+    rows: int,
+    window: Tuple[date, date],
+    employees: List[Dict],
+    rng: random.Random,
+    orders: OrderNumbers
+) -> str:
+    """
+    生成在途商旅文件（.xls）
+
+    安装了 xlwt 时写入真正的 BIFF8 .xls；否则写入 xlsx 内容并保留 .xls 扩展名
+    （处理脚本在 xlrd 失败时会回退到 openpyxl）。
+
+    Returns:
+        实际写入的格式: 'xls' 或 'xlsx'
+    """
+    try:
+        import xlwt
+    except ImportError:
+        xlwt = None
+
+    # .xls 每个工作表最多 65536 行（含表头），超出时只能写 xlsx 内容
+    largest_sheet = max(split_rows(rows, ZAITU_SHEET_WEIGHTS).values()) + 1
+    sheets = zaitu_sheets(rows, window, employees, rng, orders)
+
+    if xlwt is not None and largest_sheet <= XLS_MAX_ROWS:
+        wb = xlwt.Workbook(encoding='utf-8')
+        for sheet_name, sheet_rows in sheets:
+            ws = wb.add_sheet(sheet_name)
+            for r, values in enumerate(sheet_rows):
+                for c, value in enumerate(values):
+                    if value is not None:
+                        ws.write(r, c, value)
+        wb.save(str(path))
+        return 'xls'
+
+    wb = Workbook(write_only=True)
+    for sheet_name, sheet_rows in sheets:
+        ws = wb.create_sheet(sheet_name)
+        for values in sheet_rows:
+            ws.append(values)
+    wb.save(path)
+    return 'xlsx'
+
+
+def generate_dataset(
+    output_dir: Path,
+    rows: int,
+    employees_count: int,
+    months: int,
+    start_month: str = '2025-01',
+    seed: int = 42,
+    sources: Tuple[str, ...] = ('alibaba', 'ctrip', 'zaitu')
+) -> Dict:
+    """
+    生成完整的模拟数据集
+
+    Args:
+        output_dir: 输出目录（相当于 data/raw）
+        rows: 每个商旅文件的数据行数
+        employees_count: 员工数
+        months: 月份数
+        start_month: 起始月份 (YYYY-MM)
+        seed: 随机种子
+        sources: 要生成的商旅数据源
+
+    Returns:
+        生成的文件清单
+    """
+    rng = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    employees = make_employees(employees_count, rng)
+    orders = OrderNumbers(1_000_000_000_000_000)
+
+    manifest = {'rows': rows, 'employees': employees_count, 'months': [], 'files': []}
+
+    for month in month_sequence(start_month, months):
+        manifest['months'].append(month)
+        year, mon = month.split('-')
+
+        roster_path = output_dir / f'{year}年{int(mon)}月花名册.xlsx'
+        write_roster(roster_path, employees, rng)
+        manifest['files'].append(roster_path.name)
+
+        # 模拟调岗：每月少量员工更换部门
+        for emp in rng.sample(employees, max(1, len(employees) // 50)):
+            emp['deptLevel1'] = rng.choice(list(DEPARTMENTS))
+            emp['deptLevel2'] = rng.choice(DEPARTMENTS[emp['deptLevel1']])
+
+        if 'alibaba' in sources:
+            window = month_window(month, 25)
+            path = output_dir / f'阿里{window[0]:%Y%m%d}-{window[1]:%Y%m%d}.xlsx'
+            write_alibaba(path, rows, window, employees, rng, orders)
+            manifest['files'].append(path.name)
+
+        if 'ctrip' in sources:
+            window = month_window(month, 26)
+            path = output_dir / f'携程{window[0]:%Y%m%d}-{window[1]:%Y%m%d}.xlsx'
+            write_ctrip(path, rows, window, employees, rng, orders)
+            manifest['files'].append(path.name)
+
+        if 'zaitu' in sources:
+            window = month_window(month, 26)
+            path = output_dir / f'在途{window[0]:%Y%m%d}-{window[1]:%Y%m%d}.xls'
+            write_zaitu(path, rows, window, employees, rng, orders)
+            manifest['files'].append(path.name)
+
+        print(f'  生成 {month}: {rows} 行/文件')
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='生成模拟差旅数据（用于性能测试）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例用法:
+  python generate_sample_data.py                                # 1个月，每个文件1000行
+  python generate_sample_data.py --rows 100000 --months 12      # 12个月，每个文件10万行
+  python generate_sample_data.py -o data/synthetic/raw --employees 20000
+        '''
+    )
+
+    parser.add_argument('-o', '--output', default='data/synthetic/raw', help='输出目录 (默认: data/synthetic/raw)')
+    parser.add_argument('--rows', type=int, default=1000, help='每个商旅文件的数据行数 (默认: 1000)')
+    parser.add_argument('--employees', type=int, default=500, help='员工数 (默认: 500)')
+    parser.add_argument('--months', type=int, default=1, help='月份数 (默认: 1)')
+    parser.add_argument('--start-month', default='2025-01', help='起始月份 (默认: 2025-01)')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子 (默认: 42)')
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output)
+    print(f'生成模拟数据到: {output_dir}')
+    manifest = generate_dataset(output_dir, args.rows, args.employees, args.months, args.start_month, args.seed)
+    print(f'共生成 {len(manifest["files"])} 个文件')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,60 @@
 数据合并脚本
 
 合并所有按月分片的差旅数据，生成完整的数据集和索引。
+
+分片逐条读取，每条记录累计到摘要和索引后直接写入 travel-data.json，
+内存中只保留摘要和索引（记录下标），不保留全部记录。
+
+--format columnar 输出列式格式（按类型分列、重复文本字典编码，见 utils/columnar.py），
+文件更小、浏览器解析更快；这种格式需要在内存中按列汇总全部记录。
+
+--parquet 同时把记录导出为按月份、数据源分区的 Parquet 数据集（见 utils/parquet_export.py），
+供数据分析使用；需要安装 pyarrow。
+
+--sqlite 先把分片同步到 SQLite 记录库（见 utils/record_store.py，只写入变化的分片），
+再从库中读取记录，摘要统计用 SQL 聚合计算。
+
+供应商导出按日期区间命名，前后两次导出常有重叠，重叠的记录会出现在两个月份的分片中。
+合并时按 (数据源, 类型, 订单号, 出行人, 日期) 跨分片去重（见 DuplicateFilter），
+保留分片名最大（同一数据源即月份最晚的导出）的分片中的一条，并按数据源统计去掉的条数；
+记录库使用相同的键和规则。
 """
 
 import sys
-import json
+import time
+import itertools
+import contextlib
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import IO, Dict, Iterable, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict
 
 # 添加父目录到路径以导入utils
 sys.path.insert(0, str(Path(__file__).parent))
+from utils import (
+    RunReport,
+    RosterStore,
+    profile_run,
+    atomic_write,
+    list_shards,
+    read_shard_meta,
+    iter_shard_records,
+    json_dumps,
+    write_json,
+    is_json_pretty,
+    set_json_pretty,
+    json_io_stats,
+    JSON_WRITE,
+    ColumnarEncoder,
+    ParquetExporter,
+    open_parquet_exporter,
+    PARQUET_AVAILABLE,
+    RecordStore,
+    StoreRow,
+    SyncResult,
+    RECORDS_FORMAT,
+    COLUMNAR_FORMAT,
+    OUTPUT_FORMATS
+)
 
 
 def parse_amount(record: Dict) -> float:
@@ -40,28 +83,41 @@ def parse_amount(record: Dict) -> float:
     return 0
 
 
-def parse_date_from_record(record: Dict) -> str:
+def get_trip_time(record: Dict) -> str:
     """
-    从记录中提取日期
+    从记录中提取出行时间（机票/火车出发时间、酒店入住时间、用车上车时间）
 
     Args:
         record: 差旅记录
 
     Returns:
-        日期字符串 (YYYY-MM-DD)
+        时间字符串（原文），未知类型返回空字符串
     """
     record_type = record.get('type', '')
 
     if record_type == 'flight':
-        time_str = record.get('departTime', '')
+        return record.get('departTime', '')
     elif record_type == 'hotel':
-        time_str = record.get('checkInTime', '')
+        return record.get('checkInTime', '')
     elif record_type == 'train':
-        time_str = record.get('departTime', '')
+        return record.get('departTime', '')
     elif record_type == 'car':
-        time_str = record.get('pickupTime', '')
-    else:
-        return ''
+        return record.get('pickupTime', '')
+
+    return ''
+
+
+def parse_date_from_record(record: Dict) -> str:
+    """
+    从记录中提取日期
+
+    Args:
+        record: 差旅记录
+
+    Returns:
+        日期字符串 (YYYY-MM-DD)
+    """
+    time_str = get_trip_time(record)
 
     # 提取日期部分 (假设格式为 YYYY-MM-DD HH:MM:SS 或类似)
     if ' ' in time_str:
@@ -90,157 +146,527 @@ def get_employee_name(record: Dict) -> str:
         return record.get('employee', '')
 
 
-def merge_monthly_data(by_month_dir: Path) -> Dict[str, Any]:
+def dedup_key(record: Dict) -> Optional[tuple]:
+    """
+    跨分片去重的键
+
+    Args:
+        record: 差旅记录
+
+    Returns:
+        (数据源, 类型, 订单号, 出行人, 日期)；没有订单号的记录（如导出文件中的小计行）
+        无法跨文件识别，返回None
+    """
+    order_no = record.get('orderNo')
+    if not order_no:
+        return None
+    return (
+        record.get('source', '未知来源'),
+        record.get('type', 'unknown'),
+        str(order_no),
+        get_employee_name(record) or '',
+        parse_date_from_record(record)
+    )
+
+
+class DuplicateFilter:
+    """
+    跨分片去重
+
+    同一键在一个分片中出现多次时都保留（按出现的序号区分）；同一键、同一序号出现在多个分片中时，
+    只保留分片名最大的分片中的那条。先遍历一遍分片找出重复的键，合并时再逐条判断，两遍都是 O(记录数)。
+    扫描时保存每个有键记录的完整 (键, 序号)，内存占用与记录数成正比；合并时只保留重复的键。
+
+    用法:
+        dedup = DuplicateFilter.scan(shards)
+        for index, filepath in enumerate(shards):
+            for record, keep in dedup.check(index, iter_shard_records(filepath)):
+                ...
+        dedup.dropped  # {数据源: 去掉的条数}
+    """
+
+    def __init__(self):
+        # (键, 分片内序号) -> 保留的分片序号（只包含出现在多个分片中的键）
+        self.winners: Dict[tuple, int] = {}
+        self.dropped: Dict[str, int] = {}
+
+    @staticmethod
+    def _keys(records: Iterable[Dict]) -> Iterator[Tuple[Dict, Optional[tuple]]]:
+        """逐条返回 (记录, (键, 分片内序号))，没有键时为None"""
+        seen: Dict[tuple, int] = {}
+        for record in records:
+            key = dedup_key(record)
+            if key is None:
+                yield record, None
+                continue
+            seq = seen.get(key, 0)
+            seen[key] = seq + 1
+            yield record, (key, seq)
+
+    @classmethod
+    def scan(cls, shards: List[Path]) -> 'DuplicateFilter':
+        """
+        遍历所有分片，找出出现在多个分片中的键
+
+        分片完整读取后才登记它的键，读取中途出错的分片不影响去重结果。
+
+        Args:
+            shards: 分片文件列表（按分片名排序）
+
+        Returns:
+            去重器
+        """
+        dedup = cls()
+        last_shard: Dict[tuple, int] = {}
+        for index, filepath in enumerate(shards):
+            try:
+                shard_keys = [
+                    seq_key for _, seq_key in cls._keys(iter_shard_records(filepath))
+                    if seq_key is not None
+                ]
+            except Exception:
+                # 无法读取的分片在合并时给出警告并跳过
+                continue
+            for seq_key in shard_keys:
+                if seq_key in last_shard:
+                    dedup.winners[seq_key] = index
+                last_shard[seq_key] = index
+        return dedup
+
+    def check(self, index: int, records: Iterable[Dict]) -> Iterator[Tuple[Dict, bool]]:
+        """
+        逐条判断第 index 个分片的记录是否保留（去掉的记录按数据源计数）
+
+        Args:
+            index: 分片序号
+            records: 分片的记录
+
+        Yields:
+            (记录, 是否保留)
+        """
+        for record, seq_key in self._keys(records):
+            if seq_key is not None and self.winners.get(seq_key, index) != index:
+                source = record.get('source', '未知来源')
+                self.dropped[source] = self.dropped.get(source, 0) + 1
+                yield record, False
+            else:
+                yield record, True
+
+
+def scan_shards(by_month_dir: Path) -> Tuple[List[Path], List[str], List[str]]:
     """
-    合并所有按月分片的数据
+    列出所有按月分片，并从分片信息中收集月份和数据源（不读取记录）
 
     Args:
         by_month_dir: 按月分片数据目录
 
     Returns:
-        合并后的数据字典
+        (分片文件列表, 月份列表, 数据源列表)
     """
-    all_records = []
+    shards = []
     months = set()
     sources = set()
 
-    # 扫描所有JSON文件
-    for filepath in by_month_dir.glob('*.json'):
-        if filepath.name.startswith('roster_'):
-            continue  # 跳过花名册文件
-
+    for filepath in list_shards(by_month_dir):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            meta = read_shard_meta(filepath)
+        except Exception as e:
+            print(f'  警告: 无法读取 {filepath.name}: {e}')
+            continue
+
+        shards.append(filepath)
+        if 'month' in meta:
+            months.add(meta['month'])
+        if 'source' in meta:
+            sources.add(meta['source'])
 
-            # 提取记录
-            records = data.get('records', [])
-            all_records.extend(records)
+    return shards, sorted(months), sorted(sources)
 
-            # 收集元数据
-            if 'month' in data:
-                months.add(data['month'])
-            if 'source' in data:
-                sources.add(data['source'])
 
-            print(f'  读取 {filepath.name}: {len(records)} 条记录')
+def iter_merged_records(shards: List[Path], dedup: Optional[DuplicateFilter] = None) -> Iterator[Dict]:
+    """
+    依次逐条读取各分片的记录
 
+    Args:
+        shards: 分片文件列表
+        dedup: 跨分片去重器，为None时不去重
+
+    Yields:
+        记录
+    """
+    for index, filepath in enumerate(shards):
+        count = 0
+        dropped = 0
+        try:
+            records = iter_shard_records(filepath)
+            if dedup is None:
+                checked = ((record, True) for record in records)
+            else:
+                checked = dedup.check(index, records)
+            for record, keep in checked:
+                if not keep:
+                    dropped += 1
+                    continue
+                count += 1
+                yield record
         except Exception as e:
             print(f'  警告: 无法读取 {filepath.name}: {e}')
+        if dropped:
+            print(f'  读取 {filepath.name}: {count} 条记录（去掉 {dropped} 条重复）')
+        else:
+            print(f'  读取 {filepath.name}: {count} 条记录')
 
-    print(f'\n总共合并 {len(all_records)} 条记录')
 
-    return {
-        'records': all_records,
-        'months': sorted(months),
-        'sources': sorted(sources)
-    }
+# 摘要和索引的统计维度（与 record_keys 返回值的顺序一致）
+DIMENSIONS = ['byDept', 'byType', 'byMonth', 'byEmployee', 'bySource']
+
+# 摘要中 byEmployee 只保留金额最高的员工数
+TOP_EMPLOYEES = 100
 
 
-def build_summary(records: List[Dict]) -> Dict[str, Any]:
+def record_keys(record: Dict) -> tuple:
     """
-    构建数据摘要统计
+    记录在各统计维度上的取值（与 DIMENSIONS 的顺序一致）
 
     Args:
-        records: 所有记录
+        record: 差旅记录
 
     Returns:
-        摘要统计字典
+        (部门, 类型, 月份, 员工, 数据源)
     """
-    total_amount = 0
-    total_records = len(records)
+    date_str = parse_date_from_record(record)
+    return (
+        record.get('deptLevel1', '未知部门'),
+        record.get('type', 'unknown'),
+        date_str[:7] if len(date_str) >= 7 else '未知月份',
+        get_employee_name(record) or '未知员工',
+        record.get('source', '未知来源')
+    )
+
+
+def _summary_items(groups: Dict[str, list], dimension: str) -> Dict[str, Dict]:
+    """把分组结果 {键: (金额, 记录数)} 整理成摘要项 {键: {amount, count}}（按月份排序，其余按金额降序）"""
+    if dimension == 'byMonth':
+        items = sorted(groups.items())
+    else:
+        items = sorted(groups.items(), key=lambda x: x[1][0], reverse=True)
+        if dimension == 'byEmployee':
+            items = items[:TOP_EMPLOYEES]
+    return {k: {'amount': round(v[0], 2), 'count': v[1]} for k, v in items}
 
-    by_dept = defaultdict(lambda: {'amount': 0, 'count': 0})
-    by_type = defaultdict(lambda: {'amount': 0, 'count': 0})
-    by_month = defaultdict(lambda: {'amount': 0, 'count': 0})
-    by_employee = defaultdict(lambda: {'amount': 0, 'count': 0})
-    by_source = defaultdict(lambda: {'amount': 0, 'count': 0})
 
-    for record in records:
-        amount = parse_amount(record)
-        total_amount += amount
+class SummaryBuilder:
+    """
+    逐条累计数据摘要统计和数据索引
+
+    每条记录的日期、员工姓名等只计算一次，各维度的分组同时累计金额和记录下标。
+
+    用法:
+        builder = SummaryBuilder()
+        for record in records:
+            builder.add(record)
+        summary, indexes = builder.build()
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_amount = 0
+        # 各维度：键 -> [金额, 记录下标列表]
+        self.groups = [{} for _ in DIMENSIONS]
 
-        dept = record.get('deptLevel1', '未知部门')
-        record_type = record.get('type', 'unknown')
-        date_str = parse_date_from_record(record)
-        month = date_str[:7] if len(date_str) >= 7 else '未知月份'
-        employee = get_employee_name(record) or '未知员工'
-        source = record.get('source', '未知来源')
+    def add(self, record: Dict):
+        """累计一条记录（记录下标按添加顺序）"""
+        amount = parse_amount(record)
+        self.total_amount += amount
+
+        for dimension_groups, key in zip(self.groups, record_keys(record)):
+            group = dimension_groups.get(key)
+            if group is None:
+                group = dimension_groups[key] = [0, []]
+            group[0] += amount
+            group[1].append(self.count)
+
+        self.count += 1
+
+    def build(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Returns:
+            (摘要统计字典, 索引字典)
+        """
+        summary = {
+            'totalAmount': round(self.total_amount, 2),
+            'totalRecords': self.count
+        }
+        indexes = {}
+        for dimension, dimension_groups in zip(DIMENSIONS, self.groups):
+            summary[dimension] = _summary_items(
+                {k: (v[0], len(v[1])) for k, v in dimension_groups.items()}, dimension
+            )
+            indexes[dimension] = {k: v[1] for k, v in sorted(dimension_groups.items())}
+
+        return summary, indexes
+
+
+def _json_text(value: Any, level: int, pretty: bool) -> str:
+    """成员的JSON文本（缩进格式时嵌套在第 level 层）"""
+    text = json_dumps(value, pretty)
+    return text.replace('\n', '\n' + '  ' * level) if pretty else text
+
+
+def _write_members(f: IO, members: Dict[str, Any], last: bool, pretty: bool):
+    """写入顶层对象的若干键值"""
+    items = list(members.items())
+    for index, (key, value) in enumerate(items):
+        separator = '' if last and index == len(items) - 1 else ','
+        if pretty:
+            f.write(f'  {json_dumps(key)}: {_json_text(value, 1, True)}{separator}\n')
+        else:
+            f.write(f'{json_dumps(key)}:{_json_text(value, 1, False)}{separator}')
+
+
+def write_travel_data(
+    output_path: Path,
+    head: Dict[str, Any],
+    records: Iterable[Dict],
+    tail: Dict[str, Any],
+    pretty: Optional[bool] = None,
+    summary: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    流式写入 travel-data.json（原子写入）
 
-        by_dept[dept]['amount'] += amount
-        by_dept[dept]['count'] += 1
+    字段顺序为 head 的各字段、records、summary、indexes、tail 的各字段；
+    记录逐条写出的同时累计摘要和索引。默认为紧凑格式，
+    缩进格式与 json.dump(indent=2) 相同。
 
-        by_type[record_type]['amount'] += amount
-        by_type[record_type]['count'] += 1
+    Args:
+        output_path: 输出文件路径
+        head: 写在 records 之前的字段
+        records: 记录（可以是生成器，只遍历一次）
+        tail: 写在 indexes 之后的字段
+        pretty: 是否缩进，为None时使用默认设置（--pretty）
+        summary: 已计算的摘要统计（--sqlite），为None时由记录累计
 
-        by_month[month]['amount'] += amount
-        by_month[month]['count'] += 1
+    Returns:
+        (摘要统计字典, 索引字典)
+    """
+    if pretty is None:
+        pretty = is_json_pretty()
+    builder = SummaryBuilder()
+    seconds = 0.0
+
+    with atomic_write(output_path) as f:
+        start = time.perf_counter()
+        f.write('{\n' if pretty else '{')
+        _write_members(f, head, last=False, pretty=pretty)
+        f.write('  "records": [' if pretty else '"records":[')
+        seconds += time.perf_counter() - start
+
+        for record in records:
+            start = time.perf_counter()
+            if builder.count:
+                f.write(',\n    ' if pretty else ',')
+            elif pretty:
+                f.write('\n    ')
+            f.write(_json_text(record, 2, pretty))
+            seconds += time.perf_counter() - start
+            builder.add(record)
+
+        built_summary, indexes = builder.build()
+        if summary is None:
+            summary = built_summary
+        start = time.perf_counter()
+        if pretty:
+            f.write('\n  ],\n' if builder.count else '],\n')
+        else:
+            f.write('],')
+        _write_members(f, dict({'summary': summary, 'indexes': indexes}, **tail), last=True, pretty=pretty)
+        f.write('}')
+        seconds += time.perf_counter() - start
+
+    json_io_stats().record(JSON_WRITE, output_path, output_path.stat().st_size, seconds)
+    return summary, indexes
+
+
+def write_columnar_travel_data(
+    output_path: Path,
+    head: Dict[str, Any],
+    records: Iterable[Dict],
+    tail: Dict[str, Any],
+    pretty: Optional[bool] = None,
+    summary: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    写入列式格式的 travel-data.json（原子写入）
 
-        by_employee[employee]['amount'] += amount
-        by_employee[employee]['count'] += 1
+    字段顺序为 format、formatVersion、head 的各字段、tables、order、summary、tail 的各字段；
+    索引只返回，不写入文件。
 
-        by_source[source]['amount'] += amount
-        by_source[source]['count'] += 1
+    Args:
+        output_path: 输出文件路径
+        head: 写在列数据之前的字段
+        records: 记录（可以是生成器，只遍历一次）
+        tail: 写在 summary 之后的字段
+        pretty: 是否缩进，为None时使用默认设置（--pretty）
+        summary: 已计算的摘要统计（--sqlite），为None时由记录累计
 
-    return {
-        'totalAmount': round(total_amount, 2),
-        'totalRecords': total_records,
-        'byDept': {k: {'amount': round(v['amount'], 2), 'count': v['count']}
-                   for k, v in sorted(by_dept.items(), key=lambda x: x[1]['amount'], reverse=True)},
-        'byType': {k: {'amount': round(v['amount'], 2), 'count': v['count']}
-                   for k, v in sorted(by_type.items(), key=lambda x: x[1]['amount'], reverse=True)},
-        'byMonth': {k: {'amount': round(v['amount'], 2), 'count': v['count']}
-                    for k, v in sorted(by_month.items())},
-        'byEmployee': {k: {'amount': round(v['amount'], 2), 'count': v['count']}
-                       for k, v in sorted(by_employee.items(), key=lambda x: x[1]['amount'], reverse=True)[:100]},
-        'bySource': {k: {'amount': round(v['amount'], 2), 'count': v['count']}
-                     for k, v in sorted(by_source.items(), key=lambda x: x[1]['amount'], reverse=True)}
+    Returns:
+        (摘要统计字典, 索引字典)
+    """
+    builder = SummaryBuilder()
+    encoder = ColumnarEncoder()
+    for record in records:
+        encoder.add(record)
+        builder.add(record)
+
+    built_summary, indexes = builder.build()
+    if summary is None:
+        summary = built_summary
+    columns = encoder.build()
+    data = {
+        'format': columns.pop('format'),
+        'formatVersion': columns.pop('formatVersion')
     }
+    data.update(head)
+    data.update(columns)
+    data['summary'] = summary
+    data.update(tail)
+
+    write_json(output_path, data, pretty)
+    return summary, indexes
+
+
+# 库中摘要维度对应的分组列（与 DIMENSIONS 的顺序一致）
+STORE_COLUMNS = ['dept_level1', 'type', 'month', 'employee', 'source']
+
+
+def store_row(record: Dict) -> StoreRow:
+    """
+    记录写入 SQLite 记录库的一行（键与 dedup_key 相同，统计维度与 record_keys 相同）
+
+    Args:
+        record: 差旅记录
+
+    Returns:
+        记录库的一行
+    """
+    dept, record_type, month, employee, source = record_keys(record)
+    return StoreRow(
+        source=source,
+        type=record_type,
+        order_no=str(record.get('orderNo') or ''),
+        traveller=get_employee_name(record) or '',
+        trip_date=parse_date_from_record(record),
+        dept_level1=dept,
+        month=month,
+        employee=employee,
+        amount=parse_amount(record),
+        data=json_dumps(record, pretty=False)
+    )
+
+
+def _shard_fingerprint(filepath: Path) -> str:
+    stat = filepath.stat()
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def _upsert_shard(store: RecordStore, filepath: Path) -> Optional[int]:
+    """把一个分片写入记录库，返回写入的行数（无法读取时返回None）"""
+    try:
+        return store.upsert_shard(
+            filepath.name, _shard_fingerprint(filepath),
+            (store_row(record) for record in iter_shard_records(filepath))
+        )
+    except Exception as e:
+        print(f'  警告: 无法同步 {filepath.name}: {e}')
+        return None
+
+
+def sync_record_store(store: RecordStore, shards: List[Path]) -> SyncResult:
+    """
+    把按月分片同步到记录库：移除已删除的分片，只写入新增或变化（文件大小、修改时间不同）的分片，
+    重新写入内容需要更新的分片（重复记录原来所在的分片已移除或不再包含它），
+    最后删除不属于任何分片的记录
 
+    Args:
+        store: 记录库
+        shards: 分片文件列表
 
-def build_indexes(records: List[Dict]) -> Dict[str, Any]:
+    Returns:
+        同步结果
     """
-    构建数据索引
+    removed = store.remove_shards_except(filepath.name for filepath in shards)
+    for name in removed:
+        print(f'  移除 {name}')
+
+    upserted = []
+    rows = 0
+    for filepath in shards:
+        if store.shard_fingerprint(filepath.name) == _shard_fingerprint(filepath):
+            continue
+        count = _upsert_shard(store, filepath)
+        if count is None:
+            continue
+        print(f'  同步 {filepath.name}: {count} 条记录')
+        upserted.append(filepath.name)
+        rows += count
+
+    by_name = {filepath.name: filepath for filepath in shards}
+    for name in store.stale_shards():
+        count = _upsert_shard(store, by_name[name])
+        if count is not None:
+            print(f'  重新同步 {name}: {count} 条记录')
+            upserted.append(name)
+            rows += count
+
+    pruned = store.prune()
+    return SyncResult(upserted, removed, rows, pruned, store.duplicate_counts())
+
+
+def build_store_summary(store: RecordStore) -> Dict[str, Any]:
+    """
+    用 SQL 聚合计算摘要统计（与 SummaryBuilder 的摘要格式相同）
 
     Args:
-        records: 所有记录
+        store: 记录库
 
     Returns:
-        索引字典
-    """
-    dept_index = defaultdict(list)
-    type_index = defaultdict(list)
-    month_index = defaultdict(list)
-    employee_index = defaultdict(list)
-    source_index = defaultdict(list)
-
-    for i, record in enumerate(records):
-        dept = record.get('deptLevel1', '未知部门')
-        record_type = record.get('type', 'unknown')
-        date_str = parse_date_from_record(record)
-        month = date_str[:7] if len(date_str) >= 7 else '未知月份'
-        employee = get_employee_name(record) or '未知员工'
-        source = record.get('source', '未知来源')
-
-        dept_index[dept].append(i)
-        type_index[record_type].append(i)
-        month_index[month].append(i)
-        employee_index[employee].append(i)
-        source_index[source].append(i)
-
-    return {
-        'byDept': {k: v for k, v in sorted(dept_index.items())},
-        'byType': {k: v for k, v in sorted(type_index.items())},
-        'byMonth': {k: v for k, v in sorted(month_index.items())},
-        'byEmployee': {k: v for k, v in sorted(employee_index.items())},
-        'bySource': {k: v for k, v in sorted(source_index.items())}
+        摘要统计字典
+    """
+    count, total_amount = store.totals()
+    summary = {
+        'totalAmount': round(total_amount, 2),
+        'totalRecords': count
     }
+    for dimension, column in zip(DIMENSIONS, STORE_COLUMNS):
+        summary[dimension] = _summary_items(store.group_totals(column), dimension)
+    return summary
+
+
+def iter_exported_records(records: Iterable[Dict], exporter: ParquetExporter) -> Iterator[Dict]:
+    """
+    记录逐条交给 Parquet 导出器（按记录日期所在月份分区）后原样返回
+
+    Args:
+        records: 记录
+        exporter: Parquet 导出器
+
+    Yields:
+        记录
+    """
+    for record in records:
+        exporter.add(record, record_keys(record)[2])
+        yield record
 
 
 def merge_data(
     by_month_dir: Path,
     output_path: Path,
-    roster_index_path: Path
+    roster_index_path: Path,
+    report: Optional[RunReport] = None,
+    output_format: str = RECORDS_FORMAT,
+    parquet_dir: Optional[Path] = None,
+    store_path: Optional[Path] = None
 ) -> bool:
     """
     合并数据并生成完整的数据文件
@@ -249,6 +675,10 @@ def merge_data(
         by_month_dir: 按月分片数据目录
         output_path: 输出文件路径
         roster_index_path: 花名册索引文件路径
+        report: 运行报告，记录扫描分片、读取并写入记录等步骤的耗时
+        output_format: 输出格式，records（记录列表）或 columnar（列式）
+        parquet_dir: Parquet 数据集目录，为None时不导出
+        store_path: SQLite 记录库路径，为None时直接读取分片
 
     Returns:
         是否成功
@@ -261,11 +691,62 @@ def merge_data(
         print(f'错误: 数据目录不存在: {by_month_dir}')
         return False
 
-    # 合并按月数据
-    print('\n扫描按月分片数据...')
-    merged_data = merge_monthly_data(by_month_dir)
+    if parquet_dir is not None and not PARQUET_AVAILABLE:
+        print('错误: 导出 Parquet 需要安装 pyarrow: pip install pyarrow')
+        return False
 
-    if not merged_data['records']:
+    if report is None:
+        report = RunReport()
+
+    # 扫描按月分片（只读取分片信息）
+    print('\n扫描按月分片数据...')
+    with report.phase('合并: 扫描分片'):
+        shards, months, sources = scan_shards(by_month_dir)
+
+    with contextlib.ExitStack() as stack:
+        store = None
+        if store_path is not None:
+            print(f'\n同步分片到记录库: {store_path}')
+            with report.phase('合并: 同步SQLite') as phase:
+                store = stack.enter_context(RecordStore(store_path))
+                result = sync_record_store(store, shards)
+                phase.rows_out = result.rows
+            print(f'  更新 {len(result.upserted)} 个分片（{result.rows} 条记录），'
+                  f'移除 {len(result.removed)} 个分片，删除 {result.pruned} 条记录，库中共 {store.count()} 条记录')
+            records = store.iter_records()
+            duplicates = result.duplicates
+        else:
+            with report.phase('合并: 查找重复') as phase:
+                dedup = DuplicateFilter.scan(shards)
+                phase.rows_out = len(dedup.winners)
+            records = iter_merged_records(shards, dedup)
+            # 合并时逐条计数
+            duplicates = dedup.dropped
+
+        return _merge_records(
+            records, months, sources, output_path, roster_index_path, report,
+            output_format, parquet_dir, store, duplicates
+        )
+
+
+def _merge_records(
+    records: Iterator[Dict],
+    months: List[str],
+    sources: List[str],
+    output_path: Path,
+    roster_index_path: Path,
+    report: RunReport,
+    output_format: str,
+    parquet_dir: Optional[Path],
+    store: Optional[RecordStore],
+    duplicates: Dict[str, int]
+) -> bool:
+    """
+    merge_data 的写入部分（参数同 merge_data；store 不为None时摘要由 SQL 计算，
+    duplicates 为各数据源去掉的重复条数，records 遍历完后完整）
+    """
+    first = next(records, None)
+    if first is None:
         print('警告: 没有找到任何记录')
         return False
 
@@ -273,42 +754,54 @@ def merge_data(
     roster_data = {}
     if roster_index_path.exists():
         try:
-            with open(roster_index_path, 'r', encoding='utf-8') as f:
-                roster_data = json.load(f)
+            roster_data = RosterStore(roster_index_path).to_index()
             print(f'\n读取花名册索引: {len(roster_data.get("allEmployees", {}))} 名员工')
         except Exception as e:
             print(f'警告: 无法读取花名册索引: {e}')
 
-    # 构建摘要
-    print('\n构建统计摘要...')
-    summary = build_summary(merged_data['records'])
-
-    # 构建索引
-    print('\n构建数据索引...')
-    indexes = build_indexes(merged_data['records'])
-
-    # 组装最终数据
-    output_data = {
+    # 逐条读取分片记录，累计摘要和索引，同时写入输出文件
+    print('\n合并记录并构建统计摘要和数据索引...')
+    head = {
         'lastUpdate': datetime.now().isoformat(),
-        'months': merged_data['months'],
-        'sources': merged_data['sources'],
-        'records': merged_data['records'],
-        'summary': summary,
-        'indexes': indexes,
-        'roster': roster_data
+        'months': months,
+        'sources': sources
     }
-
-    # 保存
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-
+    write = write_columnar_travel_data if output_format == COLUMNAR_FORMAT else write_travel_data
+    records = itertools.chain([first], records)
+    summary = None
+    if store is not None:
+        with report.phase('合并: SQL统计'):
+            summary = build_store_summary(store)
+
+    with report.phase('合并: 读取并写入') as phase, contextlib.ExitStack() as stack:
+        exporter = None
+        if parquet_dir is not None:
+            exporter = stack.enter_context(open_parquet_exporter(parquet_dir))
+            records = iter_exported_records(records, exporter)
+        summary, indexes = write(output_path, head, records, {'roster': roster_data}, summary=summary)
+        phase.rows_out = summary['totalRecords']
+
+    print(f'\n总共合并 {summary["totalRecords"]} 条记录')
     print(f'\n保存合并数据到: {output_path}')
+    print(f'  格式: {output_format}')
+    if store is not None:
+        print(f'  摘要统计: SQLite ({store.path})')
     print(f'  总记录数: {summary["totalRecords"]}')
     print(f'  总金额: ¥{summary["totalAmount"]:,.2f}')
-    print(f'  月份数: {len(merged_data["months"])}')
+    print(f'  月份数: {len(months)}')
     print(f'  部门数: {len(summary["byDept"])}')
-    print(f'  数据源: {", ".join(merged_data["sources"])}')
+    print(f'  数据源: {", ".join(sources)}')
+    report.duplicates = dict(sorted(duplicates.items()))
+    if duplicates:
+        print(f'  跨分片重复（已去掉）: {sum(duplicates.values())} 条')
+        for source, count in sorted(duplicates.items()):
+            print(f'    {source}: {count} 条')
+    else:
+        print('  跨分片重复: 无')
+    if exporter is not None:
+        print(f'\n导出 Parquet 数据集到: {parquet_dir}')
+        print(f'  {exporter.rows} 条记录，{exporter.partitions} 个分区，{len(exporter.files)} 个文件，'
+              f'{exporter.total_bytes / 1024 / 1024:.2f} MB')
 
     return True
 
@@ -320,14 +813,31 @@ if __name__ == '__main__':
     parser.add_argument('-i', '--input', default='data/processed/by-month', help='按月分片数据目录')
     parser.add_argument('-o', '--output', default='data/processed/travel-data.json', help='输出文件路径')
     parser.add_argument('-r', '--roster', default='data/processed/roster_index.json', help='花名册索引文件')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=RECORDS_FORMAT,
+                        help='输出格式: records（记录列表，默认）或 columnar（列式，文件更小）')
+    parser.add_argument('--parquet', metavar='DIR',
+                        help='同时导出按月份、数据源分区的 Parquet 数据集到 DIR（需要 pyarrow）')
+    parser.add_argument('--sqlite', metavar='DB', nargs='?', const='data/processed/travel.db',
+                        help='先把分片同步到 SQLite 记录库（默认 data/processed/travel.db），'
+                             '从库中读取记录并用 SQL 计算摘要')
+    parser.add_argument('--pretty', action='store_true', help='输出缩进格式的JSON（便于调试，文件更大）')
+    parser.add_argument('--profile', action='store_true', help='性能剖析，结果保存到输出文件所在目录的 profile/')
 
     args = parser.parse_args()
+    set_json_pretty(args.pretty)
 
     by_month_dir = Path(args.input)
     output_path = Path(args.output)
     roster_index_path = Path(args.roster)
 
-    success = merge_data(by_month_dir, output_path, roster_index_path)
+    with profile_run(output_path.parent, 'merge_data', enabled=args.profile):
+        success = merge_data(
+            by_month_dir, output_path, roster_index_path,
+            output_format=args.format,
+            parquet_dir=Path(args.parquet) if args.parquet else None,
+            store_path=Path(args.sqlite) if args.sqlite else None
+        )
+    json_io_stats().print_summary()
 
     if not success:
         sys.exit(1)
@@ -3,6 +3,7 @@
 阿里商旅数据处理脚本
 
 读取阿里商旅Excel文件，提取机票、酒店、火车、用车等数据。
+部门字段（deptLevel1/deptLevel2）提取时留空占位，保存分片时按花名册统一关联（见 enrich_data）。
 
 阿里商旅Excel格式特点：
 - 第1-2行：标题行
@@ -12,15 +13,30 @@
 """
 
 import sys
-import json
+import time
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Union
 
 # 添加父目录到路径以导入utils
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import TravelFileInfo, load_employee_index
+from enrich_data import save_travel_shard
+from utils import (
+    TravelFileInfo,
+    CachedWorkbook,
+    FileReport,
+    SheetCache,
+    sheet_cache_dir,
+    read_sheet,
+    open_streaming_workbook,
+    iter_sheet_batches,
+    STREAM_BATCH_SIZE,
+    text_column,
+    float_column,
+    person_column,
+    invalid_name_mask,
+    order_no_column
+)
 
 
 # 工作表名称映射
@@ -32,13 +48,18 @@ SHEET_MAPPING = {
 }
 
 
-def read_alibaba_sheet(filepath: Path, sheet_name: str) -> Optional[pd.DataFrame]:
+def read_alibaba_sheet(
+    excel_file: Union[Path, pd.ExcelFile, CachedWorkbook],
+    sheet_name: str,
+    columns: Optional[List[int]] = None
+) -> Optional[pd.DataFrame]:
     """
     读取阿里商旅工作表，跳过标题行和合计行
 
     Args:
-        filepath: Excel文件路径
+        excel_file: 带缓存的工作簿（CachedWorkbook）、已打开的 pd.ExcelFile，也可以是Excel文件路径
         sheet_name: 工作表名称
+        columns: 只读取这些位置的列（见 SHEET_COLUMNS），为None时读取全部列
 
     Returns:
         处理后的DataFrame
@@ -46,304 +67,346 @@ def read_alibaba_sheet(filepath: Path, sheet_name: str) -> Optional[pd.DataFrame
     try:
         # 读取原始数据，header=0表示第3行（索引2）作为列名
         # skiprows=[3]表示跳过第4行（索引3，即"合计"行）
-        df = pd.read_excel(filepath, sheet_name=sheet_name, header=2, skiprows=[3])
+        df = read_sheet(excel_file, sheet_name, columns, header=2, skiprows=[3])
         return df
     except Exception as e:
         print(f'    警告: 无法读取工作表 {sheet_name}: {e}')
         return None
 
 
-def extract_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_hotel_record(row: pd.Series) -> Optional[Dict]:
     """
-    提取机票记录
-
-    阿里商旅机票列索引（基于header=2的索引）:
-    3: 预订人, 5: 出行人, 14: 起飞日期, 15: 起飞时间, 18: 出发城市, 19: 到达城市,
-    23: 航空公司, 24: 航班号, 25: 舱位, 26: 舱等, 35: 订单金额
+    提取酒店记录
+    注意：阿里商旅的酒店数据格式可能不同，需要根据实际文件调整
     """
-    # 使用索引获取数据
-    if len(row) <= 35:
-        return None
+    # 酒店数据暂时跳过，因为需要查看实际数据结构
+    return None
 
-    # 出行人（索引5）或预订人（索引3）
-    passenger = row.iloc[5] if len(row) > 5 else None
-    if pd.isna(passenger) or str(passenger).strip() == '':
-        passenger = row.iloc[3] if len(row) > 3 else None
-    if pd.isna(passenger) or str(passenger).strip() == '':
-        return None
 
-    passenger = str(passenger).strip()
+def _attach_order_no(records: List[Dict], order_nos: List[Optional[str]]) -> List[Dict]:
+    """为记录追加订单号（无订单号时不写入该字段）"""
+    for record, order_no in zip(records, order_nos):
+        if order_no is not None:
+            record['orderNo'] = order_no
+    return records
 
-    # 数据验证：跳过无效记录
-    # 1. 乘机人不能是日期格式
-    if passenger.startswith('202') or passenger.startswith('20') or passenger.count('-') >= 2:
-        return None
-    # 2. 乘机人不能是"小计"、"合计"等关键词
-    if passenger in ['小计', '合计', '总计', '汇总', '平均值']:
-        return None
-    # 3. 乘机人不能是纯数字
-    if passenger.isdigit():
-        return None
 
-    dept_info = roster_index.get(passenger, {})
+def extract_flight_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    按列批量提取机票记录
 
-    # 起飞日期和 时间
-    depart_date = str(row.iloc[14]) if len(row) > 14 and pd.notna(row.iloc[14]) else ''
-    depart_time = str(row.iloc[15]) if len(row) > 15 and pd.notna(row.iloc[15]) else ''
+    阿里商旅机票列索引（基于header=2的索引）:
+    3: 预订人, 5: 出行人, 14: 起飞日期, 15: 起飞时间, 18: 出发城市, 19: 到达城市,
+    23: 航空公司, 24: 航班号, 26: 舱等, 35: 订单金额
 
-    # 航班号
-    flight_no = str(row.iloc[24]) if len(row) > 24 and pd.notna(row.iloc[24]) else ''
+    Args:
+        df: 机票工作表
 
-    # 出发地和目的地
-    from_city = str(row.iloc[18]) if len(row) > 18 and pd.notna(row.iloc[18]) else ''
-    to_city = str(row.iloc[19]) if len(row) > 19 and pd.notna(row.iloc[19]) else ''
+    Returns:
+        机票记录列表
+    """
+    if df.shape[1] <= 35 or len(df) == 0:
+        return []
 
-    # 数据验证：必须有航班号、起飞时间、出发地和目的地
-    if not flight_no or flight_no == 'nan' or not depart_date or depart_date == 'nan':
-        return None
-    if not from_city or from_city == 'nan' or not to_city or to_city == 'nan':
-        return None
+    # 出行人（索引5）或预订人（索引3），并过滤日期、小计、纯数字等无效行
+    _, passengers = person_column(df, 5, 3)
+    valid = (passengers != '') & ~invalid_name_mask(passengers)
 
-    # 订单金额（索引35）
-    price = 0
-    if len(row) > 35 and pd.notna(row.iloc[35]):
-        try:
-            price = float(row.iloc[35])
-        except (ValueError, TypeError):
-            pass
-
-    record = {
-        'source': '阿里商旅',
-        'type': 'flight',
-        'passenger': passenger,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
-        'bookTime': str(row.iloc[3]) if len(row) > 3 and pd.notna(row.iloc[3]) else depart_date,
-        'flightNo': flight_no,
-        'departTime': f'{depart_date} {depart_time}'.strip(),
-        'fromCity': from_city,
-        'toCity': to_city,
-        'price': price,
-        'cabinClass': str(row.iloc[26]) if len(row) > 26 and pd.notna(row.iloc[26]) else '',
-        'airline': str(row.iloc[23]) if len(row) > 23 and pd.notna(row.iloc[23]) else ''
-    }
-
-    # 订单号（索引1）
-    if len(row) > 1 and pd.notna(row.iloc[1]):
-        record['orderNo'] = str(int(row.iloc[1])) if isinstance(row.iloc[1], (int, float)) else str(row.iloc[1])
-
-    return record
-
-
-def extract_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
-    """
-    提取酒店记录
-    注意：阿里商旅的酒店数据格式可能不同，需要根据实际文件调整
-    """
-    # 酒店数据暂时跳过，因为需要查看实际数据结构
-    return None
+    depart_date = text_column(df, 14)
+    flight_no = text_column(df, 24)
+    from_city = text_column(df, 18)
+    to_city = text_column(df, 19)
 
+    # 必须有航班号、起飞时间、出发地和目的地
+    for column in (flight_no, depart_date, from_city, to_city):
+        valid &= (column != '') & (column != 'nan')
 
-def extract_train_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+    if not valid.any():
+        return []
+
+    df = df[valid]
+    passengers = passengers[valid]
+    depart_date = depart_date[valid]
+    depart_time = (depart_date + ' ' + text_column(df, 15)).str.strip()
+    book_time = text_column(df, 3)
+    book_time = book_time.where(df.iloc[:, 3].notna(), depart_date)
+
+    records = [
+        {
+            'source': '阿里商旅',
+            'type': 'flight',
+            'passenger': passenger,
+            'deptLevel1': '',
+            'deptLevel2': '',
+            'bookTime': book,
+            'flightNo': flight,
+            'departTime': depart,
+            'fromCity': origin,
+            'toCity': destination,
+            'price': price,
+            'cabinClass': cabin,
+            'airline': airline
+        }
+        for passenger, book, flight, depart, origin, destination, price, cabin, airline in zip(
+            passengers.tolist(),
+            book_time.tolist(),
+            flight_no[valid].tolist(),
+            depart_time.tolist(),
+            from_city[valid].tolist(),
+            to_city[valid].tolist(),
+            float_column(df, 35),
+            text_column(df, 26).tolist(),
+            text_column(df, 23).tolist()
+        )
+    ]
+
+    return _attach_order_no(records, order_no_column(df, 1).tolist())
+
+
+def extract_train_records(df: pd.DataFrame) -> List[Dict]:
     """
-    提取火车记录
+    按列批量提取火车记录
 
     阿里商旅火车列索引（基于header=2的索引）:
-    2: 预订人, 3: 出行人, 10: 发车日期, 11: 发车时间, 12: 到达日期, 13: 到达时间,
-    14: 出发城市, 15: 到达城市, 16: 车次, 18: 座席, 24: 订单金额
-    """
-    if len(row) <= 24:
-        return None
+    2: 预订人, 3: 出行人, 10: 发车日期, 11: 发车时间, 14: 出发城市, 15: 到达城市,
+    16: 车次, 18: 座席, 24: 订单金额
 
-    # 出行人（索引3）或预订人（索引2）
-    passenger = row.iloc[3] if len(row) > 3 else None
-    if pd.isna(passenger) or str(passenger).strip() == '':
-        passenger = row.iloc[2] if len(row) > 2 else None
-    if pd.isna(passenger) or str(passenger).strip() == '':
-        return None
+    Args:
+        df: 火车工作表
 
-    passenger = str(passenger).strip()
-    dept_info = roster_index.get(passenger, {})
+    Returns:
+        火车记录列表
+    """
+    if df.shape[1] <= 24 or len(df) == 0:
+        return []
 
-    # 发车日期和时间
-    depart_date = str(row.iloc[10]) if len(row) > 10 and pd.notna(row.iloc[10]) else ''
-    depart_time = str(row.iloc[11]) if len(row) > 11 and pd.notna(row.iloc[11]) else ''
+    # 出行人（索引3）或预订人（索引2）
+    _, employees = person_column(df, 3, 2)
+    valid = employees != ''
+    if not valid.any():
+        return []
 
-    # 订单金额（索引24）
-    price = 0
-    if len(row) > 24 and pd.notna(row.iloc[24]):
-        try:
-            price = float(row.iloc[24])
-        except (ValueError, TypeError):
-            pass
-
-    record = {
-        'source': '阿里商旅',
-        'type': 'train',
-        'employee': passenger,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
-        'trainNo': str(row.iloc[16]) if len(row) > 16 and pd.notna(row.iloc[16]) else '',
-        'seat': str(row.iloc[18]) if len(row) > 18 and pd.notna(row.iloc[18]) else '',
-        'departTime': f'{depart_date} {depart_time}'.strip(),
-        'fromCity': str(row.iloc[14]) if len(row) > 14 and pd.notna(row.iloc[14]) else '',
-        'toCity': str(row.iloc[15]) if len(row) > 15 and pd.notna(row.iloc[15]) else '',
-        'price': price
-    }
-
-    # 订单号（索引1）
-    if len(row) > 1 and pd.notna(row.iloc[1]):
-        record['orderNo'] = str(int(row.iloc[1])) if isinstance(row.iloc[1], (int, float)) else str(row.iloc[1])
-
-    return record
-
-
-def extract_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+    df = df[valid]
+    employees = employees[valid]
+    depart_time = (text_column(df, 10) + ' ' + text_column(df, 11)).str.strip()
+
+    records = [
+        {
+            'source': '阿里商旅',
+            'type': 'train',
+            'employee': employee,
+            'deptLevel1': '',
+            'deptLevel2': '',
+            'trainNo': train_no,
+            'seat': seat,
+            'departTime': depart,
+            'fromCity': origin,
+            'toCity': destination,
+            'price': price
+        }
+        for employee, train_no, seat, depart, origin, destination, price in zip(
+            employees.tolist(),
+            text_column(df, 16).tolist(),
+            text_column(df, 18).tolist(),
+            depart_time.tolist(),
+            text_column(df, 14).tolist(),
+            text_column(df, 15).tolist(),
+            float_column(df, 24)
+        )
+    ]
+
+    return _attach_order_no(records, order_no_column(df, 1).tolist())
+
+
+def extract_car_records(df: pd.DataFrame) -> List[Dict]:
     """
-    提取用车记录
+    按列批量提取用车记录
 
     阿里商旅用车列索引（header=2后）:
     3: 预订人, 6: 出行人, 14: 出发日期, 15: 出发时间, 16: 到达日期, 17: 到达时间,
     18: 出发城市, 19: 出发地, 21: 到达城市, 22: 到达地, 25: 实际行驶公里数,
     32: 结算金额, 41: 服务方, 42: 供应商车型, 43: 平台车型
+
+    Args:
+        df: 用车工作表
+
+    Returns:
+        用车记录列表
     """
-    if len(row) <= 43:
-        return None
+    if df.shape[1] <= 43 or len(df) == 0:
+        return []
 
-    # 出行人（索引6）或预订人（索引3）
-    passenger = row.iloc[6] if len(row) > 6 else None
-    if pd.isna(passenger) or str(passenger).strip() == '':
-        passenger = row.iloc[3] if len(row) > 3 else None
-    if pd.isna(passenger) or str(passenger).strip() == '':
-        return None
+    # 出行人（索引6）或预订人（索引3），员工ID（EMP开头）改用预订人
+    raw_passengers, passengers = person_column(df, 6, 3)
+    is_employee_id = raw_passengers.str.startswith('EMP')
+    passengers = passengers.where(~is_employee_id, text_column(df, 3).str.strip())
+    valid = passengers != ''
+    if not valid.any():
+        return []
 
-    # 跳过员工ID
-    if str(passenger).startswith('EMP'):
-        passenger = row.iloc[3] if len(row) > 3 else None
-        if pd.isna(passenger) or str(passenger).strip() == '':
-            return None
+    df = df[valid]
+    passengers = passengers[valid]
+    pickup_time = (text_column(df, 14) + ' ' + text_column(df, 15)).str.strip()
+    dropoff_time = (text_column(df, 16) + ' ' + text_column(df, 17)).str.strip()
+
+    # 用车类型（索引43平台车型，为空时用索引42供应商车型）
+    car_type = text_column(df, 43)
+    car_type = car_type.where(car_type != '', text_column(df, 42))
+
+    records = [
+        {
+            'source': '阿里商旅',
+            'type': 'car',
+            'passenger': passenger,
+            'deptLevel1': '',
+            'deptLevel2': '',
+            'pickupTime': pickup,
+            'dropoffTime': dropoff,
+            'carType': kind,
+            'provider': provider,
+            'origin': {
+                'city': origin_city,
+                'address': origin_address
+            },
+            'destination': {
+                'city': destination_city,
+                'address': destination_address
+            },
+            'distance': distance,
+            'totalAmount': amount
+        }
+        for (passenger, pickup, dropoff, kind, provider, origin_city, origin_address,
+             destination_city, destination_address, distance, amount) in zip(
+            passengers.tolist(),
+            pickup_time.tolist(),
+            dropoff_time.tolist(),
+            car_type.tolist(),
+            text_column(df, 41).tolist(),
+            text_column(df, 18).tolist(),
+            text_column(df, 19).tolist(),
+            text_column(df, 21).tolist(),
+            text_column(df, 22).tolist(),
+            float_column(df, 25),
+            float_column(df, 32)
+        )
+    ]
+
+    return _attach_order_no(records, order_no_column(df, 1).tolist())
+
+
+# 各类型工作表对应的批量提取函数（阿里酒店暂不提取）
+SHEET_EXTRACTORS = [
+    ('flight', '机票', extract_flight_records),
+    ('train', '火车', extract_train_records),
+    ('car', '用车', extract_car_records)
+]
+
+# 各类型工作表提取时用到的列位置，读取时只解析这些列
+# 修改提取函数的取值位置时需要同步修改这里
+SHEET_COLUMNS = {
+    'flight': [1, 3, 5, 14, 15, 18, 19, 23, 24, 26, 35],
+    'train': [1, 2, 3, 10, 11, 14, 15, 16, 18, 24],
+    'car': [1, 3, 6, 14, 15, 16, 17, 18, 19, 21, 22, 25, 32, 41, 42, 43]
+}
 
-    passenger = str(passenger).strip()
-    dept_info = roster_index.get(passenger, {})
 
-    # 上车时间（出发日期+出发时间）
-    pickup_date = str(row.iloc[14]) if len(row) > 14 and pd.notna(row.iloc[14]) else ''
-    pickup_time = str(row.iloc[15]) if len(row) > 15 and pd.notna(row.iloc[15]) else ''
+def stream_alibaba_records(
+    filepath: Path,
+    batch_size: int = STREAM_BATCH_SIZE,
+    report: Optional[FileReport] = None
+) -> Iterator[Dict]:
+    """
+    以流式方式读取阿里商旅Excel文件并逐条产生记录
 
-    # 下车时间（到达日期+到达时间）
-    dropoff_date = str(row.iloc[16]) if len(row) > 16 and pd.notna(row.iloc[16]) else ''
-    dropoff_time = str(row.iloc[17]) if len(row) > 17 and pd.notna(row.iloc[17]) else ''
+    逐行读取工作表（跳过标题行、表头行和合计行），每 batch_size 行交给批量提取函数，
+    内存占用不随工作表行数增长。
 
-    # 金额（索引32是结算金额）
-    amount = 0
-    if len(row) > 32 and pd.notna(row.iloc[32]):
-        try:
-            amount = float(row.iloc[32])
-        except (ValueError, TypeError):
-            pass
+    Args:
+        filepath: Excel文件路径
+        batch_size: 每批行数
+        report: 文件运行统计，记录各工作表的耗时和行数
 
-    # 里程（索引25）
-    distance = 0
-    if len(row) > 25 and pd.notna(row.iloc[25]):
-        try:
-            distance = float(row.iloc[25])
-        except (ValueError, TypeError):
-            pass
-
-    # 用车类型（索引43平台车型，索引42供应商车型）
-    car_type = str(row.iloc[43]) if len(row) > 43 and pd.notna(row.iloc[43]) else ''
-    if not car_type:
-        car_type = str(row.iloc[42]) if len(row) > 42 and pd.notna(row.iloc[42]) else ''
-
-    record = {
-        'source': '阿里商旅',
-        'type': 'car',
-        'passenger': passenger,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
-        'pickupTime': f'{pickup_date} {pickup_time}'.strip(),
-        'dropoffTime': f'{dropoff_date} {dropoff_time}'.strip(),
-        'carType': car_type,
-        'provider': str(row.iloc[41]) if len(row) > 41 and pd.notna(row.iloc[41]) else '',
-        'origin': {
-            'city': str(row.iloc[18]) if len(row) > 18 and pd.notna(row.iloc[18]) else '',
-            'address': str(row.iloc[19]) if len(row) > 19 and pd.notna(row.iloc[19]) else ''
-        },
-        'destination': {
-            'city': str(row.iloc[21]) if len(row) > 21 and pd.notna(row.iloc[21]) else '',
-            'address': str(row.iloc[22]) if len(row) > 22 and pd.notna(row.iloc[22]) else ''
-        },
-        'distance': distance,
-        'totalAmount': amount
-    }
-
-    # 订单号（索引1）
-    if len(row) > 1 and pd.notna(row.iloc[1]):
-        record['orderNo'] = str(int(row.iloc[1])) if isinstance(row.iloc[1], (int, float)) else str(row.iloc[1])
-
-    return record
+    Yields:
+        处理后的记录
+    """
+    workbook = open_streaming_workbook(filepath)
+    try:
+        for sheet_type, label, extract_records in SHEET_EXTRACTORS:
+            for sheet_pattern in SHEET_MAPPING[sheet_type]:
+                if sheet_pattern not in workbook.sheetnames:
+                    continue
+
+                row_count = 0
+                sheet_start = time.perf_counter()
+                for batch in iter_sheet_batches(workbook, sheet_pattern, header=2, skiprows=[3],
+                                                batch_size=batch_size,
+                                                columns=SHEET_COLUMNS[sheet_type]):
+                    row_count += len(batch)
+                    yield from extract_records(batch)
+
+                if report is not None:
+                    report.add_sheet(sheet_pattern, time.perf_counter() - sheet_start, row_count)
+                if row_count > 0:
+                    print(f'  处理{label}数据 ({sheet_pattern}, 流式): {row_count} 条')
+    finally:
+        workbook.close()
 
 
 def process_alibaba_file(
     filepath: Path,
-    roster_index: Dict[str, Dict]
-) -> List[Dict]:
+    stream: bool = False,
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
+) -> Optional[List[Dict]]:
     """
     处理阿里商旅Excel文件
 
     Args:
         filepath: Excel文件路径
-        roster_index: 员工索引
+        stream: 是否使用流式读取（适合超大文件，内存占用恒定）
+        cache: 工作表缓存（流式读取时不使用）
+        report: 文件运行统计，记录各工作表的耗时和行数
 
     Returns:
-        处理后的记录列表
+        处理后的记录列表，无法读取Excel文件时返回None
     """
     print(f'\n处理阿里商旅文件: {filepath.name}')
 
+    if stream:
+        try:
+            all_records = list(stream_alibaba_records(filepath, report=report))
+        except Exception as e:
+            print(f'  错误: 无法读取Excel文件: {e}')
+            import traceback
+            traceback.print_exc()
+            return None
+
+        print(f'  总共提取 {len(all_records)} 条记录')
+        return all_records
+
     all_records = []
 
     try:
-        excel_file = pd.ExcelFile(filepath)
-
-        # 处理机票
-        for sheet_pattern in SHEET_MAPPING['flight']:
-            if sheet_pattern in excel_file.sheet_names:
-                df = read_alibaba_sheet(filepath, sheet_pattern)
-                if df is not None and len(df) > 0:
-                    print(f'  处理机票数据 ({sheet_pattern}): {len(df)} 条')
-                    for _, row in df.iterrows():
-                        record = extract_flight_record(row, roster_index)
-                        if record:
-                            all_records.append(record)
-
-        # 处理火车
-        for sheet_pattern in SHEET_MAPPING['train']:
-            if sheet_pattern in excel_file.sheet_names:
-                df = read_alibaba_sheet(filepath, sheet_pattern)
-                if df is not None and len(df) > 0:
-                    print(f'  处理火车数据 ({sheet_pattern}): {len(df)} 条')
-                    for _, row in df.iterrows():
-                        record = extract_train_record(row, roster_index)
-                        if record:
-                            all_records.append(record)
-
-        # 处理用车
-        for sheet_pattern in SHEET_MAPPING['car']:
-            if sheet_pattern in excel_file.sheet_names:
-                df = read_alibaba_sheet(filepath, sheet_pattern)
-                if df is not None and len(df) > 0:
-                    print(f'  处理用车数据 ({sheet_pattern}): {len(df)} 条')
-                    for _, row in df.iterrows():
-                        record = extract_car_record(row, roster_index)
-                        if record:
-                            all_records.append(record)
+        # 整个文件只解压、解析一次工作簿，各工作表共用同一个句柄；命中缓存的工作表不解析
+        with CachedWorkbook(filepath, cache, report=report) as excel_file:
+            for sheet_type, label, extract_records in SHEET_EXTRACTORS:
+                for sheet_pattern in SHEET_MAPPING[sheet_type]:
+                    if sheet_pattern not in excel_file.sheet_names:
+                        continue
+
+                    df = read_alibaba_sheet(excel_file, sheet_pattern, SHEET_COLUMNS[sheet_type])
+
+                    if df is not None and len(df) > 0:
+                        print(f'  处理{label}数据 ({sheet_pattern}): {len(df)} 条')
+                        all_records.extend(extract_records(df))
 
     except Exception as e:
         print(f'  错误: 无法读取Excel文件: {e}')
         import traceback
         traceback.print_exc()
-        return []
+        return None
 
+    excel_file.print_timing()
     print(f'  总共提取 {len(all_records)} 条记录')
     return all_records
 
@@ -352,10 +415,25 @@ def process_alibaba(
     filepath: Path,
     output_dir: Path,
     roster_index_path: Path,
-    file_info: Optional[TravelFileInfo] = None
+    file_info: Optional[TravelFileInfo] = None,
+    stream: bool = False,
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
 ) -> Optional[str]:
     """
     处理阿里商旅文件并保存结果
+
+    Args:
+        filepath: Excel文件路径
+        output_dir: 输出目录
+        roster_index_path: 花名册索引文件路径
+        file_info: 文件信息（如果已有）
+        stream: 是否使用流式读取
+        cache: 工作表缓存，为None时不使用缓存
+        report: 文件运行统计，为None时不统计
+
+    Returns:
+        处理的月份 (YYYY-MM格式)，如果失败返回None
     """
     # 确定月份
     month = None
@@ -371,39 +449,36 @@ def process_alibaba(
         print(f'警告: 无法确定文件 {filepath.name} 的归属月份')
         return None
 
-    # 加载员工索引
-    roster_index = load_employee_index(roster_index_path, month)
-    if not roster_index:
-        print(f'警告: 未找到月份 {month} 的花名册数据')
-
-    # 处理文件
-    records = process_alibaba_file(filepath, roster_index)
-    if not records:
+    # 流式读取：边读取Excel边写入分片，不在内存中保留全部记录
+    if stream:
+        print(f'\n处理阿里商旅文件: {filepath.name}')
+        try:
+            save_travel_shard(
+                'alibaba', '阿里商旅', month, filepath.name,
+                stream_alibaba_records(filepath, report=report),
+                output_dir, roster_index_path, report
+            )
+        except Exception as e:
+            print(f'  错误: 无法读取Excel文件: {e}')
+            import traceback
+            traceback.print_exc()
+            return None
         return month
 
-    # 保存结果
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / f'alibaba_{month}.json'
-
-    output_data = {
-        'source': '阿里商旅',
-        'month': month,
-        'sourceFile': filepath.name,
-        'processedAt': datetime.now().isoformat(),
-        'records': records,
-        'count': len(records)
-    }
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    # 处理文件（部门信息在保存时统一关联）
+    records = process_alibaba_file(filepath, stream=stream, cache=cache, report=report)
+    if records is None:
+        return None
+    if report is not None:
+        report.rows_out = len(records)
 
-    print(f'  保存到: {output_file}')
+    if not records:
+        return month
 
-    # 统计关联率
-    matched_count = sum(1 for r in records if r.get('deptLevel1'))
-    if records:
-        match_rate = matched_count / len(records) * 100
-        print(f'  部门关联率: {matched_count}/{len(records)} ({match_rate:.1f}%)')
+    # 保存未关联部门的记录，再按花名册关联部门写入分片
+    save_travel_shard(
+        'alibaba', '阿里商旅', month, filepath.name, records, output_dir, roster_index_path, report
+    )
 
     return month
 
@@ -415,6 +490,8 @@ if __name__ == '__main__':
     parser.add_argument('input', help='输入的Excel文件路径')
     parser.add_argument('-o', '--output', default='data/processed', help='输出目录')
     parser.add_argument('-r', '--roster', default='data/processed/roster_index.json', help='花名册索引文件')
+    parser.add_argument('--stream', action='store_true', help='流式读取（超大文件使用，内存占用恒定）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用工作表缓存，每次都重新解析Excel')
 
     args = parser.parse_args()
 
@@ -422,4 +499,6 @@ if __name__ == '__main__':
     output_dir = Path(args.output)
     roster_index_path = Path(args.roster)
 
-    process_alibaba(input_path, output_dir / 'by-month', roster_index_path)
+    cache = None if args.no_cache else SheetCache(sheet_cache_dir(output_dir))
+
+    process_alibaba(input_path, output_dir / 'by-month', roster_index_path, stream=args.stream, cache=cache)
@@ -5,38 +5,355 @@
 自动检测、分类并处理所有差旅数据文件。
 """
 
+import io
 import sys
 import argparse
+import traceback
+import contextlib
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 添加父目录到路径以导入utils和处理器
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils import scan_and_classify_files, print_scan_summary, update_processed_metadata
-from process_roster import process_roster
+from utils import (
+    scan_excel_files,
+    scan_and_classify_files,
+    print_scan_summary,
+    ProcessingManifest,
+    shard_filename,
+    combine_hashes,
+    SheetCache,
+    sheet_cache_dir,
+    ScanResult,
+    TravelFileInfo,
+    RunReport,
+    FileReport,
+    RUN_REPORT_FILENAME,
+    RosterStore,
+    ROSTER_INDEX_VERSION,
+    RECORDS_FORMAT,
+    OUTPUT_FORMATS,
+    travel_data_format,
+    set_json_pretty,
+    is_json_pretty,
+    json_io_stats,
+    profile_run
+)
+from process_roster import process_roster, roster_cache_snapshot, prime_roster_cache
 from process_alibaba import process_alibaba
 from process_ctrip import process_ctrip
 from process_zaitu import process_zaitu
 from merge_data import merge_data
+from enrich_data import enrich_shard, normalized_dir_for
+
+
+# 商旅数据源 -> (显示名称, 处理函数, 是否支持流式读取)
+TRAVEL_PROCESSORS = {
+    'alibaba': ('阿里商旅', process_alibaba, True),
+    'ctrip': ('携程商旅', process_ctrip, True),
+    'zaitu': ('在途商旅', process_zaitu, False)
+}
+
+
+def run_travel_processor(
+    file_info: TravelFileInfo,
+    by_month_dir: Path,
+    roster_index_path: Path,
+    stream: bool = False,
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
+) -> Optional[str]:
+    """
+    调用单个商旅文件对应的处理函数
+
+    Args:
+        file_info: 商旅文件信息
+        by_month_dir: 按月分片输出目录
+        roster_index_path: 花名册索引文件路径
+        stream: 是否使用流式读取（仅对支持的数据源生效）
+        cache: 工作表缓存，为None时不使用缓存
+        report: 文件运行统计，为None时不统计
+
+    Returns:
+        处理的月份，失败返回None
+    """
+    _, processor, supports_stream = TRAVEL_PROCESSORS[file_info.source]
+    kwargs = {'stream': stream} if supports_stream else {}
+    return processor(
+        file_info.filepath, by_month_dir, roster_index_path, file_info,
+        cache=cache, report=report, **kwargs
+    )
+
+
+def measure_travel_file(
+    file_info: TravelFileInfo,
+    by_month_dir: Path,
+    roster_index_path: Path,
+    stream: bool,
+    cache: Optional[SheetCache]
+) -> Tuple[Optional[str], FileReport]:
+    """
+    处理单个商旅文件并统计耗时、行数和峰值内存
+
+    Returns:
+        (处理的月份, 文件运行统计)
+    """
+    file_report = FileReport(file_info.filename, file_info.source)
+    with file_report.measure():
+        month = run_travel_processor(file_info, by_month_dir, roster_index_path, stream, cache, file_report)
+    return month, file_report
+
+
+def _process_file_group(
+    group: List[TravelFileInfo],
+    by_month_dir: Path,
+    roster_index_path: Path,
+    stream: bool,
+    cache: Optional[SheetCache]
+) -> List[Tuple[TravelFileInfo, Optional[str], str, FileReport]]:
+    """
+    在工作进程中依次处理一组文件，并捕获各文件的控制台输出
+
+    同一组内的文件写入同一个分片（同数据源、同月份），按原顺序串行处理，
+    保证与单进程时的覆盖顺序一致。
+
+    Returns:
+        [(文件信息, 处理的月份, 控制台输出, 文件运行统计)]，峰值内存为工作进程的峰值
+    """
+    results = []
+    for file_info in group:
+        buffer = io.StringIO()
+        month = None
+        file_report = FileReport(file_info.filename, file_info.source)
+        with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+            try:
+                month, file_report = measure_travel_file(file_info, by_month_dir, roster_index_path, stream, cache)
+            except Exception:
+                traceback.print_exc()
+        file_report.json_io = json_io_stats().take()
+        results.append((file_info, month, buffer.getvalue(), file_report))
+    return results
+
+
+def _init_worker(snapshot: Dict, pretty: bool):
+    """工作进程初始化：填充花名册缓存，沿用主进程的JSON输出格式"""
+    prime_roster_cache(snapshot)
+    set_json_pretty(pretty)
+
+
+def process_travel_files(
+    files: List[TravelFileInfo],
+    by_month_dir: Path,
+    roster_index_path: Path,
+    stream: bool = False,
+    jobs: int = 1,
+    cache: Optional[SheetCache] = None,
+    run_report: Optional[RunReport] = None
+) -> List[Tuple[TravelFileInfo, Optional[str]]]:
+    """
+    处理商旅文件（阿里、携程、在途）
+
+    jobs > 1 时使用进程池并行处理：每个文件的输出先缓存，处理完成后整段打印，
+    所有文件处理完才返回，保证合并阶段看到的是完整一致的分片。
+
+    Args:
+        files: 要处理的商旅文件
+        by_month_dir: 按月分片输出目录
+        roster_index_path: 花名册索引文件路径
+        stream: 阿里、携程文件是否使用流式读取
+        jobs: 并行进程数
+        cache: 工作表缓存，为None时不使用缓存
+        run_report: 运行报告，每个文件的统计（含工作进程返回的）都加入其中
+
+    Returns:
+        [(文件信息, 处理的月份)]，处理失败的月份为None
+    """
+    if jobs <= 1 or len(files) <= 1:
+        results = []
+        for source in TRAVEL_PROCESSORS:
+            source_files = [file_info for file_info in files if file_info.source == source]
+            if not source_files:
+                continue
+            print(f'\n--- {TRAVEL_PROCESSORS[source][0]} ---')
+            for file_info in source_files:
+                # 与并行处理一致：单个文件出错只记为失败，不中断其他文件
+                month = None
+                file_report = FileReport(file_info.filename, file_info.source)
+                try:
+                    month, file_report = measure_travel_file(file_info, by_month_dir, roster_index_path, stream, cache)
+                except Exception:
+                    traceback.print_exc()
+                if run_report is not None:
+                    run_report.add_file(file_report)
+                results.append((file_info, month))
+        return results
+
+    # 写入同一分片的文件分到同一组，组内串行
+    groups = {}
+    for file_info in files:
+        groups.setdefault((file_info.source, file_info.target_month), []).append(file_info)
+
+    workers = min(jobs, len(groups))
+    print(f'\n并行处理 {len(files)} 个文件（{workers} 个进程）')
+
+    # 花名册时间线在主进程中构建一次，随进程池初始化交给每个工作进程
+    snapshot = roster_cache_snapshot(roster_index_path)
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(snapshot, is_json_pretty())
+    ) as executor:
+        futures = [
+            executor.submit(_process_file_group, group, by_month_dir, roster_index_path, stream, cache)
+            for group in groups.values()
+        ]
+        for future in as_completed(futures):
+            for file_info, month, output, file_report in future.result():
+                label = TRAVEL_PROCESSORS[file_info.source][0]
+                print(f'\n--- [{len(results) + 1}/{len(files)}] {label}: {file_info.filename} ---')
+                print(output.rstrip('\n'))
+                if run_report is not None:
+                    run_report.add_file(file_report)
+                results.append((file_info, month))
+
+    return results
+
+
+def roster_fingerprint(roster_hashes: Dict[str, str]) -> str:
+    """
+    商旅数据所用花名册的指纹
+
+    每条记录按日期从花名册时间线取部门，时间线由所有花名册构建，
+    因此任一花名册变化都需要重新关联部门；月份文件格式升级（如增加英文名）后也要重新关联。
+
+    Args:
+        roster_hashes: 花名册文件名 -> 内容哈希
+
+    Returns:
+        指纹字符串
+    """
+    return combine_hashes(list(roster_hashes.values()) + [f'roster-v{ROSTER_INDEX_VERSION}'])
+
+
+def plan_travel_shards(
+    scan_result: ScanResult,
+    manifest: ProcessingManifest,
+    by_month_dir: Path,
+    roster_hashes: Dict[str, str],
+    force: bool = False
+) -> Tuple[Dict[str, Dict], List[str]]:
+    """
+    按分片整理商旅文件，判断哪些分片需要重建
+
+    同一数据源、同一月份的文件写入同一个分片，其中任一文件内容变化或文件增减，
+    整个分片都要重建；只有所用花名册变化时，只需重新关联部门信息。
+
+    Args:
+        scan_result: 扫描结果
+        manifest: 处理清单
+        by_month_dir: 按月分片目录
+        roster_hashes: 花名册文件名 -> 内容哈希
+        force: 是否强制重建所有分片
+
+    Returns:
+        (分片文件名 -> {files, inputs, roster, status}, 无法确定月份的文件名列表)
+        status 取值见 ProcessingManifest.shard_status
+    """
+    shards = {}
+    no_month = []
+    roster = roster_fingerprint(roster_hashes)
+
+    for file_info in scan_result.all_travel_files:
+        if not file_info.target_month:
+            no_month.append(file_info.filename)
+            continue
+
+        shard_name = shard_filename(file_info.source, file_info.target_month)
+        shard = shards.setdefault(shard_name, {
+            'files': [],
+            'inputs': {},
+            'roster': roster
+        })
+        shard['files'].append(file_info)
+        shard['inputs'][file_info.filename] = manifest.file_hash(file_info.filepath)
+
+    normalized_dir = normalized_dir_for(by_month_dir)
+    for shard_name, shard in shards.items():
+        if force:
+            shard['status'] = 'rebuild'
+        else:
+            shard['status'] = manifest.shard_status(
+                shard_name, shard['inputs'], shard['roster'], by_month_dir, normalized_dir
+            )
+
+    return shards, no_month
+
+
+def remove_stale_shards(
+    manifest: ProcessingManifest,
+    shard_names: List[str],
+    by_month_dir: Path
+) -> List[str]:
+    """
+    删除输入文件已全部从原始数据目录移除的分片
+
+    只处理清单中记录过的分片（即本工具生成的），其他文件不动。
+
+    Returns:
+        删除的分片文件名列表
+    """
+    removed = []
+    for shard_name in list(manifest.shards):
+        if shard_name in shard_names:
+            continue
+        for shard_path in (by_month_dir / shard_name, normalized_dir_for(by_month_dir) / shard_name):
+            if shard_path.exists():
+                shard_path.unlink()
+        del manifest.shards[shard_name]
+        removed.append(shard_name)
+    return removed
 
 
 def process_all_files(
     raw_dir: Path,
     output_dir: Path,
-    force: bool = False
+    force: bool = False,
+    stream: bool = False,
+    jobs: int = 1,
+    use_cache: bool = True,
+    write_report: bool = False,
+    output_format: str = RECORDS_FORMAT,
+    parquet: bool = False,
+    sqlite: bool = False
 ) -> bool:
     """
     处理所有数据文件
 
+    默认增量处理：按处理清单（.processed.json）中记录的内容哈希，
+    只重新处理有变化的花名册和输入有变化的分片，没有任何变化时跳过合并。
+
     Args:
         raw_dir: 原始数据目录
         output_dir: 输出目录
         force: 是否强制重新处理所有文件
+        stream: 阿里、携程文件是否使用流式读取
+        jobs: 商旅文件并行处理的进程数
+        use_cache: 是否使用工作表缓存（data/processed/cache）
+        write_report: 是否把运行统计保存到 run-report.json
+        output_format: travel-data.json 的格式，records（记录列表）或 columnar（列式）
+        parquet: 是否同时导出 Parquet 数据集（<输出目录>/parquet/）
+        sqlite: 合并时是否经过 SQLite 记录库（<输出目录>/travel.db）
 
     Returns:
         是否成功
     """
+    report = RunReport()
+
     print('=' * 70)
     print('差旅数据处理工具')
     print('=' * 70)
@@ -52,10 +369,12 @@ def process_all_files(
 
     by_month_dir = output_dir / 'by-month'
     roster_index_path = output_dir / 'roster_index.json'
+    travel_data_path = output_dir / 'travel-data.json'
 
     # 扫描并分类文件
     print('扫描原始数据文件...')
-    scan_result = scan_and_classify_files(raw_dir)
+    with report.phase('扫描文件'):
+        scan_result = scan_and_classify_files(raw_dir)
     print_scan_summary(scan_result)
 
     # 统计
@@ -75,25 +394,50 @@ def process_all_files(
         print(f'  在途商旅: 在途*.xls (如: 在途20251126-20251225.xls)')
         return False
 
+    manifest = ProcessingManifest(output_dir) if force else ProcessingManifest.load(output_dir)
+
     # Phase 1: 处理花名册（必须先处理，因为其他数据需要关联部门信息）
     print('\n' + '=' * 70)
     print('Phase 1: 处理花名册')
     print('=' * 70)
 
+    roster_hashes = {}
     processed_months = set()
-    for month, roster_info in sorted(scan_result.rosters.items()):
-        month = process_roster(
-            roster_info.filepath,
-            by_month_dir,
-            roster_index_path
-        )
-        if month:
-            processed_months.add(month)
-
-    if not processed_months:
+    skipped_rosters = 0
+    roster_store = RosterStore(roster_index_path, by_month_dir)
+    with report.phase('花名册') as phase:
+        for month, roster_info in sorted(scan_result.rosters.items()):
+            file_hash = manifest.file_hash(roster_info.filepath)
+            roster_hashes[roster_info.filename] = file_hash
+
+            # 月份文件格式升级后，即使花名册未变化也要重新处理
+            if (manifest.is_file_current(roster_info.filepath, file_hash, by_month_dir)
+                    and roster_store.is_month_current(month)):
+                skipped_rosters += 1
+                continue
+
+            file_report = FileReport(roster_info.filename, 'roster')
+            with file_report.measure():
+                month = process_roster(
+                    roster_info.filepath,
+                    by_month_dir,
+                    roster_index_path,
+                    file_report
+                )
+            report.add_file(file_report)
+            phase.rows_in += file_report.rows_in
+            phase.rows_out += file_report.rows_out
+            if month:
+                processed_months.add(month)
+                manifest.record_file(roster_info.filepath, file_hash, 'roster', [f'{month}.json'])
+
+    if skipped_rosters:
+        print(f'\n跳过 {skipped_rosters} 个未变化的花名册')
+
+    if not processed_months and not skipped_rosters:
         print('警告: 没有成功处理任何花名册文件')
         print('其他数据将无法关联部门信息')
-    else:
+    elif processed_months:
         print(f'\n成功处理 {len(processed_months)} 个月份的花名册')
 
     # Phase 2: 处理商旅数据
@@ -101,58 +445,110 @@ def process_all_files(
     print('Phase 2: 处理商旅数据')
     print('=' * 70)
 
-    # 处理阿里商旅
-    print('\n--- 阿里商旅 ---')
-    for file_info in scan_result.alibaba:
-        process_alibaba(
-            file_info.filepath,
-            by_month_dir,
-            roster_index_path,
-            file_info
-        )
-
-    # 处理携程商旅
-    print('\n--- 携程商旅 ---')
-    for file_info in scan_result.ctrip:
-        process_ctrip(
-            file_info.filepath,
-            by_month_dir,
-            roster_index_path,
-            file_info
-        )
-
-    # 处理在途商旅
-    print('\n--- 在途商旅 ---')
-    for file_info in scan_result.zaitu:
-        process_zaitu(
-            file_info.filepath,
-            by_month_dir,
-            roster_index_path,
-            file_info
+    with report.phase('检查分片'):
+        shards, no_month = plan_travel_shards(scan_result, manifest, by_month_dir, roster_hashes, force)
+    dirty_shards = {name: shard for name, shard in shards.items() if shard['status'] == 'rebuild'}
+    enrich_shards = {name: shard for name, shard in shards.items() if shard['status'] == 'enrich'}
+    skipped_shards = len(shards) - len(dirty_shards) - len(enrich_shards)
+    if skipped_shards:
+        print(f'\n跳过 {skipped_shards} 个输入未变化的分片')
+
+    # 只有花名册变化的分片：用已保存的未关联记录重新关联部门，不读取Excel
+    if enrich_shards:
+        print(f'\n{len(enrich_shards)} 个分片只有花名册变化，重新关联部门信息')
+        with report.phase('重新关联部门'):
+            for shard_name, shard in enrich_shards.items():
+                if enrich_shard(shard_name, by_month_dir, roster_index_path):
+                    manifest.record_shard(shard_name, shard['inputs'], shard['roster'], True)
+                else:
+                    dirty_shards[shard_name] = shard
+
+    files_to_process = [
+        file_info for file_info in scan_result.all_travel_files
+        if not file_info.target_month or
+        shard_filename(file_info.source, file_info.target_month) in dirty_shards
+    ]
+
+    cache = SheetCache(sheet_cache_dir(output_dir)) if use_cache else None
+    with report.phase('商旅数据') as phase:
+        files_before = len(report.files)
+        results = process_travel_files(
+            files_to_process, by_month_dir, roster_index_path,
+            stream=stream, jobs=jobs, cache=cache, run_report=report
         )
+        phase.rows_in = sum(file_report.rows_in for file_report in report.files[files_before:])
+        phase.rows_out = sum(file_report.rows_out for file_report in report.files[files_before:])
+
+    # 分片内所有文件都处理成功才记录，失败的分片下次运行会重试
+    failed = {file_info.filename for file_info, month in results if month is None}
+    rows_out = {file_report.filename: file_report.rows_out for file_report in report.files[files_before:]}
+    for shard_name, shard in dirty_shards.items():
+        if any(file_info.filename in failed for file_info in shard['files']):
+            continue
+        # 处理成功但没有记录的分片：删除上次留下的分片文件，否则合并时仍会读到旧数据
+        written = any(rows_out.get(file_info.filename, 0) > 0 for file_info in shard['files'])
+        if not written:
+            for shard_path in (by_month_dir / shard_name, normalized_dir_for(by_month_dir) / shard_name):
+                if shard_path.exists():
+                    shard_path.unlink()
+        manifest.record_shard(shard_name, shard['inputs'], shard['roster'], written)
+        for file_info in shard['files']:
+            manifest.record_file(
+                file_info.filepath,
+                shard['inputs'][file_info.filename],
+                file_info.source,
+                [shard_name] if written else []
+            )
+
+    removed_shards = remove_stale_shards(manifest, list(shards), by_month_dir)
+    for shard_name in removed_shards:
+        print(f'  删除输入文件已移除的分片: {shard_name}')
 
     # Phase 3: 合并数据
     print('\n' + '=' * 70)
     print('Phase 3: 合并数据')
     print('=' * 70)
 
-    travel_data_path = output_dir / 'travel-data.json'
-    success = merge_data(by_month_dir, travel_data_path, roster_index_path)
+    changed = processed_months or dirty_shards or enrich_shards or removed_shards
+    parquet_dir = output_dir / 'parquet' if parquet else None
+    store_path = output_dir / 'travel.db' if sqlite else None
+    if (not changed and travel_data_path.exists()
+            and travel_data_format(travel_data_path) == output_format
+            and (parquet_dir is None or parquet_dir.exists())
+            and (store_path is None or store_path.exists())):
+        print('\n所有数据均未变化，跳过合并')
+        success = True
+    else:
+        success = merge_data(
+            by_month_dir, travel_data_path, roster_index_path, report,
+            output_format, parquet_dir, store_path
+        )
 
     if success:
-        # 更新处理元数据
-        update_processed_metadata(raw_dir, output_dir)
-        print('\n处理元数据已更新')
+        # 更新处理清单
+        manifest.forget_missing_files([path.name for path in scan_excel_files(raw_dir)])
+        manifest.save()
+        print('\n处理清单已更新')
 
     print('\n' + '=' * 70)
     print('处理完成')
     print('=' * 70)
     print(f'结束时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
 
+    report.print_summary()
+    if write_report:
+        report_path = output_dir / RUN_REPORT_FILENAME
+        report.save(report_path)
+        print(f'运行统计已保存到: {report_path}')
+
     if success:
         print(f'\n数据文件已生成:')
         print(f'  花名册索引: {roster_index_path}')
         print(f'  差旅数据: {travel_data_path}')
+        if parquet_dir is not None:
+            print(f'  Parquet数据集: {parquet_dir}')
+        if store_path is not None:
+            print(f'  SQLite记录库: {store_path}')
         print(f'\n下一步: 运行 generate_html.py 生成HTML文件')
 
     return success
@@ -164,14 +560,30 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog='''
 示例用法:
-  python process_all.py                    # 使用默认目录
+  python process_all.py                    # 使用默认目录（增量处理）
   python process_all.py -f                 # 强制重新处理所有文件
+  python process_all.py --stream           # 超大文件：流式读取阿里/携程数据
+  python process_all.py -j 4               # 4个进程并行处理商旅文件
+  python process_all.py --no-cache         # 不使用工作表缓存，重新解析所有Excel
+  python process_all.py --report           # 保存运行统计到 run-report.json
+  python process_all.py --format columnar  # 输出列式 travel-data.json（文件更小，加载更快）
+  python process_all.py --pretty           # JSON输出为缩进格式（便于调试）
+  python process_all.py --parquet          # 同时导出 Parquet 数据集（需要 pyarrow）
+  python process_all.py --sqlite           # 经过 SQLite 记录库合并（增量写入、SQL统计）
+  python process_all.py --profile          # 性能剖析，结果保存到 data/processed/profile/
   python process_all.py -i data/raw -o data/processed
 
 输出文件:
   data/processed/roster_index.json        # 花名册索引
-  data/processed/by-month/*.json           # 按月分片的数据
+  data/processed/by-month/*.ndjson         # 按月分片的数据（逐行JSON，每行一条记录）
+  data/processed/normalized/*.ndjson       # 未关联部门的分片（花名册变化时重新关联用）
   data/processed/travel-data.json          # 合并后的完整数据
+  data/processed/parquet/                  # 按月份/数据源分区的 Parquet 数据集（--parquet）
+  data/processed/travel.db                 # SQLite 记录库（--sqlite）
+  data/processed/.processed.json           # 处理清单（原始文件哈希 -> 生成的分片）
+  data/processed/cache/                    # 工作表解析缓存（可随时删除）
+  data/processed/run-report.json           # 运行统计（--report，各阶段/文件/工作表的耗时和内存）
+  data/processed/profile/                  # 性能剖析结果（--profile）
         '''
     )
 
@@ -188,7 +600,54 @@ def main():
     parser.add_argument(
         '-f', '--force',
         action='store_true',
-        help='强制重新处理所有文件（忽略修改时间检查）'
+        help='强制重新处理所有文件（忽略处理清单）'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='阿里、携程文件使用流式读取（内存占用恒定，适合超大文件）'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='商旅文件并行处理的进程数 (默认: 1，即串行)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='不使用工作表缓存，每次都重新解析Excel'
+    )
+    parser.add_argument(
+        '--report',
+        action='store_true',
+        help='把各阶段、文件、工作表的耗时和内存统计保存到 run-report.json'
+    )
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default=RECORDS_FORMAT,
+        help='travel-data.json 的格式: records（记录列表，默认）或 columnar（列式，重复文本字典编码）'
+    )
+    parser.add_argument(
+        '--parquet',
+        action='store_true',
+        help='同时导出按月份、数据源分区的 Parquet 数据集到 <输出目录>/parquet/（需要安装 pyarrow）'
+    )
+    parser.add_argument(
+        '--sqlite',
+        action='store_true',
+        help='把分片增量同步到 SQLite 记录库 <输出目录>/travel.db，合并时从库中读取记录并用 SQL 计算摘要'
+    )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='花名册、处理清单、travel-data.json 写成缩进格式（便于调试，默认为紧凑格式）'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='性能剖析（函数耗时和内存分配），结果保存到 <输出目录>/profile/；并行时只统计主进程'
     )
     parser.add_argument(
         '-v', '--verbose',
@@ -197,11 +656,24 @@ def main():
     )
 
     args = parser.parse_args()
+    set_json_pretty(args.pretty)
 
     raw_dir = Path(args.input)
     output_dir = Path(args.output)
 
-    success = process_all_files(raw_dir, output_dir, args.force)
+    with profile_run(output_dir, 'process_all', enabled=args.profile):
+        success = process_all_files(
+            raw_dir,
+            output_dir,
+            args.force,
+            stream=args.stream,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            write_report=args.report,
+            output_format=args.format,
+            parquet=args.parquet,
+            sqlite=args.sqlite
+        )
 
     sys.exit(0 if success else 1)
 
@@ -3,6 +3,7 @@
 携程商旅数据处理脚本
 
 读取携程商旅Excel文件，提取机票、酒店、用车等数据。
+部门字段（deptLevel1/deptLevel2）提取时留空占位，保存分片时按花名册统一关联（见 enrich_data）。
 
 携程商旅Excel格式特点：
 - 第1-4行：标题行
@@ -12,15 +13,25 @@
 """
 
 import sys
-import json
+import time
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Union
 
 # 添加父目录到路径以导入utils
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import TravelFileInfo, load_employee_index
+from enrich_data import save_travel_shard
+from utils import (
+    TravelFileInfo,
+    CachedWorkbook,
+    FileReport,
+    SheetCache,
+    sheet_cache_dir,
+    read_sheet,
+    open_streaming_workbook,
+    iter_sheet_batches,
+    STREAM_BATCH_SIZE
+)
 
 
 # 航空公司代码映射（从航班号前缀推断）
@@ -101,13 +112,18 @@ CTRIP_SHEET_MAPPING = {
 }
 
 
-def read_ctrip_sheet(filepath: Path, sheet_name: str) -> Optional[pd.DataFrame]:
+def read_ctrip_sheet(
+    excel_file: Union[Path, pd.ExcelFile, CachedWorkbook],
+    sheet_name: str,
+    columns: Optional[List[int]] = None
+) -> Optional[pd.DataFrame]:
     """
     读取携程商旅工作表，跳过标题行
 
     Args:
-        filepath: Excel文件路径
+        excel_file: 带缓存的工作簿（CachedWorkbook）、已打开的 pd.ExcelFile，也可以是Excel文件路径
         sheet_name: 工作表名称
+        columns: 只读取这些位置的列（见 CTRIP_SHEET_COLUMNS），为None时读取全部列
 
     Returns:
         处理后的DataFrame
@@ -118,17 +134,29 @@ def read_ctrip_sheet(filepath: Path, sheet_name: str) -> Optional[pd.DataFrame]:
         # Row 4: 中文列名
         # Row 5: 英文列名
         # Row 6+: 实际数据
-        df = pd.read_excel(filepath, sheet_name=sheet_name, header=5)
-        # 过滤掉明显是列名的行（第一列包含中文订单号或英文OrderID）
-        if len(df) > 0:
-            df = df[~df.iloc[:, 0].astype(str).str.contains('订单号|OrderID', na=False)]
-        return df
+        df = read_sheet(excel_file, sheet_name, columns, header=5)
+        return drop_header_rows(df)
     except Exception as e:
         print(f'    警告: 无法读取工作表 {sheet_name}: {e}')
         return None
 
 
-def extract_ctrip_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def drop_header_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    过滤掉明显是列名的行（第一列包含中文订单号或英文OrderID）
+
+    Args:
+        df: 工作表数据
+
+    Returns:
+        过滤后的DataFrame
+    """
+    if len(df) > 0:
+        df = df[~df.iloc[:, 0].astype(str).str.contains('订单号|OrderID', na=False)]
+    return df
+
+
+def extract_ctrip_flight_record(row: pd.Series) -> Optional[Dict]:
     """
     提取携程机票记录
 
@@ -157,7 +185,6 @@ def extract_ctrip_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -
     if passenger.isdigit():
         return None
 
-    dept_info = roster_index.get(passenger, {})
 
     # 起飞时间（索引7）
     depart_time = str(row.iloc[7]) if len(row) > 7 and pd.notna(row.iloc[7]) else ''
@@ -201,8 +228,8 @@ def extract_ctrip_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -
         'source': '携程商旅',
         'type': 'flight',
         'passenger': passenger,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
+        'deptLevel1': '',
+        'deptLevel2': '',
         'bookTime': str(row.iloc[6]) if len(row) > 6 and pd.notna(row.iloc[6]) else depart_time,
         'flightNo': flight_no,
         'departTime': depart_time,
@@ -220,7 +247,7 @@ def extract_ctrip_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -
     return record
 
 
-def extract_ctrip_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_ctrip_hotel_record(row: pd.Series) -> Optional[Dict]:
     """
     提取携程酒店记录
 
@@ -242,7 +269,6 @@ def extract_ctrip_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
     if employee in ['clients', '入住人', '小计', '合计', '总计']:
         return None
 
-    dept_info = roster_index.get(employee, {})
 
     # 金额（索引18）
     price = 0
@@ -256,8 +282,8 @@ def extract_ctrip_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
         'source': '携程商旅',
         'type': 'hotel',
         'employee': employee,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
+        'deptLevel1': '',
+        'deptLevel2': '',
         'checkInTime': str(row.iloc[7]) if len(row) > 7 and pd.notna(row.iloc[7]) else '',
         'checkOutTime': str(row.iloc[8]) if len(row) > 8 and pd.notna(row.iloc[8]) else '',
         'city': str(row.iloc[9]) if len(row) > 9 and pd.notna(row.iloc[9]) else '',
@@ -277,7 +303,7 @@ def extract_ctrip_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
     return record
 
 
-def extract_ctrip_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_ctrip_car_record(row: pd.Series) -> Optional[Dict]:
     """
     提取携程用车记录（预存增值）
     注意：携程的用车数据可能在"预存增值"中，需要根据实际数据结构调整
@@ -286,55 +312,123 @@ def extract_ctrip_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> O
     return None
 
 
+# 各类型工作表对应的提取函数（携程用车暂不提取）
+CTRIP_SHEET_EXTRACTORS = [
+    ('flight', '机票', extract_ctrip_flight_record),
+    ('hotel', '酒店', extract_ctrip_hotel_record)
+]
+
+# 各类型工作表提取时用到的列位置，读取时只解析这些列（第0列同时用于过滤重复表头）
+# 修改提取函数的取值位置时需要同步修改这里
+CTRIP_SHEET_COLUMNS = {
+    'flight': [0, 5, 6, 7, 11, 12, 13, 14],
+    'hotel': [0, 4, 7, 8, 9, 10, 12, 18]
+}
+
+
+def stream_ctrip_records(
+    filepath: Path,
+    batch_size: int = STREAM_BATCH_SIZE,
+    report: Optional[FileReport] = None
+) -> Iterator[Dict]:
+    """
+    以流式方式读取携程商旅Excel文件并逐条产生记录
+
+    逐行读取工作表（header=5，跳过标题行和中英文表头行），
+    每 batch_size 行过滤掉重复表头后交给提取函数，内存占用不随工作表行数增长。
+
+    Args:
+        filepath: Excel文件路径
+        batch_size: 每批行数
+        report: 文件运行统计，记录各工作表的耗时和行数
+
+    Yields:
+        处理后的记录
+    """
+    workbook = open_streaming_workbook(filepath)
+    try:
+        for sheet_type, label, extract_record in CTRIP_SHEET_EXTRACTORS:
+            for sheet_pattern in CTRIP_SHEET_MAPPING[sheet_type]:
+                if sheet_pattern not in workbook.sheetnames:
+                    continue
+
+                row_count = 0
+                sheet_start = time.perf_counter()
+                for batch in iter_sheet_batches(workbook, sheet_pattern, header=5, batch_size=batch_size,
+                                                columns=CTRIP_SHEET_COLUMNS[sheet_type]):
+                    batch = drop_header_rows(batch)
+                    row_count += len(batch)
+                    for _, row in batch.iterrows():
+                        record = extract_record(row)
+                        if record:
+                            yield record
+
+                if report is not None:
+                    report.add_sheet(sheet_pattern, time.perf_counter() - sheet_start, row_count)
+                if row_count > 0:
+                    print(f'  处理{label}数据 ({sheet_pattern}, 流式): {row_count} 条')
+    finally:
+        workbook.close()
+
+
 def process_ctrip_file(
     filepath: Path,
-    roster_index: Dict[str, Dict]
-) -> List[Dict]:
+    stream: bool = False,
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
+) -> Optional[List[Dict]]:
     """
     处理携程商旅Excel文件
 
     Args:
         filepath: Excel文件路径
-        roster_index: 员工索引
+        stream: 是否使用流式读取（适合超大文件，内存占用恒定）
+        cache: 工作表缓存（流式读取时不使用）
+        report: 文件运行统计，记录各工作表的耗时和行数
 
     Returns:
-        处理后的记录列表
+        处理后的记录列表，无法读取Excel文件时返回None
     """
     print(f'\n处理携程商旅文件: {filepath.name}')
 
+    if stream:
+        try:
+            all_records = list(stream_ctrip_records(filepath, report=report))
+        except Exception as e:
+            print(f'  错误: 无法读取Excel文件: {e}')
+            import traceback
+            traceback.print_exc()
+            return None
+
+        print(f'  总共提取 {len(all_records)} 条记录')
+        return all_records
+
     all_records = []
 
     try:
-        excel_file = pd.ExcelFile(filepath)
-
-        # 处理机票
-        for sheet_pattern in CTRIP_SHEET_MAPPING['flight']:
-            if sheet_pattern in excel_file.sheet_names:
-                df = read_ctrip_sheet(filepath, sheet_pattern)
-                if df is not None and len(df) > 0:
-                    print(f'  处理机票数据 ({sheet_pattern}): {len(df)} 条')
-                    for _, row in df.iterrows():
-                        record = extract_ctrip_flight_record(row, roster_index)
-                        if record:
-                            all_records.append(record)
-
-        # 处理酒店
-        for sheet_pattern in CTRIP_SHEET_MAPPING['hotel']:
-            if sheet_pattern in excel_file.sheet_names:
-                df = read_ctrip_sheet(filepath, sheet_pattern)
-                if df is not None and len(df) > 0:
-                    print(f'  处理酒店数据 ({sheet_pattern}): {len(df)} 条')
-                    for _, row in df.iterrows():
-                        record = extract_ctrip_hotel_record(row, roster_index)
-                        if record:
-                            all_records.append(record)
+        # 整个文件只解压、解析一次工作簿，各工作表共用同一个句柄；命中缓存的工作表不解析
+        with CachedWorkbook(filepath, cache, report=report) as excel_file:
+            for sheet_type, label, extract_record in CTRIP_SHEET_EXTRACTORS:
+                for sheet_pattern in CTRIP_SHEET_MAPPING[sheet_type]:
+                    if sheet_pattern not in excel_file.sheet_names:
+                        continue
+
+                    df = read_ctrip_sheet(excel_file, sheet_pattern, CTRIP_SHEET_COLUMNS[sheet_type])
+
+                    if df is not None and len(df) > 0:
+                        print(f'  处理{label}数据 ({sheet_pattern}): {len(df)} 条')
+                        for _, row in df.iterrows():
+                            record = extract_record(row)
+                            if record:
+                                all_records.append(record)
 
     except Exception as e:
         print(f'  错误: 无法读取Excel文件: {e}')
         import traceback
         traceback.print_exc()
-        return []
+        return None
 
+    excel_file.print_timing()
     print(f'  总共提取 {len(all_records)} 条记录')
     return all_records
 
@@ -343,7 +437,10 @@ def process_ctrip(
     filepath: Path,
     output_dir: Path,
     roster_index_path: Path,
-    file_info: Optional[TravelFileInfo] = None
+    file_info: Optional[TravelFileInfo] = None,
+    stream: bool = False,
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
 ) -> Optional[str]:
     """
     处理携程商旅文件并保存结果
@@ -353,6 +450,9 @@ def process_ctrip(
         output_dir: 输出目录
         roster_index_path: 花名册索引文件路径
         file_info: 文件信息（如果已有）
+        stream: 是否使用流式读取
+        cache: 工作表缓存，为None时不使用缓存
+        report: 文件运行统计，为None时不统计
 
     Returns:
         处理的月份 (YYYY-MM格式)，如果失败返回None
@@ -372,41 +472,36 @@ def process_ctrip(
         print(f'警告: 无法确定文件 {filepath.name} 的归属月份')
         return None
 
-    # 加载员工索引
-    roster_index = load_employee_index(roster_index_path, month)
-
-    if not roster_index:
-        print(f'警告: 未找到月份 {month} 的花名册数据')
+    # 流式读取：边读取Excel边写入分片，不在内存中保留全部记录
+    if stream:
+        print(f'\n处理携程商旅文件: {filepath.name}')
+        try:
+            save_travel_shard(
+                'ctrip', '携程商旅', month, filepath.name,
+                stream_ctrip_records(filepath, report=report),
+                output_dir, roster_index_path, report
+            )
+        except Exception as e:
+            print(f'  错误: 无法读取Excel文件: {e}')
+            import traceback
+            traceback.print_exc()
+            return None
+        return month
 
-    # 处理文件
-    records = process_ctrip_file(filepath, roster_index)
+    # 处理文件（部门信息在保存时统一关联）
+    records = process_ctrip_file(filepath, stream=stream, cache=cache, report=report)
+    if records is None:
+        return None
+    if report is not None:
+        report.rows_out = len(records)
 
     if not records:
         return month
 
-    # 保存结果
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / f'ctrip_{month}.json'
-
-    output_data = {
-        'source': '携程商旅',
-        'month': month,
-        'sourceFile': filepath.name,
-        'processedAt': datetime.now().isoformat(),
-        'records': records,
-        'count': len(records)
-    }
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-
-    print(f'  保存到: {output_file}')
-
-    # 统计关联率
-    matched_count = sum(1 for r in records if r.get('deptLevel1'))
-    if records:
-        match_rate = matched_count / len(records) * 100
-        print(f'  部门关联率: {matched_count}/{len(records)} ({match_rate:.1f}%)')
+    # 保存未关联部门的记录，再按花名册关联部门写入分片
+    save_travel_shard(
+        'ctrip', '携程商旅', month, filepath.name, records, output_dir, roster_index_path, report
+    )
 
     return month
 
@@ -418,6 +513,8 @@ if __name__ == '__main__':
     parser.add_argument('input', help='输入的Excel文件路径')
     parser.add_argument('-o', '--output', default='data/processed', help='输出目录')
     parser.add_argument('-r', '--roster', default='data/processed/roster_index.json', help='花名册索引文件')
+    parser.add_argument('--stream', action='store_true', help='流式读取（超大文件使用，内存占用恒定）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用工作表缓存，每次都重新解析Excel')
 
     args = parser.parse_args()
 
@@ -425,4 +522,6 @@ if __name__ == '__main__':
     output_dir = Path(args.output)
     roster_index_path = Path(args.roster)
 
-    process_ctrip(input_path, output_dir / 'by-month', roster_index_path)
+    cache = None if args.no_cache else SheetCache(sheet_cache_dir(output_dir))
+
+    process_ctrip(input_path, output_dir / 'by-month', roster_index_path, stream=args.stream, cache=cache)
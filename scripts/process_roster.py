@@ -6,39 +6,121 @@
 """
 
 import sys
-import json
+import time
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # 添加父目录到路径以导入utils
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import extract_roster_month
+from utils import extract_roster_month, FileReport, RosterStore, RosterTimeline, set_json_pretty, json_io_stats
 
 
-def process_roster_file(filepath: Path) -> List[Dict]:
+# 花名册字段：(记录字段, Excel列名, 空值是否转为空字符串)
+# 空值不转换的字段与原逐行写法一致，空值会变成文本 'nan'
+ROSTER_FIELDS = [
+    ('name', '姓名', False),
+    ('englishName', '英文名', True),
+    ('deptLevel1', '一级部门', False),
+    ('deptLevel2', '二级部门', True),
+    ('deptLevel3', '三级部门', True),
+    ('position', '岗位', True),
+    ('status', '在职状态', False)
+]
+
+# 员工索引中保存的字段
+INDEX_FIELDS = ['deptLevel1', 'deptLevel2', 'deptLevel3', 'position', 'status', 'englishName']
+
+# 常见的在职状态值: 在职, 试用期, 正式, 等
+ACTIVE_STATUSES = ['在职', '试用期', '正式', '实习', 'contractor']
+
+# 进程内花名册缓存：(索引文件路径, 类型) -> (文件指纹, 时间线)
+# 一次运行中花名册JSON只解析一次，文件变化（指纹不同）时重新读取
+_ROSTER_CACHE: Dict[Tuple[str, str], Tuple[Tuple, Any]] = {}
+
+
+def stripped_text(df: pd.DataFrame, column_name: str, blank_missing: bool) -> List[str]:
+    """
+    按列名获取去除首尾空白的文本列
+
+    等价于逐行的 str(row.get(列名, '')).strip()；
+    blank_missing 为True时等价于 str(...).strip() if pd.notna(...) else ''
+
+    Args:
+        df: 数据表
+        column_name: 列名
+        blank_missing: 空值是否转为空字符串
+
+    Returns:
+        文本列表
+    """
+    if column_name not in df.columns:
+        return [''] * len(df)
+
+    column = df[column_name]
+    values = column.to_numpy(dtype=object)
+    if not blank_missing:
+        return [str(value).strip() for value in values]
+
+    present = column.notna().to_numpy()
+    return [str(value).strip() if ok else '' for value, ok in zip(values, present)]
+
+
+def clean_roster(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    过滤在职员工并按列清洗字段
+
+    Args:
+        df: 花名册原始数据（列名已去除空白）
+
+    Returns:
+        员工记录表，列为 ROSTER_FIELDS 中的记录字段，只保留有姓名的记录
+    """
+    status = df['在职状态']
+    df_active = df[status.isin(ACTIVE_STATUSES) | status.str.contains('在职', na=False)]
+
+    roster = pd.DataFrame(
+        {field: stripped_text(df_active, column_name, blank_missing)
+         for field, column_name, blank_missing in ROSTER_FIELDS},
+        dtype=object
+    )
+
+    # 只保留有姓名的记录
+    names = roster['name']
+    return roster[(names != '') & (names != 'nan')].reset_index(drop=True)
+
+
+def process_roster_file(filepath: Path, report: Optional[FileReport] = None) -> pd.DataFrame:
     """
     处理单个花名册文件
 
     Args:
         filepath: 花名册Excel文件路径
+        report: 文件运行统计，记录工作表的读取耗时和行数
 
     Returns:
-        员工记录列表
+        在职员工记录表（见 clean_roster），失败时为空表
     """
+    empty = pd.DataFrame(columns=[field for field, _, _ in ROSTER_FIELDS], dtype=object)
+
     # 读取"原表"工作表
+    read_start = time.perf_counter()
+    sheet_name = '原表'
     try:
-        df = pd.read_excel(filepath, sheet_name='原表')
+        df = pd.read_excel(filepath, sheet_name=sheet_name)
     except Exception as e:
         print(f'错误: 无法读取工作表"原表": {e}')
         # 尝试读取第一个工作表
         try:
-            df = pd.read_excel(filepath, sheet_name=0)
+            sheet_name = 0
+            df = pd.read_excel(filepath, sheet_name=sheet_name)
             print(f'警告: 使用第一个工作表代替"原表"')
         except Exception as e2:
             print(f'错误: 无法读取Excel文件: {e2}')
-            return []
+            return empty
+
+    if report is not None:
+        report.add_sheet(str(sheet_name), time.perf_counter() - read_start, len(df))
 
     # 标准化列名
     df.columns = df.columns.str.strip()
@@ -50,64 +132,40 @@ def process_roster_file(filepath: Path) -> List[Dict]:
     if missing_columns:
         print(f'警告: 缺少必需的列: {missing_columns}')
         print(f'可用的列: {list(df.columns)}')
-        return []
-
-    # 过滤在职员工
-    # 常见的在职状态值: 在职, 试用期, 正式, 等
-    active_statuses = ['在职', '试用期', '正式', '实习', 'contractor']
-    df_active = df[df['在职状态'].isin(active_statuses) | df['在职状态'].str.contains('在职', na=False)]
+        return empty
 
-    if len(df_active) == 0:
+    roster = clean_roster(df)
+    if len(roster) == 0:
         print('警告: 没有找到在职员工')
-        return []
+        return empty
 
-    # 提取字段
-    records = []
-    for _, row in df_active.iterrows():
-        record = {
-            'name': str(row.get('姓名', '')).strip(),
-            'englishName': str(row.get('英文名', '')).strip() if pd.notna(row.get('英文名')) else '',
-            'deptLevel1': str(row.get('一级部门', '')).strip(),
-            'deptLevel2': str(row.get('二级部门', '')).strip() if pd.notna(row.get('二级部门')) else '',
-            'deptLevel3': str(row.get('三级部门', '')).strip() if pd.notna(row.get('三级部门')) else '',
-            'position': str(row.get('岗位', '')).strip() if pd.notna(row.get('岗位')) else '',
-            'status': str(row.get('在职状态', '')).strip()
-        }
+    return roster
 
-        # 只保留有姓名的记录
-        if record['name'] and record['name'] != 'nan':
-            records.append(record)
 
-    return records
-
-
-def build_employee_index(records: List[Dict]) -> Dict[str, Dict]:
+def build_employee_index(roster: pd.DataFrame) -> Dict[str, Dict]:
     """
     构建员工索引
 
+    同名员工以后出现的记录为准（键的顺序按首次出现）。
+
     Args:
-        records: 员工记录列表
+        roster: 员工记录表
 
     Returns:
         员工索引字典 {姓名: 部门信息}
     """
-    index = {}
-    for record in records:
-        name = record['name']
-        index[name] = {
-            'deptLevel1': record['deptLevel1'],
-            'deptLevel2': record['deptLevel2'],
-            'deptLevel3': record['deptLevel3'],
-            'position': record['position'],
-            'status': record['status']
-        }
-    return index
+    columns = [roster[field].tolist() for field in INDEX_FIELDS]
+    return dict(zip(
+        roster['name'].tolist(),
+        (dict(zip(INDEX_FIELDS, values)) for values in zip(*columns))
+    ))
 
 
 def process_roster(
     filepath: Path,
     output_dir: Path,
-    roster_index_path: Path
+    roster_index_path: Path,
+    report: Optional[FileReport] = None
 ) -> Optional[str]:
     """
     处理花名册文件并保存结果
@@ -116,6 +174,7 @@ def process_roster(
         filepath: 花名册Excel文件路径
         output_dir: 输出目录
         roster_index_path: 花名册索引文件路径
+        report: 文件运行统计，为None时不统计
 
     Returns:
         处理的月份 (YYYY-MM格式)，如果失败返回None
@@ -129,129 +188,118 @@ def process_roster(
         return None
 
     # 处理花名册
-    records = process_roster_file(filepath)
-    if not records:
+    roster = process_roster_file(filepath, report)
+    if report is not None:
+        report.rows_out = len(roster)
+    if len(roster) == 0:
         print(f'警告: 花名册没有有效记录: {filepath.name}')
         return month
 
-    print(f'  提取了 {len(records)} 条在职员工记录')
+    print(f'  提取了 {len(roster)} 条在职员工记录')
 
     # 构建员工索引
-    employee_index = build_employee_index(records)
-
-    # 保存按月分片的数据
-    output_dir.mkdir(parents=True, exist_ok=True)
-    month_file = output_dir / f'{month}.json'
+    employee_index = build_employee_index(roster)
 
-    month_data = {
-        'month': month,
-        'rosterFile': filepath.name,
-        'processedAt': datetime.now().isoformat(),
-        'employees': employee_index,
-        'count': len(employee_index)
-    }
+    # 保存当月员工索引并更新月份清单
+    store = RosterStore(roster_index_path, output_dir)
+    month_file = store.save_month(month, filepath.name, employee_index)
 
-    with open(month_file, 'w', encoding='utf-8') as f:
-        json.dump(month_data, f, ensure_ascii=False, indent=2)
+    clear_roster_cache()
 
     print(f'  保存到: {month_file}')
-
-    # 更新花名册索引
-    update_roster_index(roster_index_path, month, filepath.name, employee_index)
+    print(f'  更新索引: {roster_index_path}')
 
     return month
 
 
-def update_roster_index(
-    index_path: Path,
-    month: str,
-    filename: str,
-    employee_index: Dict[str, Dict]
-):
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    """文件指纹（修改时间, 大小），文件不存在时为None"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _index_fingerprint(store: RosterStore) -> Tuple:
+    """
+    缓存数据所依赖文件的指纹
+
+    时间线依赖月份清单和各月文件所在目录
+    （月份文件都是原子替换写入，写入时目录的修改时间会变化）。
+    """
+    return _stat_key(store.index_path), _stat_key(store.months_dir)
+
+
+def _load_cached(roster_index_path: Path, kind: str, loader: Callable[[RosterStore], Any]):
     """
-    更新花名册索引
+    从进程内缓存读取花名册数据，缓存不存在或文件已变化时用 loader 重新加载
 
     Args:
-        index_path: 索引文件路径
-        month: 月份
-        filename: 文件名
-        employee_index: 员工索引
+        roster_index_path: 花名册索引文件路径
+        kind: 数据类型（'timeline' 时间线）
+        loader: 由 RosterStore 加载数据的函数
     """
-    # 读取现有索引
-    index = {}
-    if index_path.exists():
-        try:
-            with open(index_path, 'r', encoding='utf-8') as f:
-                index = json.load(f)
-        except Exception as e:
-            print(f'警告: 无法读取现有索引，将创建新索引: {e}')
-
-    # 更新月份信息
-    if 'months' not in index:
-        index['months'] = {}
-
-    index['months'][month] = {
-        'file': filename,
-        'processedAt': datetime.now().isoformat(),
-        'count': len(employee_index)
-    }
-
-    # 更新全局员工索引
-    if 'allEmployees' not in index:
-        index['allEmployees'] = {}
-
-    for name, info in employee_index.items():
-        if name not in index['allEmployees']:
-            index['allEmployees'][name] = {
-                'deptLevel1': info['deptLevel1'],
-                'deptLevel2': info['deptLevel2'],
-                'deptLevel3': info['deptLevel3'],
-                'latestRecord': month
-            }
-        else:
-            # 更新最新记录
-            if month >= index['allEmployees'][name].get('latestRecord', ''):
-                index['allEmployees'][name]['latestRecord'] = month
-                # 也更新部门信息（可能发生调岗）
-                index['allEmployees'][name]['deptLevel1'] = info['deptLevel1']
-                index['allEmployees'][name]['deptLevel2'] = info['deptLevel2']
-                index['allEmployees'][name]['deptLevel3'] = info['deptLevel3']
-
-    # 保存索引
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(index_path, 'w', encoding='utf-8') as f:
-        json.dump(index, f, ensure_ascii=False, indent=2)
-
-    print(f'  更新索引: {index_path}')
-
-
-def load_employee_index(roster_index_path: Path, month: Optional[str] = None) -> Dict[str, Dict]:
+    store = RosterStore(roster_index_path)
+    key = (str(roster_index_path.resolve()), kind)
+    fingerprint = _index_fingerprint(store)
+    cached = _ROSTER_CACHE.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    value = loader(store)
+    _ROSTER_CACHE[key] = (fingerprint, value)
+    return value
+
+
+def load_roster_timeline(roster_index_path: Path) -> RosterTimeline:
+    """
+    加载由所有花名册月份构建的员工部门时间线
+
+    结果缓存在进程内，文件未变化时直接返回缓存；返回的时间线由所有调用方共享，只能读取，不能修改。
+
+    Args:
+        roster_index_path: 花名册索引文件路径
+
+    Returns:
+        花名册时间线，没有花名册时为空
+    """
+    if not roster_index_path.exists():
+        return RosterTimeline({}, [])
+    return _load_cached(roster_index_path, 'timeline', RosterTimeline.from_store)
+
+
+def clear_roster_cache():
+    """清空进程内花名册缓存（写入新的花名册月份后调用）"""
+    _ROSTER_CACHE.clear()
+
+
+def roster_cache_snapshot(roster_index_path: Path) -> Dict[Tuple[str, str], Tuple[Tuple, Any]]:
     """
-    加载员工索引
+    预先加载花名册时间线，供工作进程使用（见 prime_roster_cache）
 
     Args:
         roster_index_path: 花名册索引文件路径
-        month: 指定月份，如果为None则使用最新月份
 
     Returns:
-        员工索引字典
+        可直接放入缓存的 {(索引文件路径, 类型): (文件指纹, 数据)}
     """
     if not roster_index_path.exists():
         return {}
 
-    with open(roster_index_path, 'r', encoding='utf-8') as f:
-        index = json.load(f)
+    load_roster_timeline(roster_index_path)
 
-    # 如果指定了月份，从月度文件加载
-    if month:
-        month_file = roster_index_path.parent / 'by-month' / f'{month}.json'
-        if month_file.exists():
-            with open(month_file, 'r', encoding='utf-8') as f:
-                month_data = json.load(f)
-            return month_data.get('employees', {})
+    prefix = str(roster_index_path.resolve())
+    return {key: value for key, value in _ROSTER_CACHE.items() if key[0] == prefix}
 
-    # 否则返回全局索引
-    return index.get('allEmployees', {})
+
+def prime_roster_cache(snapshot: Dict[Tuple[str, str], Tuple[Tuple, Any]]):
+    """
+    用主进程预先加载的花名册数据填充缓存（作为进程池的 initializer）
+
+    工作进程中的指纹检查照常进行，花名册文件在此之后有变化时仍会重新读取。
+    """
+    _ROSTER_CACHE.update(snapshot)
 
 
 if __name__ == '__main__':
@@ -260,11 +308,14 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='处理花名册文件')
     parser.add_argument('input', help='输入的Excel文件路径')
     parser.add_argument('-o', '--output', default='data/processed', help='输出目录')
+    parser.add_argument('--pretty', action='store_true', help='输出缩进格式的JSON（便于调试）')
 
     args = parser.parse_args()
+    set_json_pretty(args.pretty)
 
     input_path = Path(args.input)
     output_dir = Path(args.output)
     roster_index_path = output_dir / 'roster_index.json'
 
     process_roster(input_path, output_dir / 'by-month', roster_index_path)
+    json_io_stats().print_summary()
@@ -3,18 +3,25 @@
 在途商旅数据处理脚本
 
 读取在途商旅.xls文件，提取各类差旅数据。
+部门字段（deptLevel1/deptLevel2）提取时留空占位，保存分片时按花名册统一关联（见 enrich_data）。
 """
 
 import sys
-import json
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Optional
-from datetime import datetime
 
 # 添加父目录到路径以导入utils
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import TravelFileInfo, load_employee_index
+from enrich_data import save_travel_shard
+from utils import (
+    TravelFileInfo,
+    CachedWorkbook,
+    FileReport,
+    SheetCache,
+    sheet_cache_dir,
+    read_sheet
+)
 
 
 # 在途工作表名称映射（可能需要根据实际文件调整）
@@ -26,33 +33,35 @@ ZAITU_SHEET_MAPPING = {
 }
 
 
-def find_zaitu_worksheet(df_dict: Dict[str, pd.DataFrame], sheet_type: str) -> Optional[pd.DataFrame]:
+def find_zaitu_sheet_name(sheet_names: List[str], sheet_type: str) -> Optional[str]:
     """
-    根据类型查找在途工作表
+    根据类型查找在途工作表名称（只看工作表名称列表，不读取数据）
+
+    先精确匹配，再模糊匹配（名称互相包含）
 
     Args:
-        df_dict: 所有工作表的字典
+        sheet_names: 工作簿中的工作表名称列表
         sheet_type: 工作表类型
 
     Returns:
-        找到的DataFrame，如果没找到返回None
+        找到的工作表名称，如果没找到返回None
     """
     possible_names = ZAITU_SHEET_MAPPING.get(sheet_type, [])
 
     for name in possible_names:
-        if name in df_dict:
-            return df_dict[name]
+        if name in sheet_names:
+            return name
 
     # 模糊匹配
-    for key, df in df_dict.items():
+    for key in sheet_names:
         for pattern in possible_names:
             if pattern in key or key in pattern:
-                return df
+                return key
 
     return None
 
 
-def extract_zaitu_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_zaitu_flight_record(row: pd.Series) -> Optional[Dict]:
     """
     提取在途机票记录
 
@@ -85,7 +94,6 @@ def extract_zaitu_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -
     if passenger.isdigit():
         return None
 
-    dept_info = roster_index.get(passenger, {})
 
     # 起飞时间（索引13）
     depart_time = str(row.iloc[13]) if len(row) > 13 and pd.notna(row.iloc[13]) else ''
@@ -120,8 +128,8 @@ def extract_zaitu_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -
         'source': '在途商旅',
         'type': 'flight',
         'passenger': passenger,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
+        'deptLevel1': '',
+        'deptLevel2': '',
         'bookTime': str(row.iloc[5]) if len(row) > 5 and pd.notna(row.iloc[5]) else '',
         'flightNo': flight_no,
         'departTime': depart_time,
@@ -139,7 +147,7 @@ def extract_zaitu_flight_record(row: pd.Series, roster_index: Dict[str, Dict]) -
     return record
 
 
-def extract_zaitu_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_zaitu_hotel_record(row: pd.Series) -> Optional[Dict]:
     """
     提取在途酒店记录
 
@@ -158,7 +166,6 @@ def extract_zaitu_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
         return None
 
     employee = str(employee).strip()
-    dept_info = roster_index.get(employee, {})
 
     # 正确的金额是"总额"（索引16）或"合计"（索引19）
     price = 0
@@ -177,8 +184,8 @@ def extract_zaitu_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
         'source': '在途商旅',
         'type': 'hotel',
         'employee': employee,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
+        'deptLevel1': '',
+        'deptLevel2': '',
         'checkInTime': str(row.iloc[10]) if len(row) > 10 and pd.notna(row.iloc[10]) else '',
         'checkOutTime': str(row.iloc[11]) if len(row) > 11 and pd.notna(row.iloc[11]) else '',
         'city': str(row.iloc[7]) if len(row) > 7 and pd.notna(row.iloc[7]) else '',
@@ -198,7 +205,7 @@ def extract_zaitu_hotel_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
     return record
 
 
-def extract_zaitu_train_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_zaitu_train_record(row: pd.Series) -> Optional[Dict]:
     """
     提取在途火车记录
 
@@ -218,7 +225,6 @@ def extract_zaitu_train_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
         return None
 
     employee = str(employee).strip()
-    dept_info = roster_index.get(employee, {})
 
     # 正确的金额是"小计"（索引24）或"合计"（索引26）
     price = 0
@@ -241,8 +247,8 @@ def extract_zaitu_train_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
         'source': '在途商旅',
         'type': 'train',
         'employee': employee,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
+        'deptLevel1': '',
+        'deptLevel2': '',
         'trainNo': str(row.iloc[7]) if len(row) > 7 and pd.notna(row.iloc[7]) else '',
         'seat': str(row.iloc[8]) if len(row) > 8 and pd.notna(row.iloc[8]) else '',
         'departTime': str(row.iloc[11]) if len(row) > 11 and pd.notna(row.iloc[11]) else '',
@@ -258,7 +264,7 @@ def extract_zaitu_train_record(row: pd.Series, roster_index: Dict[str, Dict]) ->
     return record
 
 
-def extract_zaitu_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> Optional[Dict]:
+def extract_zaitu_car_record(row: pd.Series) -> Optional[Dict]:
     """
     提取在途用车记录
 
@@ -270,7 +276,6 @@ def extract_zaitu_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> O
         return None
 
     passenger = str(passenger).strip()
-    dept_info = roster_index.get(passenger, {})
 
     # 用索引获取的关键字段
     # 服务方（索引19）
@@ -307,8 +312,8 @@ def extract_zaitu_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> O
         'source': '在途商旅',
         'type': 'car',
         'passenger': passenger,
-        'deptLevel1': dept_info.get('deptLevel1', ''),
-        'deptLevel2': dept_info.get('deptLevel2', ''),
+        'deptLevel1': '',
+        'deptLevel2': '',
         'pickupTime': pickup_time,
         'dropoffTime': dropoff_time,
         'carType': str(row.get('用车类型', '') or row.get('车型', '')).strip() if pd.notna(row.get('用车类型') or row.get('车型')) else '',
@@ -351,78 +356,92 @@ def extract_zaitu_car_record(row: pd.Series, roster_index: Dict[str, Dict]) -> O
     return record
 
 
+# 各类型工作表对应的提取函数
+ZAITU_SHEET_EXTRACTORS = [
+    ('flight', '机票', extract_zaitu_flight_record),
+    ('hotel', '酒店', extract_zaitu_hotel_record),
+    ('train', '火车', extract_zaitu_train_record),
+    ('car', '用车', extract_zaitu_car_record)
+]
+
+# 各类型工作表提取时用到的列位置，读取时只解析这些列
+# 用车按列名取值，需要完整读取（None）
+# 修改提取函数的取值位置时需要同步修改这里
+ZAITU_SHEET_COLUMNS = {
+    'flight': [1, 5, 6, 7, 8, 9, 13, 15, 17, 31, 33],
+    'hotel': [1, 6, 7, 8, 9, 10, 11, 13, 16, 19],
+    'train': [1, 6, 7, 8, 9, 10, 11, 19, 24, 26],
+    'car': None
+}
+
+
+def open_zaitu_workbook(filepath: Path) -> pd.ExcelFile:
+    """
+    打开在途商旅工作簿
+
+    在途文件可能是.xls格式，优先使用xlrd引擎，失败时回退到默认引擎（openpyxl）。
+    xlrd 以按需加载模式打开：只解码实际读取的工作表，用完可通过
+    CachedWorkbook.release_sheet 卸载。
+
+    Args:
+        filepath: Excel文件路径
+
+    Returns:
+        打开的工作簿
+    """
+    try:
+        import xlrd
+        book = xlrd.open_workbook(str(filepath), on_demand=True)
+        return pd.ExcelFile(book, engine='xlrd')
+    except Exception:
+        return pd.ExcelFile(filepath)
+
+
 def process_zaitu_file(
     filepath: Path,
-    roster_index: Dict[str, Dict]
-) -> List[Dict]:
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
+) -> Optional[List[Dict]]:
     """
     处理在途商旅Excel文件
 
     Args:
         filepath: Excel文件路径
-        roster_index: 员工索引
+        cache: 工作表缓存，为None时不使用缓存
+        report: 文件运行统计，记录各工作表的耗时和行数
 
     Returns:
-        处理后的记录列表
+        处理后的记录列表，无法读取Excel文件时返回None
     """
     print(f'\n处理在途商旅文件: {filepath.name}')
 
     all_records = []
 
     try:
-        # 在途文件可能是.xls格式，使用xlrd引擎
-        try:
-            # 读取所有工作表
-            excel_file = pd.ExcelFile(filepath, engine='xlrd')
-        except Exception:
-            # 如果xlrd失败，尝试openpyxl
-            excel_file = pd.ExcelFile(filepath)
-
-        sheet_dict = {name: pd.read_excel(filepath, sheet_name=name, engine='xlrd' if filepath.suffix == '.xls' else None)
-                     for name in excel_file.sheet_names}
-
-        # 处理机票
-        flight_df = find_zaitu_worksheet(sheet_dict, 'flight')
-        if flight_df is not None:
-            print(f'  处理机票数据: {len(flight_df)} 条')
-            for _, row in flight_df.iterrows():
-                record = extract_zaitu_flight_record(row, roster_index)
-                if record:
-                    all_records.append(record)
-
-        # 处理酒店
-        hotel_df = find_zaitu_worksheet(sheet_dict, 'hotel')
-        if hotel_df is not None:
-            print(f'  处理酒店数据: {len(hotel_df)} 条')
-            for _, row in hotel_df.iterrows():
-                record = extract_zaitu_hotel_record(row, roster_index)
-                if record:
-                    all_records.append(record)
-
-        # 处理火车
-        train_df = find_zaitu_worksheet(sheet_dict, 'train')
-        if train_df is not None:
-            print(f'  处理火车数据: {len(train_df)} 条')
-            for _, row in train_df.iterrows():
-                record = extract_zaitu_train_record(row, roster_index)
-                if record:
-                    all_records.append(record)
-
-        # 处理用车
-        car_df = find_zaitu_worksheet(sheet_dict, 'car')
-        if car_df is not None:
-            print(f'  处理用车数据: {len(car_df)} 条')
-            for _, row in car_df.iterrows():
-                record = extract_zaitu_car_record(row, roster_index)
-                if record:
-                    all_records.append(record)
+        # 打开工作簿（命中缓存时不解析），具体工作表按需读取
+        with CachedWorkbook(filepath, cache, opener=open_zaitu_workbook, report=report) as excel_file:
+            # 只按工作表名称列表匹配，需要的工作表才读取，提取完立即释放
+            for sheet_type, label, extract_record in ZAITU_SHEET_EXTRACTORS:
+                sheet_name = find_zaitu_sheet_name(excel_file.sheet_names, sheet_type)
+                if sheet_name is None:
+                    continue
+
+                df = read_sheet(excel_file, sheet_name, ZAITU_SHEET_COLUMNS[sheet_type])
+                print(f'  处理{label}数据: {len(df)} 条')
+                for _, row in df.iterrows():
+                    record = extract_record(row)
+                    if record:
+                        all_records.append(record)
+                del df
+                excel_file.release_sheet(sheet_name)
 
     except Exception as e:
         print(f'  错误: 无法读取Excel文件: {e}')
         import traceback
         traceback.print_exc()
-        return []
+        return None
 
+    excel_file.print_timing()
     print(f'  总共提取 {len(all_records)} 条记录')
 
     return all_records
@@ -432,7 +451,9 @@ def process_zaitu(
     filepath: Path,
     output_dir: Path,
     roster_index_path: Path,
-    file_info: Optional[TravelFileInfo] = None
+    file_info: Optional[TravelFileInfo] = None,
+    cache: Optional[SheetCache] = None,
+    report: Optional[FileReport] = None
 ) -> Optional[str]:
     """
     处理在途商旅文件并保存结果
@@ -442,6 +463,8 @@ def process_zaitu(
         output_dir: 输出目录
         roster_index_path: 花名册索引文件路径
         file_info: 文件信息（如果已有）
+        cache: 工作表缓存，为None时不使用缓存
+        report: 文件运行统计，为None时不统计
 
     Returns:
         处理的月份 (YYYY-MM格式)，如果失败返回None
@@ -461,41 +484,20 @@ def process_zaitu(
         print(f'警告: 无法确定文件 {filepath.name} 的归属月份')
         return None
 
-    # 加载员工索引
-    roster_index = load_employee_index(roster_index_path, month)
-
-    if not roster_index:
-        print(f'警告: 未找到月份 {month} 的花名册数据')
-
-    # 处理文件
-    records = process_zaitu_file(filepath, roster_index)
+    # 处理文件（部门信息在保存时统一关联）
+    records = process_zaitu_file(filepath, cache=cache, report=report)
+    if records is None:
+        return None
+    if report is not None:
+        report.rows_out = len(records)
 
     if not records:
         return month
 
-    # 保存结果
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / f'zaitu_{month}.json'
-
-    output_data = {
-        'source': '在途商旅',
-        'month': month,
-        'sourceFile': filepath.name,
-        'processedAt': datetime.now().isoformat(),
-        'records': records,
-        'count': len(records)
-    }
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-
-    print(f'  保存到: {output_file}')
-
-    # 统计关联率
-    matched_count = sum(1 for r in records if r.get('deptLevel1'))
-    if records:
-        match_rate = matched_count / len(records) * 100
-        print(f'  部门关联率: {matched_count}/{len(records)} ({match_rate:.1f}%)')
+    # 保存未关联部门的记录，再按花名册关联部门写入分片
+    save_travel_shard(
+        'zaitu', '在途商旅', month, filepath.name, records, output_dir, roster_index_path, report
+    )
 
     return month
 
@@ -507,6 +509,7 @@ if __name__ == '__main__':
     parser.add_argument('input', help='输入的Excel文件路径')
     parser.add_argument('-o', '--output', default='data/processed', help='输出目录')
     parser.add_argument('-r', '--roster', default='data/processed/roster_index.json', help='花名册索引文件')
+    parser.add_argument('--no-cache', action='store_true', help='不使用工作表缓存，每次都重新解析Excel')
 
     args = parser.parse_args()
 
@@ -514,4 +517,6 @@ if __name__ == '__main__':
     output_dir = Path(args.output)
     roster_index_path = Path(args.roster)
 
-    process_zaitu(input_path, output_dir / 'by-month', roster_index_path)
+    cache = None if args.no_cache else SheetCache(sheet_cache_dir(output_dir))
+
+    process_zaitu(input_path, output_dir / 'by-month', roster_index_path, cache=cache)
@@ -5,6 +5,7 @@ from .file_scanner import (
     print_scan_summary,
     get_files_to_process,
     update_processed_metadata,
+    compute_file_hash,
     ScanResult,
     TravelFileInfo,
     RosterFileInfo
@@ -18,11 +19,124 @@ from .date_matcher import (
     extract_date_from_string
 )
 
-# Import load_employee_index from process_roster
+from .column_ops import (
+    text_column,
+    float_column,
+    person_column,
+    invalid_name_mask,
+    order_no_column
+)
+
+from .atomic_file import atomic_write
+
+from .json_io import (
+    json_dumps,
+    json_loads,
+    read_json,
+    write_json,
+    set_json_pretty,
+    is_json_pretty,
+    json_io_stats,
+    JsonIOStats,
+    JSON_BACKEND,
+    JSON_READ,
+    JSON_WRITE
+)
+
+from .roster_store import (
+    RosterStore,
+    ROSTER_INDEX_VERSION
+)
+
+from .name_matcher import (
+    NameMatcher,
+    normalize_name,
+    MATCH_EXACT,
+    MATCH_NORMALIZED,
+    MATCH_ENGLISH,
+    MATCH_NONE,
+    MATCH_LABELS
+)
+
+from .roster_timeline import RosterTimeline
+
+from .shard_io import (
+    open_shard_writer,
+    read_shard_meta,
+    iter_shard_records,
+    list_shards,
+    legacy_shard_path,
+    SHARD_SUFFIX
+)
+
+from .columnar import (
+    ColumnarEncoder,
+    encode_columnar,
+    decode_travel_data,
+    is_columnar,
+    record_count,
+    travel_data_format,
+    COLUMNAR_FORMAT,
+    RECORDS_FORMAT,
+    OUTPUT_FORMATS
+)
+
+from .parquet_export import (
+    ParquetExporter,
+    open_parquet_exporter,
+    records_to_table,
+    PARQUET_AVAILABLE,
+    PARQUET_COLUMNS
+)
+
+from .record_store import (
+    RecordStore,
+    StoreRow,
+    SyncResult,
+    STORE_VERSION
+)
+
+from .manifest import (
+    ProcessingManifest,
+    shard_filename,
+    combine_hashes
+)
+
+from .sheet_cache import (
+    SheetCache,
+    sheet_cache_dir,
+    DEFAULT_CACHE_SIZE
+)
+
+from .run_report import (
+    RunReport,
+    FileReport,
+    peak_rss_mb,
+    RUN_REPORT_FILENAME
+)
+
+from .profiling import (
+    profile_run,
+    profile_dir_for
+)
+
+from .workbook import (
+    CachedWorkbook,
+    read_sheet,
+    print_workbook_timing
+)
+
+from .xlsx_stream import (
+    open_streaming_workbook,
+    iter_sheet_batches,
+    STREAM_BATCH_SIZE
+)
+
+# Import load_roster_timeline from process_roster
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from process_roster import load_employee_index
+from process_roster import load_roster_timeline
 
 __all__ = [
     'scan_excel_files',
@@ -30,6 +144,7 @@ __all__ = [
     'print_scan_summary',
     'get_files_to_process',
     'update_processed_metadata',
+    'compute_file_hash',
     'ScanResult',
     'TravelFileInfo',
     'RosterFileInfo',
@@ -38,5 +153,74 @@ __all__ = [
     'find_matching_roster_file',
     'DateRange',
     'extract_date_from_string',
-    'load_employee_index'
+    'text_column',
+    'float_column',
+    'person_column',
+    'invalid_name_mask',
+    'order_no_column',
+    'atomic_write',
+    'json_dumps',
+    'json_loads',
+    'read_json',
+    'write_json',
+    'set_json_pretty',
+    'is_json_pretty',
+    'json_io_stats',
+    'JsonIOStats',
+    'JSON_BACKEND',
+    'JSON_READ',
+    'JSON_WRITE',
+    'RosterStore',
+    'ROSTER_INDEX_VERSION',
+    'NameMatcher',
+    'normalize_name',
+    'MATCH_EXACT',
+    'MATCH_NORMALIZED',
+    'MATCH_ENGLISH',
+    'MATCH_NONE',
+    'MATCH_LABELS',
+    'RosterTimeline',
+    'open_shard_writer',
+    'read_shard_meta',
+    'iter_shard_records',
+    'list_shards',
+    'legacy_shard_path',
+    'SHARD_SUFFIX',
+    'ColumnarEncoder',
+    'encode_columnar',
+    'decode_travel_data',
+    'is_columnar',
+    'record_count',
+    'travel_data_format',
+    'COLUMNAR_FORMAT',
+    'RECORDS_FORMAT',
+    'OUTPUT_FORMATS',
+    'ParquetExporter',
+    'open_parquet_exporter',
+    'records_to_table',
+    'PARQUET_AVAILABLE',
+    'PARQUET_COLUMNS',
+    'RecordStore',
+    'StoreRow',
+    'SyncResult',
+    'STORE_VERSION',
+    'ProcessingManifest',
+    'shard_filename',
+    'combine_hashes',
+    'SheetCache',
+    'sheet_cache_dir',
+    'DEFAULT_CACHE_SIZE',
+    'RunReport',
+    'FileReport',
+    'peak_rss_mb',
+    'RUN_REPORT_FILENAME',
+    'profile_run',
+    'profile_dir_for',
+    'CachedWorkbook',
+    'read_sheet',
+    'print_workbook_timing',
+    'open_streaming_workbook',
+    'iter_sheet_batches',
+    'STREAM_BATCH_SIZE',
+    'load_roster_timeline'
 ]
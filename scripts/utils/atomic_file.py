@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+原子写入工具模块
+
+先写入同目录下的临时文件，写完后用 os.replace 替换目标文件。
+写入中断（异常、进程被杀）时目标文件保持原样，不会留下写了一半的文件。
+"""
+
+import os
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+
+def _file_mode(path: Path) -> int:
+    """
+    替换后文件的权限
+
+    mkstemp 创建的临时文件权限为 0600，直接替换会让输出文件只有属主可读。
+    目标文件已存在时沿用其权限，否则按当前 umask 使用普通文件的默认权限。
+    """
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path, mode: str = 'w', encoding: Optional[str] = 'utf-8') -> Iterator[IO]:
+    """
+    原子写入文件
+
+    用法:
+        with atomic_write(path) as f:
+            f.write(content)
+
+    临时文件名以 "." 开头，与目标文件在同一目录（保证 os.replace 是原子操作）。
+
+    Args:
+        path: 目标文件路径
+        mode: 打开模式，'w'（文本）或 'wb'（二进制）
+        encoding: 文本模式的编码
+
+    Yields:
+        临时文件对象
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+按列提取工具模块
+
+以整列为单位完成单元格取值、文本化和金额转换，替代逐行 row.iloc[i] 的写法。
+每个函数的取值规则都与对应的逐行写法一致（见各函数说明）。
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# 出行人字段中出现即视为无效行的关键词（小计/合计等汇总行）
+INVALID_NAME_KEYWORDS = ['小计', '合计', '总计', '汇总', '平均值']
+
+
+def positional_frame(df: pd.DataFrame, positions: Sequence[int], width: int) -> pd.DataFrame:
+    """
+    把只读取了部分列的数据表放回原来的列位置
+
+    按列位置取值的提取函数（df.iloc[:, i]、row.iloc[i]、列数检查）可以不做任何修改。
+    列数截到用到的最大位置+1：各提取函数的列数检查阈值就是它用到的最大位置，
+    截断后检查结果与完整读取时相同。未读取的列用不占内存的稀疏空列填充。
+
+    Args:
+        df: 只包含 positions 各列的数据表（列顺序与 positions 相同）
+        positions: 读取的列位置（升序）
+        width: 工作表的列数（已知不小于最大位置+1时可直接传最大位置+1）
+
+    Returns:
+        列名为列位置的数据表
+    """
+    limit = min(width, max(positions) + 1) if len(positions) else 0
+    empty = pd.arrays.SparseArray(np.full(len(df), np.nan))
+
+    columns = {}
+    source = dict(zip(positions, range(df.shape[1])))
+    for position in range(limit):
+        if position in source:
+            columns[position] = df.iloc[:, source[position]]
+        else:
+            columns[position] = empty
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def text_column(df: pd.DataFrame, position: int) -> pd.Series:
+    """
+    按列位置获取文本列
+
+    等价于逐行的 str(row.iloc[i]) if pd.notna(row.iloc[i]) else ''
+
+    Args:
+        df: 数据表
+        position: 列位置
+
+    Returns:
+        文本列（空值为空字符串）
+    """
+    if position >= df.shape[1]:
+        return pd.Series('', index=df.index, dtype=object)
+
+    column = df.iloc[:, position]
+    mask = column.notna().to_numpy()
+    values = column.astype(object).to_numpy()
+    return pd.Series(
+        [str(value) if present else '' for value, present in zip(values, mask)],
+        index=df.index,
+        dtype=object
+    )
+
+
+def float_column(df: pd.DataFrame, position: int) -> List:
+    """
+    按列位置获取金额/数值列
+
+    等价于逐行的 float(row.iloc[i])，空值或无法转换时为 0
+
+    Args:
+        df: 数据表
+        position: 列位置
+
+    Returns:
+        数值列表（Python float，无效值为 int 0）
+    """
+    if position >= df.shape[1]:
+        return [0] * len(df)
+
+    column = df.iloc[:, position]
+
+    # 日期/时长列逐行 float() 必然失败，整列为 0
+    if pd.api.types.is_datetime64_any_dtype(column) or pd.api.types.is_timedelta64_dtype(column):
+        return [0] * len(df)
+
+    numbers = pd.to_numeric(column, errors='coerce').astype(float)
+    values = [0 if number != number else number for number in numbers.tolist()]
+
+    # 少数 to_numeric 无法识别但 float() 可以转换的值（如文本 'nan'），逐个回退
+    leftover = (numbers.isna() & column.notna()).to_numpy().nonzero()[0]
+    if len(leftover):
+        raw = column.to_numpy(dtype=object)
+        for i in leftover:
+            values[i] = _to_float(raw[i])
+
+    return values
+
+
+def _to_float(value) -> float:
+    """单值金额转换，失败时为 0"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def person_column(
+    df: pd.DataFrame,
+    primary: int,
+    fallback: int
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    获取出行人列，主列为空时回退到备用列（如出行人 → 预订人）
+
+    Args:
+        df: 数据表
+        primary: 主列位置
+        fallback: 备用列位置
+
+    Returns:
+        (未去空格的原始文本列, 去空格后的姓名列)，无法取得姓名的行为空字符串
+    """
+    raw_primary = text_column(df, primary)
+    raw_fallback = text_column(df, fallback)
+
+    use_fallback = raw_primary.str.strip() == ''
+    raw = raw_primary.where(~use_fallback, raw_fallback)
+    return raw, raw.str.strip()
+
+
+def invalid_name_mask(names: pd.Series, keywords: List[str] = INVALID_NAME_KEYWORDS) -> pd.Series:
+    """
+    标记无效的出行人姓名
+
+    规则与逐行提取一致：
+    1. 日期格式（以'20'开头或包含两个以上'-'）
+    2. 小计、合计等关键词
+    3. 纯数字
+
+    Args:
+        names: 去空格后的姓名列
+        keywords: 无效关键词列表
+
+    Returns:
+        布尔列，True表示无效
+    """
+    return (
+        names.str.startswith('20') |
+        (names.str.count('-') >= 2) |
+        names.isin(keywords) |
+        names.str.isdigit()
+    )
+
+
+def order_no_column(df: pd.DataFrame, position: int) -> pd.Series:
+    """
+    获取订单号列
+
+    数值型订单号去掉小数部分（与逐行的 str(int(x)) 一致），空值为 None
+
+    Args:
+        df: 数据表
+        position: 列位置
+
+    Returns:
+        订单号列（无订单号为 None）
+    """
+    if position >= df.shape[1]:
+        return pd.Series(None, index=df.index, dtype=object)
+
+    column = df.iloc[:, position]
+    mask = column.notna().to_numpy()
+    values = column.astype(object).to_numpy()
+    return pd.Series(
+        [_format_order_no(value) if present else None for value, present in zip(values, mask)],
+        index=df.index,
+        dtype=object
+    )
+
+
+def _format_order_no(value) -> str:
+    """数值型订单号转整数文本"""
+    if isinstance(value, (int, float)):
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+列式数据格式模块
+
+travel-data.json 的紧凑格式（merge_data.py --format columnar）：记录按类型分表，
+每个字段存为一列；重复较多的文本列（数据源、部门、城市、航空公司等）用字典编码，
+只保存一次文本和每行的整数编号。
+
+    {
+      "format": "columnar", "formatVersion": 1,
+      "lastUpdate": ..., "months": [...], "sources": [...],
+      "tables": [
+        {"type": "flight", "count": 2, "fields": ["source", "price", ...],
+         "columns": {"source": {"dict": ["阿里商旅"], "codes": [0, 0]},
+                     "price": {"values": [1200.0, 860.5]}},
+         "absent": {"orderNo": [1]}}
+      ],
+      "order": [0, 0, ...],
+      "summary": {...}, "roster": {...}
+    }
+
+order 为每条记录所在的表（按原记录顺序），absent 列出缺少某字段的行（这些行的列值为null）。
+索引（indexes）可由记录重新计算，列式格式不保存。
+前端由 app.js 的 decodeTravelData 还原为普通格式。
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# travel-data.json 的格式：records（默认，记录列表）或 columnar（列式）
+RECORDS_FORMAT = 'records'
+COLUMNAR_FORMAT = 'columnar'
+OUTPUT_FORMATS = [RECORDS_FORMAT, COLUMNAR_FORMAT]
+COLUMNAR_VERSION = 1
+
+# 列式格式文件的开头（紧凑或缩进格式）
+FORMAT_HEAD_PATTERN = re.compile(r'\{\s*"format"\s*:\s*"%s"' % COLUMNAR_FORMAT)
+
+# 不同取值数不超过非空行数的该比例时，文本列使用字典编码
+DICT_RATIO = 0.5
+
+# 字段缺失占位（区别于值为 null）
+_ABSENT = object()
+
+
+class _Table:
+    """同一类型记录的列（构建中）"""
+
+    def __init__(self, record_type: str):
+        self.type = record_type
+        self.count = 0
+        self.fields: List[str] = []
+        self.columns: Dict[str, List[Any]] = {}
+        # 每列的文本驻留表：相同文本只保留一个对象
+        self.interned: Dict[str, Dict[str, str]] = {}
+
+    def add(self, record: Dict):
+        for field, value in record.items():
+            column = self.columns.get(field)
+            if column is None:
+                self.fields.append(field)
+                column = self.columns[field] = [_ABSENT] * self.count
+                self.interned[field] = {}
+            if isinstance(value, str):
+                value = self.interned[field].setdefault(value, value)
+            column.append(value)
+
+        self.count += 1
+        for column in self.columns.values():
+            if len(column) < self.count:
+                column.append(_ABSENT)
+
+    def to_dict(self) -> Dict:
+        columns = {}
+        absent = {}
+        for field in self.fields:
+            column = self.columns[field]
+            missing = [i for i, value in enumerate(column) if value is _ABSENT]
+            if missing:
+                absent[field] = missing
+            columns[field] = encode_column([None if value is _ABSENT else value for value in column], len(missing))
+
+        table = {
+            'type': self.type,
+            'count': self.count,
+            'fields': self.fields,
+            'columns': columns
+        }
+        if absent:
+            table['absent'] = absent
+        return table
+
+
+def encode_column(values: List[Any], absent_count: int = 0) -> Dict:
+    """
+    编码一列
+
+    Args:
+        values: 列值（缺失行为None）
+        absent_count: 缺失行数
+
+    Returns:
+        {"dict": [...], "codes": [...]}（字典编码）或 {"values": [...]}
+    """
+    present = len(values) - absent_count
+    texts = {}
+    for value in values:
+        if isinstance(value, str):
+            texts.setdefault(value, len(texts))
+        elif value is not None:
+            return {'values': values}
+
+    if present == 0 or len(texts) > present * DICT_RATIO:
+        return {'values': values}
+
+    return {
+        'dict': list(texts),
+        'codes': [None if value is None else texts[value] for value in values]
+    }
+
+
+class ColumnarEncoder:
+    """
+    逐条把记录编码为列式格式
+
+    用法:
+        encoder = ColumnarEncoder()
+        for record in records:
+            encoder.add(record)
+        data = dict(encoder.build(), summary=..., roster=...)
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, _Table] = {}
+        self.table_numbers: Dict[str, int] = {}
+        self.order: List[int] = []
+
+    def add(self, record: Dict):
+        """添加一条记录"""
+        record_type = record.get('type', '')
+        table = self.tables.get(record_type)
+        if table is None:
+            self.table_numbers[record_type] = len(self.tables)
+            table = self.tables[record_type] = _Table(record_type)
+        table.add(record)
+        self.order.append(self.table_numbers[record_type])
+
+    def build(self) -> Dict:
+        """
+        Returns:
+            {format, formatVersion, tables, order}
+        """
+        return {
+            'format': COLUMNAR_FORMAT,
+            'formatVersion': COLUMNAR_VERSION,
+            'tables': [table.to_dict() for table in self.tables.values()],
+            'order': self.order
+        }
+
+
+def encode_columnar(records: Iterable[Dict]) -> Dict:
+    """把记录列表编码为列式格式（不含摘要等其他字段）"""
+    encoder = ColumnarEncoder()
+    for record in records:
+        encoder.add(record)
+    return encoder.build()
+
+
+def is_columnar(data: Dict) -> bool:
+    """是否为列式格式的数据"""
+    return data.get('format') == COLUMNAR_FORMAT
+
+
+def record_count(data: Dict) -> int:
+    """travel-data.json 中的记录数（两种格式通用）"""
+    if is_columnar(data):
+        return len(data['order'])
+    return len(data.get('records', []))
+
+
+def travel_data_format(path: Path) -> str:
+    """
+    已生成的 travel-data.json 的格式（只读文件开头：列式格式的第一个字段是 format）
+
+    Args:
+        path: 数据文件路径
+
+    Returns:
+        'columnar' 或 'records'
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(64)
+    if FORMAT_HEAD_PATTERN.match(head):
+        return COLUMNAR_FORMAT
+    return RECORDS_FORMAT
+
+
+def decode_records(data: Dict) -> List[Dict]:
+    """
+    从列式格式还原记录列表（与 app.js 的 decodeTravelData 一致）
+
+    Args:
+        data: 列式格式的数据
+
+    Returns:
+        记录列表（按原记录顺序）
+    """
+    tables = []
+    for table in data['tables']:
+        rows = [{} for _ in range(table['count'])]
+        absent = table.get('absent', {})
+        for field in table['fields']:
+            column = table['columns'][field]
+            missing = set(absent.get(field, ()))
+            if 'dict' in column:
+                dictionary = column['dict']
+                values = (None if code is None else dictionary[code] for code in column['codes'])
+            else:
+                values = column['values']
+            for i, (row, value) in enumerate(zip(rows, values)):
+                if i not in missing:
+                    row[field] = value
+        tables.append(iter(rows))
+
+    return [next(tables[number]) for number in data['order']]
+
+
+def decode_travel_data(data: Dict) -> Dict:
+    """
+    把 travel-data.json 还原为普通格式（有 records 列表）；普通格式原样返回
+
+    Args:
+        data: 读取的 travel-data.json
+
+    Returns:
+        普通格式的数据
+    """
+    if not is_columnar(data):
+        return data
+
+    decoded = {key: value for key, value in data.items()
+               if key not in ('format', 'formatVersion', 'tables', 'order')}
+    decoded['records'] = decode_records(data)
+    return decoded
@@ -6,6 +6,7 @@
 """
 
 import os
+import hashlib
 from pathlib import Path
 from typing import Dict, List, Optional, NamedTuple
 from dataclasses import dataclass, field
@@ -78,6 +79,9 @@ def scan_excel_files(directory: Path) -> List[Path]:
         return files
 
     for filepath in directory.iterdir():
+        # 跳过Excel打开文件时生成的锁文件（~$开头）
+        if filepath.name.startswith('~$'):
+            continue
         if filepath.is_file() and filepath.suffix.lower() in excel_extensions:
             files.append(filepath)
 
@@ -211,6 +215,26 @@ def print_scan_summary(result: ScanResult):
     print('\n' + '=' * 70)
 
 
+def compute_file_hash(filepath: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容的SHA-256哈希
+
+    只与文件内容有关，复制、改名、修改时间变化都不影响结果。
+
+    Args:
+        filepath: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        十六进制哈希字符串
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def get_files_to_process(
     raw_dir: Path,
     processed_dir: Path,
@@ -219,7 +243,7 @@ def get_files_to_process(
     """
     获取需要处理的文件列表
 
-    根据文件的修改时间和已处理记录，判断哪些文件需要重新处理
+    根据文件内容哈希与处理清单（.processed.json）的记录，判断哪些文件需要重新处理
 
     Args:
         raw_dir: 原始文件目录
@@ -232,27 +256,14 @@ def get_files_to_process(
     if force:
         return scan_excel_files(raw_dir)
 
-    # 检查原始文件的修改时间
-    files_to_process = []
-    raw_files = scan_excel_files(raw_dir)
-
-    # 获取已处理文件的元数据（如果存在）
-    processed_metadata = processed_dir / '.processed.json'
-    processed_times = {}
-
-    if processed_metadata.exists():
-        import json
-        try:
-            with open(processed_metadata, 'r', encoding='utf-8') as f:
-                processed_times = json.load(f)
-        except Exception:
-            pass
+    from .manifest import ProcessingManifest
 
-    for raw_file in raw_files:
-        raw_mtime = raw_file.stat().st_mtime
-        processed_mtime = processed_times.get(raw_file.name, 0)
+    manifest = ProcessingManifest.load(processed_dir)
+    files_to_process = []
 
-        if raw_mtime > processed_mtime:
+    for raw_file in scan_excel_files(raw_dir):
+        entry = manifest.files.get(raw_file.name)
+        if not entry or entry.get('hash') != manifest.file_hash(raw_file):
             files_to_process.append(raw_file)
 
     return files_to_process
@@ -262,22 +273,31 @@ def update_processed_metadata(raw_dir: Path, processed_dir: Path):
     """
     更新已处理文件的元数据
 
+    刷新处理清单中各原始文件的内容哈希，保留已记录的输出文件信息
+
     Args:
         raw_dir: 原始文件目录
         processed_dir: 处理后文件目录
     """
-    import json
-    from datetime import datetime
+    from .manifest import ProcessingManifest
 
+    manifest = ProcessingManifest.load(processed_dir)
     raw_files = scan_excel_files(raw_dir)
-    processed_times = {}
 
     for raw_file in raw_files:
-        processed_times[raw_file.name] = raw_file.stat().st_mtime
-
-    metadata_path = processed_dir / '.processed.json'
-    with open(metadata_path, 'w', encoding='utf-8') as f:
-        json.dump(processed_times, f, indent=2)
+        entry = manifest.files.get(raw_file.name, {})
+        file_hash = manifest.file_hash(raw_file)
+        # 内容变化后，原来的输出不再对应当前文件
+        outputs = entry.get('outputs', []) if entry.get('hash') == file_hash else []
+        manifest.record_file(
+            raw_file,
+            file_hash,
+            entry.get('source') or classify_file(raw_file.name),
+            outputs
+        )
+
+    manifest.forget_missing_files([raw_file.name for raw_file in raw_files])
+    manifest.save()
 
 
 if __name__ == '__main__':
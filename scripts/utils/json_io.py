@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+JSON读写模块
+
+所有处理脚本读写JSON（花名册、分片、处理清单、travel-data.json）都经过这里：
+  - 安装了 orjson 时使用 orjson（编码约快10倍），否则使用标准库 json，输出内容相同
+  - 默认写成紧凑格式；调试时用 --pretty（set_json_pretty(True)）写成2空格缩进
+  - 记录每个文件读写的字节数和耗时（json_io_stats()），运行统计中按文件汇总
+"""
+
+import json
+import time
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .atomic_file import atomic_write
+
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+JSON_READ = 'read'
+JSON_WRITE = 'write'
+
+_pretty = False
+
+
+def set_json_pretty(enabled: bool):
+    """设置默认输出格式（True 为2空格缩进，False 为紧凑格式）"""
+    global _pretty
+    _pretty = enabled
+
+
+def is_json_pretty() -> bool:
+    return _pretty
+
+
+def _default(value: Any) -> Any:
+    """numpy 标量等转为Python基本类型"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'Type is not JSON serializable: {type(value).__name__}')
+
+
+def _stdlib_dumps(value: Any, pretty: bool) -> str:
+    if pretty:
+        return json.dumps(value, ensure_ascii=False, indent=2, default=_default)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+def _encode(value: Any, pretty: Optional[bool]) -> bytes:
+    """编码为UTF-8的JSON字节串"""
+    if pretty is None:
+        pretty = _pretty
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(value, default=_default, option=option)
+    return _stdlib_dumps(value, pretty).encode('utf-8')
+
+
+def json_dumps(value: Any, pretty: Optional[bool] = None) -> str:
+    """
+    编码为JSON文本（保留中文字符）
+
+    Args:
+        value: 要编码的数据
+        pretty: 是否缩进，为None时使用默认设置
+
+    Returns:
+        JSON文本
+    """
+    if orjson is not None:
+        return _encode(value, pretty).decode('utf-8')
+    return _stdlib_dumps(value, _pretty if pretty is None else pretty)
+
+
+def json_loads(text: Union[str, bytes]) -> Any:
+    """解码JSON文本"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@dataclass
+class JsonIOStat:
+    """单个文件的JSON读写统计（同一文件多次读写累计）"""
+    op: str
+    file: str
+    count: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+class JsonIOStats:
+    """
+    按 (读/写, 文件名) 累计JSON读写的次数、字节数和耗时
+
+    耗时只包括编码/解码和读写文件，不包括生成记录等其他处理。
+    只包含基本类型的 to_list() 结果可以从工作进程返回给主进程再 merge。
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], JsonIOStat] = {}
+
+    def record(self, op: str, path: Path, nbytes: int, seconds: float, count: int = 1):
+        """记录一次读写"""
+        key = (op, Path(path).name)
+        stat = self._stats.get(key)
+        if stat is None:
+            stat = self._stats[key] = JsonIOStat(op, key[1])
+        stat.count += count
+        stat.bytes += nbytes
+        stat.seconds += seconds
+
+    def merge(self, stats: List[Dict]):
+        """合并其他进程的统计（to_list() 的结果）"""
+        for stat in stats:
+            self.record(stat['op'], Path(stat['file']), stat['bytes'], stat['seconds'], stat['count'])
+
+    def to_list(self) -> List[Dict]:
+        return [dict(asdict(stat), seconds=round(stat.seconds, 3)) for stat in self._stats.values()]
+
+    def take(self) -> List[Dict]:
+        """取出并清空统计"""
+        stats = self.to_list()
+        self._stats.clear()
+        return stats
+
+    def to_dict(self) -> Dict:
+        """{backend, totals: {读/写: 合计}, files: [各文件统计]}"""
+        return {
+            'backend': JSON_BACKEND,
+            'totals': {
+                op: {'count': total.count, 'bytes': total.bytes, 'seconds': round(total.seconds, 3)}
+                for op, total in self.totals().items()
+            },
+            'files': self.to_list()
+        }
+
+    def totals(self) -> Dict[str, JsonIOStat]:
+        """各操作（读/写）的合计"""
+        totals = {}
+        for stat in self._stats.values():
+            total = totals.setdefault(stat.op, JsonIOStat(stat.op, '合计'))
+            total.count += stat.count
+            total.bytes += stat.bytes
+            total.seconds += stat.seconds
+        return totals
+
+    def print_summary(self, top: int = 5):
+        """打印读写合计和耗时最长的文件"""
+        if not self._stats:
+            return
+        print(f'\nJSON读写（{JSON_BACKEND}）')
+        totals = self.totals()
+        for op, label in ((JSON_READ, '读取'), (JSON_WRITE, '写入')):
+            if op in totals:
+                total = totals[op]
+                print(f'  {label}: {total.count} 次，{_format_mb(total.bytes)}，{total.seconds:.2f}s')
+        if len(self._stats) == 1:
+            return
+        slowest = sorted(self._stats.values(), key=lambda stat: stat.seconds, reverse=True)[:top]
+        for stat in slowest:
+            label = '读取' if stat.op == JSON_READ else '写入'
+            print(f'    {label} {stat.file}: {_format_mb(stat.bytes)}，{stat.seconds:.2f}s')
+
+
+def _format_mb(nbytes: int) -> str:
+    return f'{nbytes / 1024 / 1024:.2f} MB'
+
+
+_STATS = JsonIOStats()
+
+
+def json_io_stats() -> JsonIOStats:
+    """当前进程的JSON读写统计"""
+    return _STATS
+
+
+def read_json(path: Path) -> Any:
+    """
+    读取JSON文件
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        解码后的数据
+    """
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        content = f.read()
+    data = json_loads(content)
+    _STATS.record(JSON_READ, path, len(content), time.perf_counter() - start)
+    return data
+
+
+def write_json(path: Path, data: Any, pretty: Optional[bool] = None):
+    """
+    原子写入JSON文件
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的数据
+        pretty: 是否缩进，为None时使用默认设置
+    """
+    start = time.perf_counter()
+    content = _encode(data, pretty)
+    with atomic_write(path, 'wb') as f:
+        f.write(content)
+    _STATS.record(JSON_WRITE, path, len(content), time.perf_counter() - start)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+处理清单模块
+
+在 data/processed/.processed.json 中记录每个原始文件的内容哈希，
+以及每个 by-month 分片由哪些原始文件、基于哪个花名册生成。
+再次运行时只重建输入有变化的分片；只有花名册变化的分片仅重新关联部门，其余分片直接沿用。
+"""
+
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+from .json_io import read_json, write_json
+from .file_scanner import compute_file_hash
+from .shard_io import SHARD_SUFFIX
+
+
+MANIFEST_FILENAME = '.processed.json'
+MANIFEST_VERSION = 2
+
+
+def shard_filename(source: str, month: str) -> str:
+    """
+    商旅数据分片文件名（与各处理脚本的输出文件名一致）
+
+    Args:
+        source: 数据源 'alibaba', 'ctrip', 'zaitu'
+        month: 月份 (YYYY-MM)
+
+    Returns:
+        分片文件名，如 alibaba_2025-12.ndjson
+    """
+    return f'{source}_{month}{SHARD_SUFFIX}'
+
+
+def combine_hashes(hashes: List[str]) -> str:
+    """把多个哈希合并成一个（与顺序无关）"""
+    return hashlib.sha256('\n'.join(sorted(hashes)).encode('utf-8')).hexdigest()
+
+
+class ProcessingManifest:
+    """
+    处理清单
+
+    files:  原始文件名 -> {hash, size, mtime, source, outputs}
+    shards: 分片文件名 -> {inputs: {原始文件名: hash}, roster: 花名册指纹, written: 是否生成了文件}
+    """
+
+    def __init__(self, processed_dir: Path):
+        self.path = Path(processed_dir) / MANIFEST_FILENAME
+        self.files: Dict[str, Dict] = {}
+        self.shards: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, processed_dir: Path) -> 'ProcessingManifest':
+        """
+        读取处理清单，文件不存在、损坏或为旧格式（文件名 -> 修改时间）时返回空清单
+
+        Args:
+            processed_dir: 处理结果目录
+
+        Returns:
+            处理清单
+        """
+        manifest = cls(processed_dir)
+        if not manifest.path.exists():
+            return manifest
+
+        try:
+            data = read_json(manifest.path)
+        except Exception as e:
+            print(f'警告: 无法读取处理清单，将全部重新处理: {e}')
+            return manifest
+
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION:
+            manifest.files = data.get('files', {})
+            manifest.shards = data.get('shards', {})
+        return manifest
+
+    def file_hash(self, filepath: Path) -> str:
+        """
+        获取文件内容哈希
+
+        大小和修改时间都与清单记录一致时直接使用记录的哈希，否则重新计算。
+        复制文件只会改变修改时间，重新计算后哈希不变，不会被误判为有变化。
+        """
+        stat = filepath.stat()
+        entry = self.files.get(filepath.name)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime:
+            return entry['hash']
+        return compute_file_hash(filepath)
+
+    def is_file_current(self, filepath: Path, file_hash: str, output_dir: Path) -> bool:
+        """
+        原始文件内容未变化，且上次生成的输出文件都还在
+
+        Args:
+            filepath: 原始文件路径
+            file_hash: 当前内容哈希
+            output_dir: 输出文件所在目录
+
+        Returns:
+            是否可以跳过
+        """
+        entry = self.files.get(filepath.name)
+        if not entry or entry.get('hash') != file_hash or not entry.get('outputs'):
+            return False
+        return all((output_dir / name).exists() for name in entry['outputs'])
+
+    def record_file(self, filepath: Path, file_hash: str, source: str, outputs: List[str]):
+        """
+        记录原始文件的处理结果
+
+        Args:
+            filepath: 原始文件路径
+            file_hash: 内容哈希
+            source: 文件类型 'roster', 'alibaba', 'ctrip', 'zaitu'
+            outputs: 生成的输出文件名列表
+        """
+        stat = filepath.stat()
+        self.files[filepath.name] = {
+            'hash': file_hash,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'source': source,
+            'outputs': outputs
+        }
+
+    def shard_status(
+        self,
+        shard_name: str,
+        inputs: Dict[str, str],
+        roster: str,
+        output_dir: Path,
+        normalized_dir: Path
+    ) -> str:
+        """
+        判断分片需要做什么
+
+        Args:
+            shard_name: 分片文件名
+            inputs: 原始文件名 -> 内容哈希（按处理顺序）
+            roster: 花名册指纹
+            output_dir: 分片所在目录
+            normalized_dir: 未关联部门记录所在目录
+
+        Returns:
+            'current'：无需处理；
+            'enrich'：输入文件未变化，只需用新花名册重新关联部门；
+            'rebuild'：需要重新读取原始文件
+        """
+        entry = self.shards.get(shard_name)
+        if not entry:
+            return 'rebuild'
+        if list(entry.get('inputs', {}).items()) != list(inputs.items()):
+            return 'rebuild'
+
+        written = entry.get('written')
+        if written and not (normalized_dir / shard_name).exists():
+            return 'rebuild'
+        if entry.get('roster') != roster:
+            return 'enrich' if written else 'current'
+        if written and not (output_dir / shard_name).exists():
+            return 'enrich'
+        return 'current'
+
+    def record_shard(self, shard_name: str, inputs: Dict[str, str], roster: str, written: bool):
+        """
+        记录分片的生成依据
+
+        Args:
+            shard_name: 分片文件名
+            inputs: 原始文件名 -> 内容哈希（按处理顺序）
+            roster: 花名册指纹
+            written: 是否生成了分片文件（没有有效记录时不生成）
+        """
+        self.shards[shard_name] = {
+            'inputs': dict(inputs),
+            'roster': roster,
+            'written': written
+        }
+
+    def forget_missing_files(self, existing_names: List[str]):
+        """删除已不在原始数据目录中的文件记录"""
+        existing = set(existing_names)
+        for name in list(self.files):
+            if name not in existing:
+                del self.files[name]
+
+    def save(self):
+        """原子写入处理清单"""
+        data = {
+            'version': MANIFEST_VERSION,
+            'updatedAt': datetime.now().isoformat(),
+            'files': self.files,
+            'shards': self.shards
+        }
+        write_json(self.path, data)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+员工姓名匹配模块
+
+商旅平台导出的姓名与花名册常有细微差别：全角字符、姓名中间的空格、
+"姓名(备注)" 形式的后缀、只填了英文名等。NameMatcher 在加载花名册时
+预先建好 规范化姓名 -> 花名册姓名 的映射，每条记录的匹配只需几次字典查找。
+
+匹配规则（按顺序）：
+  exact       与花名册姓名完全相同
+  normalized  规范化后（NFKC、去空白和间隔号、去括号后缀、忽略大小写）与花名册姓名相同
+  english     规范化后与花名册英文名相同
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+
+MATCH_EXACT = 'exact'
+MATCH_NORMALIZED = 'normalized'
+MATCH_ENGLISH = 'english'
+MATCH_NONE = 'unmatched'
+
+# 匹配规则的中文名称（用于输出）
+MATCH_LABELS = {
+    MATCH_EXACT: '精确',
+    MATCH_NORMALIZED: '规范化姓名',
+    MATCH_ENGLISH: '英文名',
+    MATCH_NONE: '未匹配'
+}
+
+# 姓名末尾的括号备注，如 张三(外包)、张三【实习】（NFKC 后全角括号已转为半角）
+SUFFIX_PATTERN = re.compile(r'\s*[(\[【][^()\[\]【】]*[)\]】]\s*$')
+
+# 去掉的间隔号（少数民族/外籍姓名的写法不统一）
+SEPARATORS = str.maketrans('', '', '·・•.')
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> str:
+    """
+    规范化姓名
+
+    Args:
+        name: 原始姓名
+
+    Returns:
+        规范化后的姓名，如 ' 张　三（外包）' -> '张三'、'Zhang San' -> 'zhangsan'
+    """
+    text = unicodedata.normalize('NFKC', name)
+    text = SUFFIX_PATTERN.sub('', text)
+    return ''.join(text.split()).translate(SEPARATORS).casefold()
+
+
+def _add_alias(aliases: Dict[str, Optional[str]], key: str, name: str):
+    """添加别名；同一别名对应多个不同员工时记为None（不匹配，避免张冠李戴）"""
+    if not key:
+        return
+    existing = aliases.get(key, name)
+    aliases[key] = name if existing == name else None
+
+
+class NameMatcher:
+    """
+    姓名 -> 花名册姓名 的匹配器
+
+    用法:
+        matcher = NameMatcher([('张三', 'Zhang San'), ('李四', '')])
+        matcher.match('张 三(外包)')   # ('张三', 'normalized')
+    """
+
+    def __init__(self, employees: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            employees: (花名册姓名, 英文名) 列表，同一员工可以出现多次
+        """
+        self.names = set()
+        self.aliases: Dict[str, Optional[str]] = {}
+        self.english_aliases: Dict[str, Optional[str]] = {}
+
+        for name, english_name in employees:
+            self.names.add(name)
+            _add_alias(self.aliases, normalize_name(name), name)
+            if english_name:
+                _add_alias(self.english_aliases, normalize_name(english_name), name)
+
+    def match(self, name: str) -> Tuple[Optional[str], str]:
+        """
+        查找记录姓名对应的花名册姓名
+
+        Args:
+            name: 记录中的姓名
+
+        Returns:
+            (花名册姓名, 匹配规则)，未匹配时为 (None, 'unmatched')
+        """
+        if name in self.names:
+            return name, MATCH_EXACT
+        if not name:
+            return None, MATCH_NONE
+
+        key = normalize_name(name)
+        canonical = self.aliases.get(key)
+        if canonical:
+            return canonical, MATCH_NORMALIZED
+        canonical = self.english_aliases.get(key)
+        if canonical:
+            return canonical, MATCH_ENGLISH
+        return None, MATCH_NONE
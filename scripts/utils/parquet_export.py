@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Parquet导出模块
+
+merge_data.py --parquet 把合并后的记录另存为按月份、数据源分区的 Parquet 数据集，
+分析时可以只读需要的分区和列，不必解析整个 travel-data.json：
+
+    parquet/
+      month=2025-11/source=阿里商旅/part-00000.parquet
+      month=2025-12/source=携程商旅/part-00000.parquet
+
+所有文件使用同一 schema（PARQUET_COLUMNS，该类型没有的字段为 null）：
+  - 出发/入住/上下车等时间为 timestamp，金额、里程为 float64
+  - 部门、类型、舱位等取值较少的文本为字典编码（pandas 中读取为 category）
+  - 用车的出发地/目的地展开为 originCity、originAddress、destinationCity、destinationAddress
+  - month（记录日期所在月份）和 source 只在目录名中，读取数据集时自动还原为列
+
+读取示例:
+    pd.read_parquet('data/processed/parquet', columns=['deptLevel1', 'price'],
+                    filters=[('month', '=', '2025-11')])
+
+需要安装 pyarrow（可选依赖）。
+"""
+
+import os
+import re
+import shutil
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+PARQUET_AVAILABLE = pa is not None
+
+# 分区目录名
+PARTITION_FIELDS = ['month', 'source']
+
+# 每个分区累计到该行数时写出一个文件
+PARQUET_BATCH_ROWS = 100_000
+
+TIMESTAMP_FIELDS = ['bookTime', 'departTime', 'checkInTime', 'checkOutTime', 'pickupTime', 'dropoffTime']
+FLOAT_FIELDS = ['price', 'totalAmount', 'distance', 'personalOverage', 'miscFee']
+BOOL_FIELDS = ['isShared']
+CATEGORY_FIELDS = [
+    'type', 'deptLevel1', 'deptLevel2',
+    'cabinClass', 'airline', 'seat', 'carType', 'provider', 'roomType'
+]
+STRING_FIELDS = [
+    'orderNo', 'passenger', 'employee', 'flightNo', 'trainNo', 'fromCity', 'toCity',
+    'city', 'district', 'hotelName',
+    'originCity', 'originAddress', 'destinationCity', 'destinationAddress'
+]
+
+# 展开的嵌套字段：字段 -> 子字段（origin.city -> originCity）
+NESTED_FIELDS = {
+    'origin': ['city', 'address'],
+    'destination': ['city', 'address']
+}
+
+PARQUET_COLUMNS = CATEGORY_FIELDS + STRING_FIELDS + TIMESTAMP_FIELDS + FLOAT_FIELDS + BOOL_FIELDS
+
+# 直接取自记录的列（其余为展开的嵌套字段）
+FLAT_FIELDS = set(PARQUET_COLUMNS) - {field + key.capitalize() for field, keys in NESTED_FIELDS.items() for key in keys}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 日期 + 可选的时间；阿里机票的出发时间为 "日期 00:00:00 时:分"，以最后一个时间为准
+TIMESTAMP_PATTERN = re.compile(
+    r'^(\d{4}-\d{2}-\d{2})(?:\s+(\d{1,2}:\d{2}(?::\d{2})?))?(?:\s+(\d{1,2}:\d{2}(?::\d{2})?))?'
+)
+
+
+def parquet_schema() -> 'pa.Schema':
+    """数据集中每个文件的 schema（不含分区字段）"""
+    types = {}
+    for field in CATEGORY_FIELDS:
+        types[field] = pa.dictionary(pa.int32(), pa.string())
+    for field in STRING_FIELDS:
+        types[field] = pa.string()
+    for field in TIMESTAMP_FIELDS:
+        types[field] = pa.timestamp('ms')
+    for field in FLOAT_FIELDS:
+        types[field] = pa.float64()
+    for field in BOOL_FIELDS:
+        types[field] = pa.bool_()
+    return pa.schema([(field, types[field]) for field in PARQUET_COLUMNS])
+
+
+def parse_timestamp(text: Any) -> Optional[datetime]:
+    """
+    解析时间文本
+
+    Args:
+        text: 如 '2025-11-18 08:30:00'、'2025-11-18 08:30'、'2025-11-18 00:00:00 08:30'
+
+    Returns:
+        时间，无法识别（空值、姓名等错位数据）时返回None
+    """
+    if not text or not isinstance(text, str):
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+
+    match = TIMESTAMP_PATTERN.match(text)
+    if match is None:
+        return None
+    date, first, last = match.groups()
+    time = last or first or '00:00:00'
+    if time.count(':') == 1:
+        time += ':00'
+    try:
+        return datetime.strptime(f'{date} {time}', TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _array(values: List[Any], field: str) -> 'pa.Array':
+    """按字段类型把一列值转换为 Arrow 数组"""
+    if field in TIMESTAMP_FIELDS:
+        return pa.array([parse_timestamp(value) for value in values], pa.timestamp('ms'))
+    if field in FLOAT_FIELDS:
+        try:
+            return pa.array(values, pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.array([_to_float(value) for value in values], pa.float64())
+    if field in BOOL_FIELDS:
+        return pa.array([None if value is None else bool(value) for value in values], pa.bool_())
+
+    try:
+        array = pa.array(values, pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = pa.array([None if value is None else str(value) for value in values], pa.string())
+    if field in CATEGORY_FIELDS:
+        return array.dictionary_encode()
+    return array
+
+
+def records_to_table(records: List[Dict]) -> 'pa.Table':
+    """
+    把一批记录转换为 Arrow 表（列和类型见 PARQUET_COLUMNS，其他字段忽略）
+
+    Args:
+        records: 记录列表
+
+    Returns:
+        Arrow 表
+    """
+    columns = {field: [] for field in PARQUET_COLUMNS}
+    flat_fields = [field for field in PARQUET_COLUMNS if field in FLAT_FIELDS]
+    for record in records:
+        for field in flat_fields:
+            columns[field].append(record.get(field))
+        for field, keys in NESTED_FIELDS.items():
+            nested = record.get(field)
+            if not isinstance(nested, dict):
+                nested = {}
+            for key in keys:
+                columns[field + key.capitalize()].append(nested.get(key))
+
+    return pa.Table.from_arrays(
+        [_array(columns[field], field) for field in PARQUET_COLUMNS],
+        schema=parquet_schema()
+    )
+
+
+class ParquetExporter:
+    """
+    按 (月份, 数据源) 分区累计记录，每个分区满 PARQUET_BATCH_ROWS 行写出一个文件
+    （由 open_parquet_exporter 创建）
+    """
+
+    def __init__(self, output_dir: Path, batch_rows: int = PARQUET_BATCH_ROWS):
+        self.output_dir = output_dir
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self.files: List[Path] = []
+        self._buffers: Dict[Tuple[str, str], List[Dict]] = {}
+        self._parts: Dict[Tuple[str, str], int] = {}
+
+    def add(self, record: Dict, month: str):
+        """
+        添加一条记录
+
+        Args:
+            record: 差旅记录
+            month: 记录日期所在月份（分区）
+        """
+        partition = (month, record.get('source', '未知来源'))
+        buffer = self._buffers.setdefault(partition, [])
+        buffer.append(record)
+        self.rows += 1
+        if len(buffer) >= self.batch_rows:
+            self._flush(partition)
+
+    def _flush(self, partition: Tuple[str, str]):
+        records = self._buffers.pop(partition, None)
+        if not records:
+            return
+        part = self._parts.get(partition, 0)
+        self._parts[partition] = part + 1
+
+        directory = self.output_dir.joinpath(
+            *(f'{name}={value}' for name, value in zip(PARTITION_FIELDS, partition))
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'part-{part:05d}.parquet'
+        pq.write_table(records_to_table(records), path)
+        self.files.append(path)
+
+    def close(self):
+        """写出所有分区剩余的记录"""
+        for partition in list(self._buffers):
+            self._flush(partition)
+
+    @property
+    def partitions(self) -> int:
+        return len(self._parts)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.files)
+
+
+@contextlib.contextmanager
+def open_parquet_exporter(output_dir: Path, batch_rows: int = PARQUET_BATCH_ROWS) -> Iterator[ParquetExporter]:
+    """
+    打开 Parquet 数据集导出器
+
+    先写入同级的临时目录，with 块正常结束后替换原数据集（出错时原数据集保持不变）。
+
+    用法:
+        with open_parquet_exporter(output_dir) as exporter:
+            for record in records:
+                exporter.add(record, month)
+
+    Args:
+        output_dir: 数据集目录
+        batch_rows: 每个文件的最大行数
+
+    Yields:
+        导出器
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError('导出 Parquet 需要安装 pyarrow: pip install pyarrow')
+
+    output_dir = Path(output_dir)
+    tmp_dir = output_dir.with_name(f'.{output_dir.name}.tmp')
+    old_dir = output_dir.with_name(f'.{output_dir.name}.old')
+    for directory in (tmp_dir, old_dir):
+        shutil.rmtree(directory, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    try:
+        exporter = ParquetExporter(tmp_dir, batch_rows)
+        yield exporter
+        exporter.close()
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if output_dir.exists():
+        os.replace(output_dir, old_dir)
+    os.replace(tmp_dir, output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    exporter.output_dir = output_dir
+    exporter.files = [output_dir / path.relative_to(tmp_dir) for path in exporter.files]
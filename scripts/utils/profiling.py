@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+性能剖析模块
+
+各脚本的 --profile 选项使用：用 cProfile 统计函数耗时、用 tracemalloc 统计内存分配，
+结束后在输出目录的 profile/ 下生成：
+  <名称>.prof        可用 pstats / snakeviz 加载的剖析文件
+  <名称>-cpu.txt     按累计耗时和自身耗时排序的热点函数
+  <名称>-alloc.txt   按代码行统计的内存分配排行
+"""
+
+import io
+import pstats
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+PROFILE_DIRNAME = 'profile'
+
+# 报告中列出的函数数 / 代码行数
+DEFAULT_TOP_N = 40
+
+# 内存采样间隔（秒），以及比上次快照增长多少才重新拍快照
+SAMPLE_INTERVAL = 0.2
+SNAPSHOT_GROWTH = 1.1
+
+
+def profile_dir_for(output_dir: Path) -> Path:
+    """
+    获取剖析结果目录
+
+    Args:
+        output_dir: 脚本的输出目录
+
+    Returns:
+        剖析结果目录（如 data/processed/profile）
+    """
+    return Path(output_dir) / PROFILE_DIRNAME
+
+
+class PeakSnapshotSampler:
+    """
+    在后台线程中定期检查已分配内存，内存创新高（比上次快照增长10%以上）时拍快照
+
+    运行结束时大部分临时数据已经释放，结束时的快照看不出内存花在哪里，
+    因此报告使用最接近峰值时的快照。
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Optional[tracemalloc.Snapshot]:
+        """停止采样，返回最接近峰值的快照（内存未增长时为None）"""
+        self._stop.set()
+        self._thread.join()
+        return self.snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self.snapshot_bytes * SNAPSHOT_GROWTH:
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_bytes = current
+
+
+def write_cpu_report(profiler: cProfile.Profile, path: Path, top_n: int = DEFAULT_TOP_N):
+    """
+    写入热点函数报告（先按累计耗时，再按自身耗时排序）
+
+    Args:
+        profiler: 已停止的 cProfile.Profile
+        path: 报告文件路径
+        top_n: 每种排序列出的函数数
+    """
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.strip_dirs()
+
+    buffer.write(f'=== 按累计耗时排序（前 {top_n} 个） ===\n')
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+    buffer.write(f'\n=== 按自身耗时排序（前 {top_n} 个） ===\n')
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+
+    path.write_text(buffer.getvalue(), encoding='utf-8')
+
+
+def write_alloc_report(
+    snapshot: tracemalloc.Snapshot,
+    peak_bytes: int,
+    path: Path,
+    top_n: int = DEFAULT_TOP_N
+):
+    """
+    写入内存分配报告（快照时刻仍未释放的内存，按代码行汇总）
+
+    Args:
+        snapshot: 最接近峰值时的 tracemalloc 快照
+        peak_bytes: 运行期间 tracemalloc 记录到的峰值
+        path: 报告文件路径
+        top_n: 列出的代码行数
+    """
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<unknown>')
+    ])
+    top_stats = snapshot.statistics('lineno')
+    total = sum(stat.size for stat in top_stats)
+
+    lines = [
+        f'分配峰值: {peak_bytes / 1024 / 1024:.1f} MB',
+        f'峰值附近快照占用: {total / 1024 / 1024:.1f} MB（{len(top_stats)} 处代码行）',
+        '',
+        f'=== 按分配大小排序（前 {top_n} 处） ==='
+    ]
+    for index, stat in enumerate(top_stats[:top_n], 1):
+        frame = stat.traceback[0]
+        lines.append(
+            f'{index:>3}. {stat.size / 1024:>10.1f} KB  {stat.count:>8} 块  {frame.filename}:{frame.lineno}'
+        )
+
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@contextlib.contextmanager
+def profile_run(
+    output_dir: Path,
+    name: str,
+    enabled: bool = True,
+    top_n: int = DEFAULT_TOP_N
+) -> Iterator[None]:
+    """
+    剖析 with 块内的代码，结束后写出剖析文件和报告
+
+    开启后运行会明显变慢（tracemalloc 开销较大），只在排查性能问题时使用。
+    多进程运行时只统计主进程。
+
+    Args:
+        output_dir: 脚本的输出目录，报告写入其下的 profile/
+        name: 报告文件名前缀（一般为脚本名）
+        enabled: 为False时不做任何事
+        top_n: 报告中列出的函数数 / 代码行数
+    """
+    if not enabled:
+        yield
+        return
+
+    tracemalloc.start()
+    sampler = PeakSnapshotSampler()
+    sampler.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        peak_snapshot = sampler.stop()
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        if peak_snapshot is None or current_bytes > sampler.snapshot_bytes:
+            peak_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        profile_dir = profile_dir_for(output_dir)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+        prof_path = profile_dir / f'{name}.prof'
+        cpu_path = profile_dir / f'{name}-cpu.txt'
+        alloc_path = profile_dir / f'{name}-alloc.txt'
+
+        profiler.dump_stats(str(prof_path))
+        write_cpu_report(profiler, cpu_path, top_n)
+        write_alloc_report(peak_snapshot, peak_bytes, alloc_path, top_n)
+
+        print('\n性能剖析结果:')
+        print(f'  剖析文件: {prof_path}（python -m pstats {prof_path}）')
+        print(f'  热点函数: {cpu_path}')
+        print(f'  内存分配: {alloc_path}')
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+SQLite记录库模块
+
+merge_data.py --sqlite 把按月分片同步到 SQLite 数据库（默认 data/processed/travel.db），
+合并时从库中读取记录，摘要统计用 SQL 聚合计算；也可以直接用 SQL 查询：
+
+    SELECT month, SUM(amount) FROM records WHERE dept_level1 = '研发中心' GROUP BY month
+
+表结构:
+  records        每条记录一行：键、统计维度（部门、类型、月份、员工、数据源）、金额、记录JSON
+  shard_records  分片包含的记录及其在分片中的位置（一条记录可以同时属于多个分片）
+  shards         已同步的分片及其文件指纹（大小、修改时间）
+
+记录以 (数据源, 类型, 订单号, 出行人, 日期, 序号) 为键写入（upsert），与合并时的去重规则一致：
+  - 同一订单号可以包含多段行程（往返机票、多间酒店），因此键中加上出行人和日期
+  - 序号为同一键在分片内第几次出现，分片内的重复行仍然保留
+  - 没有订单号的记录（包括导出文件中的小计行）无法跨文件识别，只在所属分片内匹配
+  - 不同月份的供应商导出有重叠时，重叠的记录只保存一条，取分片名最大（月份最晚）的分片中的内容
+
+只同步指纹变化的分片：重新导入与已有数据重叠的导出文件只更新相关的行，不重建整个库。
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .json_io import json_loads
+
+
+STORE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    type TEXT NOT NULL,
+    order_no TEXT NOT NULL,
+    traveller TEXT NOT NULL,
+    trip_date TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    shard TEXT NOT NULL,
+    dept_level1 TEXT,
+    month TEXT,
+    employee TEXT,
+    amount REAL NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (source, type, order_no, traveller, trip_date, scope, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_records_dept ON records (dept_level1);
+CREATE INDEX IF NOT EXISTS idx_records_month ON records (month);
+CREATE INDEX IF NOT EXISTS idx_records_employee ON records (employee, month);
+CREATE INDEX IF NOT EXISTS idx_records_source ON records (source);
+
+CREATE TABLE IF NOT EXISTS shard_records (
+    shard TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (shard, record_id)
+);
+CREATE INDEX IF NOT EXISTS idx_shard_records_record ON shard_records (record_id);
+
+CREATE TABLE IF NOT EXISTS shards (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO records (source, type, order_no, traveller, trip_date, scope, seq, shard,
+                     dept_level1, month, employee, amount, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, type, order_no, traveller, trip_date, scope, seq) DO UPDATE SET
+    shard = excluded.shard,
+    dept_level1 = excluded.dept_level1,
+    month = excluded.month,
+    employee = excluded.employee,
+    amount = excluded.amount,
+    data = excluded.data
+WHERE excluded.shard >= records.shard
+   OR NOT EXISTS (SELECT 1 FROM shard_records WHERE record_id = records.id AND shard = records.shard)
+RETURNING id
+"""
+
+# 内容来自分片名更大的分片时（上面的 upsert 不返回行），按键查找记录
+SELECT_ID_SQL = """
+SELECT id FROM records
+WHERE source = ? AND type = ? AND order_no = ? AND traveller = ? AND trip_date = ? AND scope = ? AND seq = ?
+"""
+
+# 可分组统计的列
+GROUP_COLUMNS = ['dept_level1', 'type', 'month', 'employee', 'source']
+
+
+class StoreRow(NamedTuple):
+    """写入记录库的一行（由调用方从记录中提取）"""
+    source: str
+    type: str
+    order_no: str
+    traveller: str
+    trip_date: str
+    dept_level1: str
+    month: str
+    employee: str
+    amount: float
+    data: str
+
+
+class SyncResult(NamedTuple):
+    """一次同步的结果"""
+    upserted: List[str]
+    removed: List[str]
+    rows: int
+    pruned: int
+    duplicates: Dict[str, int]
+
+
+class RecordStore:
+    """
+    SQLite 记录库
+
+    用法:
+        with RecordStore(path) as store:
+            store.remove_shards_except(names)
+            if store.shard_fingerprint(name) != fingerprint:
+                store.upsert_shard(name, fingerprint, rows)
+            for name in store.stale_shards():
+                store.upsert_shard(name, fingerprint, rows)
+            store.prune()
+            for record in store.iter_records():
+                ...
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+
+        # 记录库可由分片重建：版本不同时清空，下次同步写入全部分片
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        with self.conn:
+            if version != STORE_VERSION:
+                for table in ('records', 'shard_records', 'shards'):
+                    self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {STORE_VERSION}')
+
+    def __enter__(self) -> 'RecordStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def shard_fingerprint(self, name: str) -> Optional[str]:
+        """分片上次同步时的文件指纹，未同步过时返回None"""
+        row = self.conn.execute('SELECT fingerprint FROM shards WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def upsert_shard(self, name: str, fingerprint: str, rows: Iterable[StoreRow]) -> int:
+        """
+        用分片的全部记录替换该分片的内容（一个事务）
+
+        分片中的记录逐条 upsert（已由分片名更大、且仍包含该记录的分片写入的不覆盖）；
+        分片不再包含的记录从分片中移除，不属于任何分片的记录由 prune() 删除。
+
+        Args:
+            name: 分片文件名
+            fingerprint: 分片文件指纹
+            rows: 分片的全部记录（按分片中的顺序）
+
+        Returns:
+            写入的行数
+        """
+        seen: Dict[Tuple, int] = {}
+        links = []
+        with self.conn:
+            self.conn.execute('DELETE FROM shard_records WHERE shard = ?', (name,))
+            for position, row in enumerate(rows):
+                key = (*row[:5], '' if row.order_no else name)
+                seq = seen.get(key, 0)
+                seen[key] = seq + 1
+                found = self.conn.execute(UPSERT_SQL, (*key, seq, name, *row[5:])).fetchone()
+                if found is None:
+                    found = self.conn.execute(SELECT_ID_SQL, (*key, seq)).fetchone()
+                record_id = found[0]
+                links.append((name, record_id, position))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO shard_records (shard, record_id, position) VALUES (?, ?, ?)', links
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO shards (name, fingerprint, rows) VALUES (?, ?, ?)',
+                (name, fingerprint, len(links))
+            )
+        return len(links)
+
+    def remove_shards_except(self, names: Iterable[str]) -> List[str]:
+        """
+        移除不在 names 中的分片（分片文件已删除）
+
+        Returns:
+            移除的分片名
+        """
+        keep = set(names)
+        removed = [name for (name,) in self.conn.execute('SELECT name FROM shards') if name not in keep]
+        with self.conn:
+            for name in removed:
+                self.conn.execute('DELETE FROM shard_records WHERE shard = ?', (name,))
+                self.conn.execute('DELETE FROM shards WHERE name = ?', (name,))
+        return removed
+
+    def stale_shards(self) -> List[str]:
+        """
+        需要重新写入的分片：记录的内容来自已移除或不再包含它的分片，
+        而分片名最大的、仍包含该记录的分片需要重新写入内容
+
+        Returns:
+            分片名列表
+        """
+        cursor = self.conn.execute(
+            'SELECT DISTINCT latest.shard FROM records JOIN ('
+            '  SELECT record_id, MAX(shard) AS shard FROM shard_records GROUP BY record_id'
+            ') AS latest ON latest.record_id = records.id '
+            'WHERE latest.shard <> records.shard ORDER BY latest.shard'
+        )
+        return [name for (name,) in cursor]
+
+    def duplicate_counts(self) -> Dict[str, int]:
+        """
+        各数据源在多个分片中重复出现、只保留一条的记录数
+
+        Returns:
+            {数据源: 重复条数}（没有重复的数据源不列出）
+        """
+        cursor = self.conn.execute(
+            'SELECT records.source, COUNT(*) - COUNT(DISTINCT shard_records.record_id) '
+            'FROM shard_records JOIN records ON records.id = shard_records.record_id '
+            'GROUP BY records.source ORDER BY records.source'
+        )
+        return {source: count for source, count in cursor if count}
+
+    def prune(self) -> int:
+        """删除不属于任何分片的记录，返回删除的行数"""
+        with self.conn:
+            cursor = self.conn.execute(
+                'DELETE FROM records WHERE NOT EXISTS '
+                '(SELECT 1 FROM shard_records WHERE shard_records.record_id = records.id)'
+            )
+        return cursor.rowcount
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        按分片名和分片内位置的顺序逐条读取记录（属于多个分片的记录取内容所在分片中的位置）
+
+        Yields:
+            记录
+        """
+        cursor = self.conn.execute(
+            'SELECT records.data FROM records JOIN shard_records '
+            'ON shard_records.record_id = records.id AND shard_records.shard = records.shard '
+            'ORDER BY records.shard, shard_records.position'
+        )
+        for (data,) in cursor:
+            yield json_loads(data)
+
+    def totals(self) -> Tuple[int, float]:
+        """(记录数, 总金额)"""
+        count, amount = self.conn.execute('SELECT COUNT(*), TOTAL(amount) FROM records').fetchone()
+        return count, amount
+
+    def group_totals(self, column: str) -> Dict[str, Tuple[float, int]]:
+        """
+        按列分组统计
+
+        Args:
+            column: GROUP_COLUMNS 中的列名
+
+        Returns:
+            {取值: (金额, 记录数)}
+        """
+        if column not in GROUP_COLUMNS:
+            raise ValueError(f'不支持的分组列: {column}')
+        cursor = self.conn.execute(
+            f'SELECT {column}, TOTAL(amount), COUNT(*) FROM records GROUP BY {column}'
+        )
+        return {key: (amount, count) for key, amount, count in cursor}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+花名册存储模块
+
+每个月的员工索引保存在 by-month/{月份}.json，是唯一的数据来源；
+roster_index.json 只记录处理过哪些月份（月份 -> 文件名、处理时间、人数）。
+处理一个月的花名册只写该月文件和很小的月份清单，耗时只与当月人数有关，
+全局员工索引（allEmployees）在读取时由各月文件计算。
+
+旧版 roster_index.json（包含 allEmployees）可以直接读取，下次写入时转为新格式。
+月份清单中记录了每个月份文件的格式版本，版本较旧的月份会在下次运行时重新处理
+（版本3起员工索引包含英文名，用于姓名匹配）。
+"""
+
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+from .json_io import read_json, write_json
+
+
+ROSTER_INDEX_VERSION = 3
+
+
+class RosterStore:
+    """
+    花名册存储
+
+    index_path:  roster_index.json（月份清单）
+    months_dir:  各月员工索引所在目录（默认为 roster_index.json 同级的 by-month/）
+    """
+
+    def __init__(self, index_path: Path, months_dir: Optional[Path] = None):
+        self.index_path = Path(index_path)
+        self.months_dir = Path(months_dir) if months_dir else self.index_path.parent / 'by-month'
+        self._index: Optional[Dict] = None
+
+    def month_file(self, month: str) -> Path:
+        """月份员工索引文件路径"""
+        return self.months_dir / f'{month}.json'
+
+    def _load_index(self) -> Dict:
+        """读取月份清单，文件不存在或损坏时返回空清单"""
+        if self._index is None:
+            self._index = {}
+            if self.index_path.exists():
+                try:
+                    self._index = read_json(self.index_path)
+                except Exception as e:
+                    print(f'警告: 无法读取现有索引，将创建新索引: {e}')
+        return self._index
+
+    @property
+    def months(self) -> Dict[str, Dict]:
+        """已处理的月份 -> {file, processedAt, count, version}"""
+        return self._load_index().get('months', {})
+
+    def save_month(self, month: str, roster_file: str, employee_index: Dict[str, Dict]) -> Path:
+        """
+        保存一个月的员工索引，并更新月份清单（均为原子写入）
+
+        Args:
+            month: 月份 (YYYY-MM)
+            roster_file: 花名册文件名
+            employee_index: 员工索引 {姓名: 部门信息}
+
+        Returns:
+            写入的月份文件路径
+        """
+        processed_at = datetime.now().isoformat()
+        month_file = self.month_file(month)
+        write_json(month_file, {
+            'month': month,
+            'rosterFile': roster_file,
+            'processedAt': processed_at,
+            'employees': employee_index,
+            'count': len(employee_index)
+        })
+
+        months = dict(self.months)
+        months[month] = {
+            'file': roster_file,
+            'processedAt': processed_at,
+            'count': len(employee_index),
+            'version': ROSTER_INDEX_VERSION
+        }
+        # 新格式只保存月份清单，旧格式中的 allEmployees 不再写入
+        self._index = {'version': ROSTER_INDEX_VERSION, 'months': months}
+        write_json(self.index_path, self._index)
+
+        return month_file
+
+    def is_month_current(self, month: str) -> bool:
+        """月份文件存在，且由当前格式版本写入"""
+        entry = self.months.get(month)
+        return bool(entry) and entry.get('version') == ROSTER_INDEX_VERSION and self.month_file(month).exists()
+
+    def load_month(self, month: str) -> Optional[Dict[str, Dict]]:
+        """
+        读取指定月份的员工索引
+
+        Returns:
+            员工索引，没有该月文件时返回None
+        """
+        month_file = self.month_file(month)
+        if not month_file.exists():
+            return None
+        return read_json(month_file).get('employees', {})
+
+    def all_employees(self) -> Dict[str, Dict]:
+        """
+        全局员工索引：按月份从早到晚合并各月员工，同名员工以最近月份的部门为准
+
+        Returns:
+            {姓名: {deptLevel1, deptLevel2, deptLevel3, latestRecord}}
+            各月文件都不存在时，返回旧版索引中保存的 allEmployees
+        """
+        result = {}
+        found = False
+        for month in sorted(self.months):
+            employees = self.load_month(month)
+            if employees is None:
+                continue
+            found = True
+            for name, info in employees.items():
+                entry = result.setdefault(name, {})
+                entry['deptLevel1'] = info['deptLevel1']
+                entry['deptLevel2'] = info['deptLevel2']
+                entry['deptLevel3'] = info['deptLevel3']
+                entry['latestRecord'] = month
+
+        if not found:
+            return self._load_index().get('allEmployees', {})
+        return result
+
+    def to_index(self) -> Dict:
+        """
+        完整索引视图（与旧版 roster_index.json 的结构相同），用于合并到 travel-data.json
+
+        Returns:
+            {months: {...}, allEmployees: {...}}
+        """
+        return {
+            'months': self.months,
+            'allEmployees': self.all_employees()
+        }
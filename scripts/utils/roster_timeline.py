@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+花名册时间线模块
+
+由所有已处理月份的花名册为每个员工建立部门生效区间，
+按记录日期所在月份查询当时的部门（员工调岗前后的出行分别归到调岗前后的部门）。
+
+区间规则：
+  - 连续几个月部门相同合并为一个区间，部门变化时开始新的区间；
+  - 一个区间从起始月份一直有效到下一个区间开始（员工某月未出现在花名册中时沿用之前的部门）；
+  - 日期早于该员工最早出现的月份时，使用最早的区间。
+
+记录中的姓名先经 NameMatcher 对应到花名册姓名（见 name_matcher.py）。
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set, Tuple
+
+from .name_matcher import NameMatcher, MATCH_NONE
+
+
+# 判断部门是否变化时比较的字段
+DEPT_FIELDS = ('deptLevel1', 'deptLevel2', 'deptLevel3')
+
+
+class RosterTimeline:
+    """
+    按生效月份查询员工部门
+
+    intervals: 姓名 -> (各区间起始月份列表（升序）, 对应的部门信息列表)
+    months:    构建时用到的花名册月份（升序）
+    matcher:   记录姓名 -> 花名册姓名（未指定时由各区间的姓名和英文名构建）
+    """
+
+    def __init__(
+        self,
+        intervals: Dict[str, Tuple[List[str], List[Dict]]],
+        months: List[str],
+        matcher: Optional[NameMatcher] = None
+    ):
+        self.intervals = intervals
+        self.months = months
+        self.matcher = matcher or NameMatcher(
+            (name, info.get('englishName', ''))
+            for name, (_, infos) in intervals.items()
+            for info in infos
+        )
+
+    @classmethod
+    def from_store(cls, store) -> 'RosterTimeline':
+        """
+        由花名册存储构建时间线
+
+        Args:
+            store: RosterStore
+
+        Returns:
+            花名册时间线；只有旧版索引（没有月份文件）时，每个员工只有一个始终有效的区间
+        """
+        intervals: Dict[str, Tuple[List[str], List[Dict]]] = {}
+        months = []
+        # 英文名可能在部门不变的月份才补上，单独收集各月的 (姓名, 英文名)
+        names: Set[Tuple[str, str]] = set()
+
+        for month in sorted(store.months):
+            employees = store.load_month(month)
+            if employees is None:
+                continue
+            months.append(month)
+            for name, info in employees.items():
+                names.add((name, info.get('englishName', '')))
+                starts, infos = intervals.setdefault(name, ([], []))
+                if infos and all(infos[-1].get(key) == info.get(key) for key in DEPT_FIELDS):
+                    continue
+                starts.append(month)
+                infos.append(info)
+
+        if not months:
+            for name, info in store.all_employees().items():
+                intervals[name] = ([''], [info])
+            return cls(intervals, months)
+
+        return cls(intervals, months, NameMatcher(names))
+
+    def match(self, name: str, month: Optional[str]) -> Tuple[Dict, str]:
+        """
+        查询员工在指定月份的部门信息
+
+        Args:
+            name: 记录中的员工姓名
+            month: 月份 (YYYY-MM)，为空时返回最近的部门
+
+        Returns:
+            (部门信息, 匹配规则)，花名册中没有该员工时为 ({}, 'unmatched')
+        """
+        canonical, rule = self.matcher.match(name)
+        if canonical is None:
+            return {}, MATCH_NONE
+        starts, infos = self.intervals[canonical]
+        if len(infos) == 1 or not month:
+            return infos[-1], rule
+        return infos[max(bisect_right(starts, month) - 1, 0)], rule
+
+    def __len__(self) -> int:
+        return len(self.intervals)
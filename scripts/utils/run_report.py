@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+运行报告模块
+
+记录一次处理过程中各阶段、各文件、各工作表的耗时、输入/输出行数和峰值内存，
+以及各JSON文件读写的字节数和耗时（见 json_io.py），
+处理结束后打印汇总表，也可以保存为 data/processed/run-report.json 用于跟踪趋势。
+"""
+
+import sys
+import time
+import contextlib
+import unicodedata
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .name_matcher import MATCH_LABELS
+from .json_io import JsonIOStats, json_io_stats, write_json
+
+
+RUN_REPORT_FILENAME = 'run-report.json'
+
+# 汇总表第一列（阶段/文件/工作表名称）的显示宽度
+LABEL_WIDTH = 36
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    当前进程的峰值内存（MB）
+
+    Returns:
+        峰值常驻内存，不支持的平台（Windows）返回None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 单位为字节，Linux 为KB
+    if sys.platform == 'darwin':
+        return round(peak / 1024 / 1024, 1)
+    return round(peak / 1024, 1)
+
+
+def rows_per_second(rows: int, seconds: float) -> Optional[float]:
+    """计算吞吐量，没有行数或耗时为0时返回None"""
+    if not rows or seconds <= 0:
+        return None
+    return round(rows / seconds, 1)
+
+
+@dataclass
+class SheetStat:
+    """单个工作表的读取统计"""
+    sheet: str
+    seconds: float
+    rows: int
+    cached: bool = False
+
+
+@dataclass
+class FileReport:
+    """
+    单个文件的处理统计
+
+    rows_in 为读取的工作表行数之和，rows_out 为提取出的记录数，
+    matches 为关联部门时各姓名匹配规则的记录数（见 name_matcher.py），
+    json_io 为在工作进程中处理时的JSON读写统计（主进程中处理时直接计入主进程的统计）。
+    只包含基本类型，可以从工作进程返回给主进程。
+    """
+    filename: str
+    source: str
+    seconds: float = 0.0
+    rows_out: int = 0
+    peak_rss_mb: Optional[float] = None
+    sheets: List[SheetStat] = field(default_factory=list)
+    matches: Dict[str, int] = field(default_factory=dict)
+    json_io: List[Dict] = field(default_factory=list)
+
+    @property
+    def rows_in(self) -> int:
+        return sum(stat.rows for stat in self.sheets)
+
+    def add_sheet(self, sheet: str, seconds: float, rows: int, cached: bool = False):
+        """记录一个工作表的读取耗时和行数"""
+        self.sheets.append(SheetStat(sheet, round(seconds, 3), rows, cached))
+
+    @contextlib.contextmanager
+    def measure(self) -> Iterator['FileReport']:
+        """计时整个文件的处理过程，结束时记录峰值内存"""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.seconds = round(time.perf_counter() - start, 3)
+            self.peak_rss_mb = peak_rss_mb()
+
+    def to_dict(self) -> Dict:
+        return {
+            'file': self.filename,
+            'source': self.source,
+            'seconds': self.seconds,
+            'rowsIn': self.rows_in,
+            'rowsOut': self.rows_out,
+            'rowsPerSecond': rows_per_second(self.rows_in, self.seconds),
+            'peakRssMB': self.peak_rss_mb,
+            'sheets': [asdict(stat) for stat in self.sheets],
+            'matches': self.matches
+        }
+
+
+@dataclass
+class PhaseReport:
+    """单个阶段的统计"""
+    name: str
+    seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    peak_rss_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'seconds': self.seconds,
+            'rowsIn': self.rows_in,
+            'rowsOut': self.rows_out,
+            'rowsPerSecond': rows_per_second(self.rows_in or self.rows_out, self.seconds),
+            'peakRssMB': self.peak_rss_mb
+        }
+
+
+class RunReport:
+    """
+    一次处理过程的运行报告
+
+    用法:
+        report = RunReport()
+        with report.phase('花名册') as phase:
+            ...
+            phase.rows_out = 100
+        report.add_file(file_report)
+        report.print_summary()
+        report.save(output_dir / RUN_REPORT_FILENAME)
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.phases: List[PhaseReport] = []
+        self.files: List[FileReport] = []
+        # 合并时各数据源去掉的跨分片重复记录数
+        self.duplicates: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[PhaseReport]:
+        """
+        计时一个阶段，行数由调用方在 with 块内填写
+
+        Args:
+            name: 阶段名称
+
+        Yields:
+            阶段统计
+        """
+        phase = PhaseReport(name)
+        self.phases.append(phase)
+        start = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            phase.seconds = round(time.perf_counter() - start, 3)
+            phase.peak_rss_mb = peak_rss_mb()
+
+    def add_file(self, file_report: FileReport):
+        """添加一个文件的统计（可以来自工作进程）"""
+        self.files.append(file_report)
+
+    @property
+    def total_seconds(self) -> float:
+        return round(time.perf_counter() - self._start, 3)
+
+    def json_io_stats(self) -> JsonIOStats:
+        """主进程与各工作进程的JSON读写统计之和"""
+        stats = JsonIOStats()
+        stats.merge(json_io_stats().to_list())
+        for file_report in self.files:
+            stats.merge(file_report.json_io)
+        return stats
+
+    def to_dict(self) -> Dict:
+        return {
+            'startedAt': self.started_at.isoformat(),
+            'totalSeconds': self.total_seconds,
+            'peakRssMB': peak_rss_mb(),
+            'phases': [phase.to_dict() for phase in self.phases],
+            'files': [file_report.to_dict() for file_report in self.files],
+            'duplicatesDropped': self.duplicates,
+            'jsonIO': self.json_io_stats().to_dict()
+        }
+
+    def print_summary(self):
+        """打印各阶段、各文件的耗时汇总表"""
+        print('\n' + '=' * 70)
+        print('运行统计')
+        print('=' * 70)
+
+        print('\n' + _format_header('阶段'))
+        for phase in self.phases:
+            print(_format_row(phase.name, phase.seconds, phase.rows_in, phase.rows_out, phase.peak_rss_mb))
+
+        if self.files:
+            print('\n' + _format_header('文件 / 工作表'))
+            for file_report in self.files:
+                print(_format_row(
+                    file_report.filename, file_report.seconds, file_report.rows_in,
+                    file_report.rows_out, file_report.peak_rss_mb
+                ))
+                for stat in file_report.sheets:
+                    label = f'  {stat.sheet}' + ('（缓存）' if stat.cached else '')
+                    print(_format_row(label, stat.seconds, stat.rows, None, None))
+                if file_report.matches:
+                    counts = ' / '.join(
+                        f'{MATCH_LABELS.get(rule, rule)} {count}'
+                        for rule, count in file_report.matches.items() if count
+                    )
+                    print(f'  姓名匹配: {counts}')
+
+        if self.duplicates:
+            counts = ' / '.join(f'{source} {count}' for source, count in self.duplicates.items())
+            print(f'\n跨分片重复（已去掉）: {counts}')
+
+        self.json_io_stats().print_summary()
+
+        print(f'\n总耗时: {self.total_seconds:.2f}s，峰值内存: {_format_value(peak_rss_mb())} MB')
+
+    def save(self, path: Path):
+        """保存运行报告为JSON（缩进格式，便于查看）"""
+        write_json(path, self.to_dict(), pretty=True)
+
+
+def _display_width(text: str) -> int:
+    """终端显示宽度（中文等全角字符占两列）"""
+    return sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in text)
+
+
+def _pad(text: str, width: int, right: bool = False) -> str:
+    """按显示宽度补齐空格"""
+    padding = ' ' * max(width - _display_width(text), 0)
+    return padding + text if right else text + padding
+
+
+def _format_value(value) -> str:
+    return '-' if value is None else str(value)
+
+
+def _format_header(label: str) -> str:
+    """格式化汇总表的表头"""
+    columns = [('耗时(s)', 10), ('输入行', 10), ('输出行', 10), ('行/秒', 12), ('峰值内存(MB)', 14)]
+    return _pad(label, LABEL_WIDTH) + ''.join(_pad(name, width, right=True) for name, width in columns)
+
+
+def _format_row(
+    label: str,
+    seconds: float,
+    rows_in: Optional[int],
+    rows_out: Optional[int],
+    rss: Optional[float]
+) -> str:
+    """格式化汇总表的一行"""
+    speed = rows_per_second(rows_in or rows_out or 0, seconds)
+    return (
+        f'{_pad(label, LABEL_WIDTH)}{seconds:>10.2f}{_format_value(rows_in or None):>10}'
+        f'{_format_value(rows_out or None):>10}{_format_value(speed):>12}{_format_value(rss):>14}'
+    )
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+分片文件读写模块
+
+按月分片（by-month/、normalized/ 下的 {数据源}_{月份}.ndjson）为逐行JSON格式：
+  第1行  分片信息 {source, month, sourceFile, processedAt}
+  其后   每行一条记录
+处理脚本边提取边写入，合并时逐条读取，都不需要把整个分片放进内存。
+每行的编码/解码经过 json_io，读写耗时计入JSON读写统计。
+
+旧版分片（{数据源}_{月份}.json，一个包含 records 列表的JSON对象）仍可读取；
+同名的新旧分片同时存在时只使用新格式。
+"""
+
+import time
+import contextlib
+from pathlib import Path
+from typing import IO, Dict, Iterator, List
+
+from .atomic_file import atomic_write
+from .json_io import json_dumps, json_loads, json_io_stats, read_json, JSON_READ, JSON_WRITE
+
+
+SHARD_SUFFIX = '.ndjson'
+LEGACY_SHARD_SUFFIX = '.json'
+
+
+class ShardWriter:
+    """逐条写入分片记录（由 open_shard_writer 创建）"""
+
+    def __init__(self, f: IO):
+        self._file = f
+        self.count = 0
+        self.seconds = 0.0
+
+    def write(self, record: Dict):
+        """写入一条记录"""
+        start = time.perf_counter()
+        self._file.write(json_dumps(record, pretty=False))
+        self._file.write('\n')
+        self.seconds += time.perf_counter() - start
+        self.count += 1
+
+
+@contextlib.contextmanager
+def open_shard_writer(path: Path, meta: Dict) -> Iterator[ShardWriter]:
+    """
+    打开分片写入器（原子写入：with 块正常结束才替换目标文件）
+
+    用法:
+        with open_shard_writer(path, meta) as writer:
+            for record in records:
+                writer.write(record)
+
+    Args:
+        path: 分片文件路径
+        meta: 分片信息（写在第1行）
+
+    Yields:
+        分片写入器
+    """
+    with atomic_write(path) as f:
+        f.write(json_dumps(meta, pretty=False))
+        f.write('\n')
+        writer = ShardWriter(f)
+        yield writer
+    json_io_stats().record(JSON_WRITE, path, path.stat().st_size, writer.seconds)
+
+
+def legacy_shard_path(path: Path) -> Path:
+    """与新格式分片同名的旧版分片路径（alibaba_2025-12.ndjson -> alibaba_2025-12.json）"""
+    return path.with_suffix(LEGACY_SHARD_SUFFIX)
+
+
+def is_legacy_shard(path: Path) -> bool:
+    return path.suffix == LEGACY_SHARD_SUFFIX
+
+
+def read_shard_meta(path: Path) -> Dict:
+    """
+    读取分片信息
+
+    Args:
+        path: 分片文件路径（新格式只读第1行）
+
+    Returns:
+        {source, month, sourceFile, processedAt}
+    """
+    if is_legacy_shard(path):
+        data = read_json(path)
+        return {key: value for key, value in data.items() if key not in ('records', 'count')}
+    with open(path, 'rb') as f:
+        return json_loads(f.readline())
+
+
+def iter_shard_records(path: Path) -> Iterator[Dict]:
+    """
+    逐条读取分片记录
+
+    Args:
+        path: 分片文件路径
+
+    Yields:
+        记录
+    """
+    if is_legacy_shard(path):
+        yield from read_json(path).get('records', [])
+        return
+
+    nbytes = 0
+    seconds = 0.0
+    try:
+        with open(path, 'rb') as f:
+            f.readline()
+            for line in f:
+                nbytes += len(line)
+                if not line.strip():
+                    continue
+                start = time.perf_counter()
+                record = json_loads(line)
+                seconds += time.perf_counter() - start
+                yield record
+    finally:
+        json_io_stats().record(JSON_READ, path, nbytes, seconds)
+
+
+def list_shards(directory: Path) -> List[Path]:
+    """
+    列出目录中的分片文件（按文件名排序）
+
+    只包含 {数据源}_{月份} 形式的文件，同目录下的花名册月份文件（{月份}.json）不算分片。
+
+    Args:
+        directory: 分片目录
+
+    Returns:
+        分片文件路径列表
+    """
+    if not directory.exists():
+        return []
+
+    shards = {path.stem: path for path in directory.glob(f'*_*{LEGACY_SHARD_SUFFIX}')
+              if not path.name.startswith('roster_')}
+    shards.update((path.stem, path) for path in directory.glob(f'*_*{SHARD_SUFFIX}'))
+    return [shards[stem] for stem in sorted(shards)]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+工作表解析结果缓存模块
+
+把 pd.read_excel 解析出的工作表以二进制格式保存在 data/processed/cache/ 下，
+缓存键由原始文件内容哈希、工作表名称和读取参数（表头行、跳过行等）组成。
+原始文件内容不变时直接加载缓存，不再解析Excel；改动文件内容后键随之变化，
+旧缓存不再命中，按总大小淘汰最久未使用的条目。
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .atomic_file import atomic_write
+
+# 缓存格式版本（缓存内容的含义变化时递增，使旧缓存失效）
+CACHE_VERSION = 2
+
+# 缓存目录默认大小上限：512MB
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# 缓存文件后缀
+SHEET_SUFFIX = '.pkl'
+SHEET_NAMES_SUFFIX = '.sheets.json'
+
+
+class SheetCache:
+    """
+    工作表缓存目录
+
+    每个工作表一个文件，写入时先写临时文件再原子替换，多个进程同时读写也不会读到半个文件。
+    写入时不检查大小上限，由调用方在一批写入（如一个文件的所有工作表）之后调用 evict。
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存目录大小上限（字节），超出时淘汰最久未使用的条目
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def sheet_key(self, file_hash: str, sheet_name: str, read_kwargs: Dict) -> str:
+        """
+        计算工作表缓存键
+
+        Args:
+            file_hash: 原始文件内容哈希
+            sheet_name: 工作表名称
+            read_kwargs: 传给 pd.read_excel 的读取参数
+
+        Returns:
+            缓存键
+        """
+        payload = json.dumps(
+            [CACHE_VERSION, pd.__version__, file_hash, sheet_name, read_kwargs],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def load_sheet(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        加载缓存的工作表，未命中或缓存损坏时返回None
+        """
+        path = self.cache_dir / f'{key}{SHEET_SUFFIX}'
+        try:
+            df = pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # 缓存损坏（如写入中断、pandas版本不兼容），当作未命中
+            self._remove(path)
+            return None
+
+        self._touch(path)
+        return df
+
+    def store_sheet(self, key: str, df: pd.DataFrame):
+        """
+        保存工作表到缓存
+        """
+        self._write(f'{key}{SHEET_SUFFIX}', lambda f: df.to_pickle(f, compression=None))
+
+    def load_sheet_names(self, file_hash: str) -> Optional[List[str]]:
+        """
+        加载缓存的工作表名称列表（全部命中时无需打开工作簿）
+        """
+        path = self.cache_dir / f'{file_hash}{SHEET_NAMES_SUFFIX}'
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                sheet_names = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove(path)
+            return None
+
+        self._touch(path)
+        return sheet_names
+
+    def store_sheet_names(self, file_hash: str, sheet_names: List[str]):
+        """
+        保存工作表名称列表到缓存
+        """
+        content = json.dumps(sheet_names, ensure_ascii=False).encode('utf-8')
+        self._write(f'{file_hash}{SHEET_NAMES_SUFFIX}', lambda f: f.write(content))
+
+    def evict(self):
+        """
+        按总大小淘汰缓存：超出上限时从最久未使用（修改时间最早）的文件开始删除
+        """
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*'):
+            if not path.is_file() or path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _write(self, filename: str, write):
+        """先写临时文件再原子替换（临时文件以 "." 开头，淘汰时跳过）"""
+        with atomic_write(self.cache_dir / filename, 'wb') as f:
+            write(f)
+
+    @staticmethod
+    def _touch(path: Path):
+        """更新访问时间，用于最久未使用淘汰"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def sheet_cache_dir(processed_dir: Path) -> Path:
+    """
+    获取处理结果目录对应的缓存目录
+
+    Args:
+        processed_dir: 处理结果目录（如 data/processed）
+
+    Returns:
+        缓存目录（如 data/processed/cache）
+    """
+    return Path(processed_dir) / 'cache'
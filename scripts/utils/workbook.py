@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+工作簿读取工具模块
+
+统一处理Excel工作簿的打开、读取和耗时统计。
+"""
+
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .column_ops import positional_frame
+from .file_scanner import compute_file_hash
+from .run_report import FileReport
+from .sheet_cache import SheetCache
+
+
+def read_excel_columns(
+    excel_file: Union[Path, pd.ExcelFile],
+    sheet_name: str,
+    columns: Optional[Sequence[int]] = None,
+    **read_kwargs
+) -> pd.DataFrame:
+    """
+    读取工作表，只解析指定位置的列
+
+    用 usecols 读取需要的列，再按原列位置放回（见 positional_frame），
+    提取函数按位置取值和列数检查的结果与完整读取一致。工作表的列数按数据行
+    而不是表头行计算：需要的列全部存在时补齐到最大位置+1；有列超出工作表
+    （pandas 报 out-of-bounds）时改为完整读取，按实际列数截取。
+
+    Args:
+        excel_file: 已打开的 pd.ExcelFile 或Excel文件路径
+        sheet_name: 工作表名称
+        columns: 需要的列位置，为None时读取全部列
+        **read_kwargs: 传给 pd.read_excel 的其他参数（header、skiprows等）
+
+    Returns:
+        工作表数据（指定 columns 时列名为列位置）
+    """
+    if columns is None:
+        return pd.read_excel(excel_file, sheet_name=sheet_name, **read_kwargs)
+
+    usecols = sorted(set(columns))
+    if not usecols:
+        return pd.read_excel(excel_file, sheet_name=sheet_name, **read_kwargs)
+
+    try:
+        df = pd.read_excel(excel_file, sheet_name=sheet_name, usecols=usecols, **read_kwargs)
+    except pd.errors.ParserError as e:
+        if 'out-of-bounds' not in str(e):
+            raise
+        full = pd.read_excel(excel_file, sheet_name=sheet_name, **read_kwargs)
+        width = full.shape[1]
+        present = [position for position in usecols if position < width]
+        return positional_frame(full.iloc[:, present], present, width)
+
+    return positional_frame(df, usecols, usecols[-1] + 1)
+
+
+class CachedWorkbook:
+    """
+    带工作表缓存的工作簿
+
+    用法与 pd.ExcelFile 相同（sheet_names、parse、with 语句），
+    读取工作表时先查缓存，未命中才打开工作簿并调用 pd.read_excel，结果写回缓存。
+    工作簿在第一次需要时才打开，全部命中时完全不解析Excel。
+    关闭时如果写入过缓存，检查一次缓存目录的大小上限。
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        cache: Optional[SheetCache] = None,
+        opener: Callable[[Path], pd.ExcelFile] = pd.ExcelFile,
+        report: Optional[FileReport] = None
+    ):
+        """
+        Args:
+            filepath: Excel文件路径
+            cache: 工作表缓存，为None时不使用缓存
+            opener: 打开工作簿的函数（如指定读取引擎）
+            report: 文件运行统计，每读取一个工作表记录一次耗时和行数
+        """
+        self.filepath = Path(filepath)
+        self.cache = cache
+        self.opener = opener
+        self.report = report
+        self.open_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.sheets_read = 0
+        self.cache_hits = 0
+        self._cache_written = False
+        self._excel_file: Optional[pd.ExcelFile] = None
+        self._sheet_names: Optional[List[str]] = None
+        self._file_hash = compute_file_hash(self.filepath) if cache is not None else None
+
+    @property
+    def excel_file(self) -> pd.ExcelFile:
+        """底层 pd.ExcelFile（第一次访问时打开）"""
+        if self._excel_file is None:
+            open_start = time.perf_counter()
+            self._excel_file = self.opener(self.filepath)
+            self.open_seconds += time.perf_counter() - open_start
+        return self._excel_file
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """工作表名称列表"""
+        if self._sheet_names is None:
+            if self.cache is not None:
+                self._sheet_names = self.cache.load_sheet_names(self._file_hash)
+            if self._sheet_names is None:
+                self._sheet_names = list(self.excel_file.sheet_names)
+                if self.cache is not None:
+                    self.cache.store_sheet_names(self._file_hash, self._sheet_names)
+                    self._cache_written = True
+        return self._sheet_names
+
+    def parse(
+        self,
+        sheet_name: str,
+        columns: Optional[Sequence[int]] = None,
+        **read_kwargs
+    ) -> pd.DataFrame:
+        """
+        读取工作表
+
+        Args:
+            sheet_name: 工作表名称
+            columns: 只读取这些位置的列，为None时读取全部列
+            **read_kwargs: 传给 pd.read_excel 的读取参数（header、skiprows等）
+
+        Returns:
+            工作表数据
+        """
+        self.sheets_read += 1
+        key = None
+
+        if self.cache is not None:
+            load_start = time.perf_counter()
+            key_kwargs = dict(read_kwargs, columns=sorted(set(columns))) if columns is not None else read_kwargs
+            key = self.cache.sheet_key(self._file_hash, sheet_name, key_kwargs)
+            df = self.cache.load_sheet(key)
+            load_seconds = time.perf_counter() - load_start
+            self.parse_seconds += load_seconds
+            if df is not None:
+                self.cache_hits += 1
+                if self.report is not None:
+                    self.report.add_sheet(sheet_name, load_seconds, len(df), cached=True)
+                return df
+
+        excel_file = self.excel_file
+        parse_start = time.perf_counter()
+        df = read_excel_columns(excel_file, sheet_name, columns, **read_kwargs)
+        parse_seconds = time.perf_counter() - parse_start
+        self.parse_seconds += parse_seconds
+        if self.report is not None:
+            self.report.add_sheet(sheet_name, parse_seconds, len(df))
+
+        if key is not None:
+            self.cache.store_sheet(key, df)
+            self._cache_written = True
+        return df
+
+    def release_sheet(self, sheet_name: str):
+        """
+        释放已读取工作表在工作簿中占用的内存
+
+        只对 xlrd 按需加载（on_demand=True）打开的 .xls 工作簿有效，其他情况不做处理。
+        """
+        if self._excel_file is None:
+            return
+        book = self._excel_file.book
+        if hasattr(book, 'unload_sheet') and getattr(book, 'on_demand', False):
+            if book.sheet_loaded(sheet_name):
+                book.unload_sheet(sheet_name)
+
+    def print_timing(self):
+        """打印本工作簿的读取耗时"""
+        print_workbook_timing(self.open_seconds, self.parse_seconds, self.sheets_read, self.cache_hits)
+
+    def close(self):
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+        if self._cache_written:
+            self.cache.evict()
+            self._cache_written = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_sheet(
+    excel_file: Union[Path, pd.ExcelFile, CachedWorkbook],
+    sheet_name: str,
+    columns: Optional[Sequence[int]] = None,
+    **read_kwargs
+) -> pd.DataFrame:
+    """
+    读取工作表，传入 CachedWorkbook 时先查缓存
+
+    Args:
+        excel_file: 带缓存的工作簿、已打开的 pd.ExcelFile 或Excel文件路径
+        sheet_name: 工作表名称
+        columns: 只读取这些位置的列，为None时读取全部列
+        **read_kwargs: 传给 pd.read_excel 的读取参数
+
+    Returns:
+        工作表数据
+    """
+    if isinstance(excel_file, CachedWorkbook):
+        return excel_file.parse(sheet_name, columns, **read_kwargs)
+    return read_excel_columns(excel_file, sheet_name, columns, **read_kwargs)
+
+
+def print_workbook_timing(
+    open_seconds: float,
+    parse_seconds: float,
+    sheets_read: int,
+    cache_hits: int = 0
+):
+    """
+    打印单个文件的工作簿读取耗时
+
+    工作簿只打开一次、各工作表共用句柄，节省的时间按
+    "每多读一个工作表就少一次打开"估算。
+
+    Args:
+        open_seconds: 打开（解压、解析）工作簿的耗时
+        parse_seconds: 读取各工作表的总耗时（不含打开工作簿）
+        sheets_read: 读取的工作表数
+        cache_hits: 命中缓存的工作表数
+    """
+    if sheets_read > 0 and cache_hits == sheets_read:
+        print(f'  读取耗时: {sheets_read} 个工作表全部命中缓存，加载 {parse_seconds:.2f}s')
+        return
+
+    saved_seconds = open_seconds * max(sheets_read - cache_hits - 1, 0)
+    cache_info = f'，命中缓存 {cache_hits} 个' if cache_hits else ''
+    print(
+        f'  读取耗时: 打开工作簿 {open_seconds:.2f}s（{sheets_read - cache_hits} 个工作表共用，'
+        f'节省约 {saved_seconds:.2f}s），读取工作表 {parse_seconds:.2f}s{cache_info}'
+    )
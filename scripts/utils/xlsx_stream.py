@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+xlsx 流式读取工具模块
+
+通过 openpyxl 只读模式逐行读取工作表，按固定行数分批组装成 DataFrame，
+内存占用只与批大小有关，与工作表总行数无关。
+
+与 pd.read_excel 的差异：
+- 单元格保留原始类型，不做整列数值推断（如文本订单号不会被转成浮点数）
+- 列名为列位置（0, 1, 2...），提取函数按位置取值，不受影响
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from .column_ops import positional_frame
+
+
+# 每批组装的行数
+STREAM_BATCH_SIZE = 5000
+
+
+def open_streaming_workbook(filepath: Path):
+    """
+    以只读模式打开xlsx工作簿
+
+    Args:
+        filepath: Excel文件路径
+
+    Returns:
+        openpyxl 只读工作簿（用完需调用 close()）
+    """
+    from openpyxl import load_workbook
+    return load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+
+
+def _normalize_row(values: Sequence) -> List:
+    """
+    规范单行数据：去掉行尾空单元格，整数值的浮点数转为整数（与 pd.read_excel 一致）
+    """
+    row = list(values)
+    while row and (row[-1] is None or row[-1] == ''):
+        row.pop()
+    for i, value in enumerate(row):
+        if isinstance(value, float) and value.is_integer():
+            row[i] = int(value)
+    return row
+
+
+def _build_frame(rows: List[List], width: int, columns: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    把一批行组装成DataFrame（补齐列数，空值规则与 pd.read_excel 一致）
+
+    指定 columns 时只组装这些位置的列，再按原列位置放回（见 positional_frame）
+    """
+    used = [position for position in columns if position < width] if columns is not None else []
+    if not used:
+        padded = [row + [None] * (width - len(row)) for row in rows]
+        return TextParser(padded, header=None, dtype=object).read()
+
+    projected = [
+        [row[position] if position < len(row) else None for position in used]
+        for row in rows
+    ]
+    df = TextParser(projected, header=None, dtype=object).read()
+    return positional_frame(df, used, width)
+
+
+def iter_sheet_batches(
+    workbook,
+    sheet_name: str,
+    header: int,
+    skiprows: Iterable[int] = (),
+    batch_size: int = STREAM_BATCH_SIZE,
+    columns: Optional[Sequence[int]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    逐批读取工作表数据
+
+    表头和跳过行的含义与 pd.read_excel(header=..., skiprows=[...]) 相同：
+    先去掉 skiprows 指定的行（按原始行号），再把剩余的第 header 行作为表头。
+
+    Args:
+        workbook: open_streaming_workbook 打开的工作簿
+        sheet_name: 工作表名称
+        header: 表头所在行（跳过 skiprows 之后的行号）
+        skiprows: 要跳过的原始行号
+        batch_size: 每批行数
+        columns: 只组装这些位置的列，为None时组装全部列
+
+    Yields:
+        每批数据的DataFrame（列名为列位置）
+    """
+    skip = set(skiprows)
+    worksheet = workbook[sheet_name]
+    used = sorted(set(columns)) if columns is not None else None
+
+    width: Optional[int] = None
+    kept = -1
+    batch = []
+
+    for file_row, values in enumerate(worksheet.iter_rows(values_only=True)):
+        if file_row in skip:
+            continue
+        kept += 1
+        if kept < header:
+            continue
+
+        row = _normalize_row(values)
+        if kept == header:
+            width = len(row)
+            continue
+
+        # 跳过空行
+        if not row:
+            continue
+
+        # 列数取表头与已读数据行的最大值，保证按位置的列数检查与整表读取一致
+        width = max(width, len(row))
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield _build_frame(batch, width, used)
+            batch = []
+
+    if batch:
+        yield _build_frame(batch, width, used)
@@ -88,6 +88,54 @@ class DeptSecurity {
     }
 }
 
+// ========================================
+// 数据格式解码
+// ========================================
+
+/**
+ * 把列式格式的 travel-data.json（merge_data.py --format columnar）还原为记录列表格式
+ *
+ * 列式格式按类型分表、每个字段一列，重复较多的文本列为字典编码（dict + codes）；
+ * order 为每条记录所在的表，absent 为缺少某字段的行。普通格式原样返回。
+ */
+function decodeTravelData(data) {
+    if (!data || data.format !== 'columnar') {
+        return data;
+    }
+
+    const tables = data.tables.map(table => {
+        const rows = [];
+        for (let i = 0; i < table.count; i++) {
+            rows.push({});
+        }
+        const absent = table.absent || {};
+        for (const field of table.fields) {
+            const column = table.columns[field];
+            const missing = new Set(absent[field] || []);
+            const dict = column.dict;
+            const values = dict ? column.codes : column.values;
+            for (let i = 0; i < table.count; i++) {
+                if (missing.has(i)) continue;
+                const value = values[i];
+                rows[i][field] = dict && value !== null ? dict[value] : value;
+            }
+        }
+        return rows;
+    });
+
+    const positions = tables.map(() => 0);
+    const records = data.order.map(number => tables[number][positions[number]++]);
+
+    const decoded = {};
+    for (const [key, value] of Object.entries(data)) {
+        if (!['format', 'formatVersion', 'tables', 'order'].includes(key)) {
+            decoded[key] = value;
+        }
+    }
+    decoded.records = records;
+    return decoded;
+}
+
 // ========================================
 // 差旅数据分析主应用类
 // ========================================
@@ -207,7 +255,7 @@ class TravelAnalysisApp {
             await new Promise(resolve => setTimeout(resolve, 150));
 
             updateProgress(60, '正在构建索引...');
-            this.data = TRAVEL_DATA;
+            this.data = decodeTravelData(TRAVEL_DATA);
             this.filteredData = [...this.data.records];
             await new Promise(resolve => setTimeout(resolve, 150));
 